@@ -1,3 +1,5 @@
 import pix6t4.emulator as emulator
 
-emulator.main()  # Start the PIX6T4 Color emulator
\ No newline at end of file
+# The guard keeps the split emulator's game process from starting another emulator
+if __name__ == "__main__":
+    emulator.main()  # Start the PIX6T4 Color emulator
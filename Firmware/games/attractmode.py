@@ -1,52 +1,64 @@
 import math
 import random
 from pix6t4.color import Color
+from pix6t4.fixedpoint import hsl_to_rgba
 from pix6t4.game import Game
 from pix6t4.console import PIX6T4Color
 from pix6t4.console import Button
 from pix6t4.animation import Animation
+from pix6t4.baked import BakedAnimation
+from pix6t4.indexed import IndexedFramebuffer
+from pix6t4.particles import LightBuffer, ParticlePool, ramp
 
 class Rainbow(Animation):
-    def pixel_color(self, x, y, r, angle):
-        max_frame = 360
-        self.frame_number = self.frame_number % max_frame
-        return Color.fromHSLA((x * 2 + self.frame_number) * 5 % 360, 100, 50)
+    # The sweep is a cycle through a palette of hues, drawn once into an indexed framebuffer
+    hues = 72
+
+    def __init__(self, pix6t4: PIX6T4Color):
+        super().__init__(pix6t4)
+        self.framebuffer = IndexedFramebuffer(len(pix6t4.pixels), len(pix6t4.pixels[0]), palette=[
+            Color(hsl_to_rgba(hue * 360 // Rainbow.hues, 100, 50)) for hue in range(Rainbow.hues)])
+        for x in range(len(pix6t4.pixels[0])):
+            for y in range(len(pix6t4.pixels)):
+                self.framebuffer.plot(x, y, x * 2 % Rainbow.hues)
+
+    def draw_frame(self):
+        self.pix6t4.use_indexed(self.framebuffer)
+        self.framebuffer.rotate(0, Rainbow.hues)
+        self.frame_number += 1
 
 class BeachBall(Animation):
+    period = 360
+
     def pixel_color(self, x, y, r, angle):
-        max_frame = 360
-        self.frame_number = self.frame_number % max_frame
         return Color.fromHSLA((angle + self.frame_number * 4) % 360, 100, 50)
 
-class Droplet:
-    def __init__(self, x = 0, y = 0):
-        self.x = x
-        self.y = y
-        
 class GhostInTheShell(Animation):
     def __init__(self, pix6t4: PIX6T4Color):
         super().__init__(pix6t4)
-        self.droplets = []
         self.speed = 0.5
         self.max_droplets = 10
+        self.trail_length = 8
+        # Droplets fall along x, which goes across pix6t4.height pixels, one row per column of pixels
+        self.light = LightBuffer(pix6t4.height, pix6t4.width)
+        self.droplets = ParticlePool(self.max_droplets, self.light.height)
+        self.ramp = ramp(Color.GREEN)
     def draw_frame(self):
-        self.pix6t4.cls()
         if (len(self.droplets) < self.max_droplets):
-            self.droplets.append(Droplet(
-                x = -random.random() * 16,
-                y = int(random.random() * 8)
-            ))
-        for droplet in self.droplets:
-            droplet.x += self.speed
-            if droplet.x > 16:
-                self.droplets.remove(droplet)
-        super().draw_frame()
-    def pixel_color(self, x, y, r, angle):
-        intensity = 0
-        for droplet in self.droplets:
-            if droplet.y == y and x < droplet.x:
-                intensity += 8 - min(droplet.x - x, 8)
-        return Color.fromRGB(0, min(255, int(intensity * 32)), 0)
+            self.droplets.spawn(
+                x = -random.random() * 2 * self.light.width,
+                y = int(random.random() * self.droplets.rows),
+                vx = self.speed
+            )
+        self.droplets.step(-2 * self.light.width, 2 * self.light.width)
+        # Each droplet lights up its own trail, instead of each pixel looking for droplets
+        self.light.clear()
+        for row in range(self.droplets.rows):
+            for droplet in self.droplets.in_row(row):
+                self.light.add_trail(self.droplets.x[droplet], row, self.trail_length, 256 // self.trail_length)
+        self.pix6t4.cls()
+        self.light.write_to(self.pix6t4, self.ramp)
+        self.frame_number += 1
 
 animations = [Rainbow, BeachBall, GhostInTheShell]
 
@@ -54,26 +66,44 @@ class AttractMode(Game):
     """Attract mode for PIX6T4 Color."""
     name = "Attract Mode"
     priority = 8999 # Attract mode should be just before settings
+    frame_ms = 50
+    plays_when_idle = True
+    presents_frames = True
 
     def __init__(self, pix6t4: PIX6T4Color):
         """Initialize the attract mode."""
         super().__init__(pix6t4)
-        self.animations = [animation(pix6t4) for animation in animations]
+        # Periodic animations are played back from a baked frame table
+        self.animations = [
+            BakedAnimation(animation(pix6t4)) if animation.period else animation(pix6t4)
+            for animation in animations]
         self.current_animation = 0
 
     def title_screen(self):
         """Display the title screen for the game."""
         self.pix6t4.cls()
-        for x in range(8):
-            for y in range(8):
-                self.pix6t4.plot(x, y, Color.fromHSLA(x * 45, 100, 50))
+        for x in range(self.pix6t4.height):
+            for y in range(self.pix6t4.width):
+                self.pix6t4.plot(x, y, Color(hsl_to_rgba(x * 360 // self.pix6t4.height, 100, 50)))
 
-    def loop(self):
-        """The main attract mode loop."""
+    def start(self):
+        """Play the animations at a steady rate, whatever the frame rate of the console."""
+        self.every(AttractMode.frame_ms, self.draw_frame)
+
+    def state_tag(self):
+        """Tell the watchdog which animation is playing."""
+        animation = self.animations[self.current_animation]
+        return type(getattr(animation, "animation", animation)).__name__
+
+    def draw_frame(self):
+        """Draw the next frame of the current animation."""
         self.animations[self.current_animation].draw_frame()
+        self.pix6t4.present()
 
     def handle_button_pressed(self, button):
         """Handle button press events in attract mode."""
+        # Animations that draw into an indexed framebuffer select it again on their next frame
+        self.pix6t4.use_indexed(None)
         if button == Button.RIGHT:
             self.current_animation = (self.current_animation + 1) % len(self.animations)
         elif button == Button.LEFT:
@@ -1,7 +1,9 @@
 from pix6t4.bitmap import Bitmap
 from pix6t4.color import Color
 from pix6t4.game import Game
+from pix6t4.indexed import IndexedFramebuffer
 from pix6t4.console import PIX6T4Color, Button
+from pix6t4.tilemap import Camera, TileMap
 
 class MsPixMan(Game):
     """MsPixMan game for PIX6T4 Color."""
@@ -95,13 +97,40 @@ class MsPixMan(Game):
 #........#........
 ##################"""]
     maze_colors = [Color.DARKPINK, Color.LIGHTBLUE, Color.LILAC, Color.DARKBLUE]
-    glow_cycle = 16
+    # Palette indices of the maze cells, which are also the tiles of the maze maps. The wall,
+    # spawn point and cookie entries change with the maze and the glow, every cell that uses
+    # them follows.
+    EMPTY = 0
+    WALL = 1
+    CANDY = 2
+    COOKIE = 3
+    SPAWN = 4
+    PLAYER = 5
+    cell_indices = {' ': EMPTY, '#': WALL, '.': CANDY, 'o': COOKIE, '-': SPAWN, '<': PLAYER, 'B': 6, 'P': 7, 'I': 8, 'S': 9}
+    # A map compiled with `python -m pix6t4.assets maze.txt -o maps/mspixman0.p6t --tiles " #.o-<BPIS"`
+    # replaces the built-in maze of the same number, and can be larger than RAM
+    map_path = "maps/mspixman{}.p6t"
+    glow_ms = 400  # Time for cookies to glow from dim to bright, and back
     min_glow = 0.5
     max_glow = 1.0
+    # Slowness is counted in steps of this many milliseconds between moves
+    step_ms = 50
+    # The maze is drawn into the indexed framebuffer, which the console shows instead of pixels,
+    # so the game opts out of pixels and never presents them
+    presents_frames = True
 
     def __init__(self, pix6t4: PIX6T4Color):
         """Initialize the MsPixMan game."""
         super().__init__(pix6t4)
+        self.framebuffer = IndexedFramebuffer(len(pix6t4.pixels), len(pix6t4.pixels[0]), palette=[
+            Color.BLACK, Color.BLACK, Color.DARKGREY, Color.WHITE, Color.BLACK,
+            Color.YELLOW,
+            Color.RED, # Blinky
+            Color.PINK, # Pinky
+            Color.CYAN, # Inky
+            Color.ORANGE, # Sue
+        ])
+        self.maze = None
 
     def title_screen(self):
         """Display the title screen for the game."""
@@ -119,59 +148,61 @@ YYYYYYrr
 
     def start(self):
         """Start the MsPixMan game."""
-        self.pix6t4.game_running = True
         self.current_maze_index = 0
         self.round = 0
         self.score = 0
         self.slowness = 10
         self.start_level()
 
+    def stop(self):
+        """Save the high score when leaving the game."""
+        self.pix6t4.storage.submit_score(MsPixMan.name, self.score)
+        self.close_maze()
+
     def start_level(self):
         """Start a new level in the MsPixMan game."""
-        self.maze = [list(line) for line in str(MsPixMan.mazes[self.current_maze_index]).strip().splitlines()]
-        # Find the player start position
-        for y, row in enumerate(self.maze):
-            for x, char in enumerate(row):
-                if char == '<':
-                    self.player_x = x
-                    self.player_y = y
+        self.close_maze()
+        self.maze = self.load_maze(self.current_maze_index)
+        self.player_y, self.player_x = self.maze.find(MsPixMan.PLAYER)
         self.direction = (0, 0)
-        self.window_x = max(0, self.player_x - 4)
-        self.window_y = max(0, self.player_y - 4)
+        self.camera = Camera(self.framebuffer.height, self.framebuffer.width, self.maze.height, self.maze.width)
+        self.camera.center_on(self.player_y, self.player_x)
         self.glow = MsPixMan.min_glow
-        self.frame_number = 0
+        maze_color = MsPixMan.maze_colors[self.current_maze_index]
+        self.framebuffer.set_color(MsPixMan.WALL, maze_color)
+        self.framebuffer.set_color(MsPixMan.SPAWN, maze_color.with_brightness(0.5))
+        self.pix6t4.use_indexed(self.framebuffer)
+        self.timers.clear()
+        # All the cookies glow through their shared palette entry
+        self.tween(MsPixMan.glow_ms, MsPixMan.min_glow, MsPixMan.max_glow, self.set_glow, bounce=True)
+        self.after(self.slowness * MsPixMan.step_ms, self.move)
+        self.render()
+
+    def load_maze(self, index: int) -> TileMap:
+        """Open the map of a maze from flash if there is one, or compile the built-in maze."""
+        try:
+            return TileMap(MsPixMan.map_path.format(index))
+        except OSError:
+            return TileMap.from_ascii_art(str(MsPixMan.mazes[index]).strip().splitlines(), MsPixMan.cell_indices)
+
+    def close_maze(self):
+        """Close the file of the maze being played, if it came from flash."""
+        if self.maze is not None:
+            self.maze.close()
+            self.maze = None
+
+    def state_tag(self):
+        """Tell the watchdog which maze is being played."""
+        return f"maze {self.current_maze_index} round {self.round}"
+
+    def set_glow(self, glow: float):
+        """Set the brightness of the cookies."""
+        self.glow = glow
+        self.framebuffer.set_color(MsPixMan.COOKIE, Color.WHITE.with_brightness(glow))
 
     def render(self):
         """Render the current state of the game."""
-        for x in range(self.window_x, self.window_x + 8):
-            for y in range(self.window_y, self.window_y + 8):
-                self.pix6t4.plot(
-                    y - self.window_y,
-                    x - self.window_x,
-                    self.map_maze_cell_to_color(self.maze[y % len(self.maze)][x % len(self.maze[0])]))
-    
-    def map_maze_cell_to_color(self, cell: str) -> Color:
-        """Map a maze cell character to a color."""
-        if cell == '#':
-            return MsPixMan.maze_colors[self.current_maze_index]
-        elif cell == '.':
-            return Color.DARKGREY
-        elif cell == 'o':
-            return Color.WHITE.with_brightness(self.glow)
-        elif cell == '-':
-            return MsPixMan.maze_colors[self.current_maze_index].with_brightness(0.5)
-        elif cell == '<':
-            return Color.YELLOW
-        elif cell == 'B': # Blinky
-            return Color.RED
-        elif cell == 'P': # Pinky
-            return Color.PINK
-        elif cell == 'I': # Inky
-            return Color.CYAN
-        elif cell == 'S': # Sue
-            return Color.ORANGE
-        else:
-            return Color.BLACK
+        self.camera.draw(self.maze, self.framebuffer)
 
     def handle_button_pressed(self, button):
         """Handle button press events."""
@@ -180,47 +211,32 @@ YYYYYYrr
                         (0, -1) if button == Button.LEFT else \
                         (0, 1) if button == Button.RIGHT else \
                         (0, 0)
-        if self.maze[(self.player_y + new_direction[0]) % len(self.maze)][(self.player_x + new_direction[1]) % len(self.maze[0])] != '#':
+        if self.maze.get(self.player_y + new_direction[0], self.player_x + new_direction[1]) != MsPixMan.WALL:
             # Only change the direction if the new one wouldn't lead into a wall.
             # This enables the player to anticipate turns.
             self.direction = new_direction
 
-    def loop(self):
-        """The main game loop."""
-        # Make cookies glow up and down
-        glow_direction = 1 if self.frame_number % MsPixMan.glow_cycle < MsPixMan.glow_cycle // 2 else -1
-        self.glow = max(
-            MsPixMan.min_glow,
-            min(
-                MsPixMan.max_glow,
-                self.glow + glow_direction * (MsPixMan.max_glow - MsPixMan.min_glow) / (MsPixMan.glow_cycle // 2)
-            )
-        )
-        self.frame_number += 1
-        # Handle player movement
-        if self.direction != (0, 0) and self.frame_number % self.slowness == 0:
-            new_x = self.player_x + self.direction[1]
-            new_y = self.player_y + self.direction[0]
-            intended_cell = self.maze[new_y % len(self.maze)][new_x % len(self.maze[0])]
-            if intended_cell == '#': # Wall
-                self.direction = (0, 0)
-            else:
-                # Move the player
-                self.maze[self.player_y][self.player_x] = ' '
-                self.player_x = new_x % len(self.maze[0])
-                self.player_y = new_y
-                self.maze[self.player_y][self.player_x] = '<'
-                # Slide the window to follow the player
-                if (self.player_x - 4) % len(self.maze[0]) > self.window_x:
-                    self.window_x = (self.player_x - 4) % len(self.maze[0])
-                elif (self.player_x - 3) % len(self.maze[0]) < self.window_x:
-                    self.window_x = (self.player_x - 3) % len(self.maze[0])
-                if self.player_y > self.window_y + 4:
-                    self.window_y = min(self.player_y - 4, len(self.maze) - 8)
-                elif self.player_y < self.window_y + 3:
-                    self.window_y = max(0, self.player_y - 3)
-                if intended_cell == '.': # Candy
-                    self.score += 10
-        self.render()
+    def move(self):
+        """Move the player one cell if a direction is set, then wait for the next move."""
+        self.after(self.slowness * MsPixMan.step_ms, self.move)
+        if self.direction == (0, 0):
+            return
+        new_x = self.player_x + self.direction[1]
+        new_y = self.player_y + self.direction[0]
+        intended_cell = self.maze.get(new_y, new_x)
+        if intended_cell == MsPixMan.WALL:
+            self.direction = (0, 0)
+        else:
+            # Move the player
+            self.maze.set(self.player_y, self.player_x, MsPixMan.EMPTY)
+            self.player_x = new_x % self.maze.width
+            self.player_y = new_y % self.maze.height
+            self.maze.set(self.player_y, self.player_x, MsPixMan.PLAYER)
+            self.camera.follow(self.player_y, self.player_x)
+            # Read the part of the maze the player is heading to before it comes into view
+            self.camera.prefetch(self.maze)
+            if intended_cell == MsPixMan.CANDY:
+                self.score += 10
+            self.render()
 
 main = MsPixMan
\ No newline at end of file
@@ -3,6 +3,7 @@ from pix6t4.color import Color
 from pix6t4.game import Game
 from pix6t4.console import PIX6T4Color
 from pix6t4.console import Button
+from pix6t4.text import TextStrip
 
 class SettingsScreen:
     """Settings screen for PIX6T4 Color."""
@@ -40,15 +41,20 @@ o   @  o
                               """,
                               {'@': Color(0xFFF200FF), 'o': Color(0xFFF9BDFF)}).blit(0, 0, 8, 8, self.pix6t4.pixels)
         
+    def display_level(self):
+        """Display the brightness level, from 0 to 10."""
+        TextStrip(str(round(self.pix6t4.brightness * 10)), scrolling=False,
+                  width=self.pix6t4.width, height=self.pix6t4.height).draw(self.pix6t4)
+
     def handle_up(self):
         """Increase brightness."""
-        self.pix6t4.brightness = min(self.pix6t4.brightness + 0.1, 1.0)
-        self.display()
+        self.pix6t4.set_brightness(min(self.pix6t4.brightness + 0.1, 1.0))
+        self.display_level()
 
     def handle_down(self):
         """Decrease brightness."""
-        self.pix6t4.brightness = max(self.pix6t4.brightness - 0.1, 0.0)
-        self.display()
+        self.pix6t4.set_brightness(max(self.pix6t4.brightness - 0.1, 0.0))
+        self.display_level()
 
     def handle_A(self):
         pass
@@ -97,6 +103,7 @@ class Settings(Game):
     """Settings app for PIX6T4 Color."""
     name = "Settings"
     priority = 9000 # Settings app should always be last
+    frame_rate = 10 # Settings only change on button presses
 
     def __init__(self, pix6t4: PIX6T4Color):
         """Initialize the settings app."""
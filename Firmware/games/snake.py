@@ -1,27 +1,47 @@
 import random
 from pix6t4.bitmap import Bitmap
+from pix6t4.collision import Mask
 from pix6t4.color import Color
 from pix6t4.game import Game
 from pix6t4.console import Button
+from pix6t4.text import TextStrip
 
 class Snake(Game):
     """Snake game for PIX6T4 Color."""
     name = "Monty"
+    # Slowness is counted in steps of this many milliseconds between moves
+    step_ms = 50
+    presents_frames = True
 
     def start(self):
         """Initialize the game."""
-        self.pix6t4.cls()
         self.apples = []
         self.max_apples = 3
         self.apple_probability = 0.5
-        self.paint_apples(self.apples)
         self.snake = [(4, 4), (4, 5)]
-        self.paint_snake(self.snake)
+        # The cells of the snake and of the apples, to check the head against in one step
+        self.body = Mask.from_cells(self.snake, self.pix6t4.width, self.pix6t4.height)
+        self.apple_cells = Mask(self.pix6t4.width, self.pix6t4.height)
+        self.draw_board()
         self.direction = (0, 1)
         self.slowness = 10
         self.min_slowness = 2
         self.alive = True
-        self.frame_number = 0
+        self.score = 0
+        self.score_text = None
+        self.after(self.slowness * Snake.step_ms, self.move)
+
+    def stop(self):
+        """Save the high score when leaving the game."""
+        self.pix6t4.storage.submit_score(Snake.name, self.score)
+
+    def is_over(self):
+        """The game is over once the snake has bitten itself."""
+        return not self.alive
+
+    def state_tag(self):
+        """Tell the watchdog how long the snake is, or that it's showing the score."""
+        return f"length {len(self.snake)}" if self.alive else "score"
 
     def title_screen(self):
         """Display the title screen for the game."""
@@ -37,6 +57,12 @@ class Snake(Game):
    #gg# 
             """, {'#': Color.fromRGB(0, 64, 0)}).blit(0, 0, 8, 8, self.pix6t4.pixels)
 
+    def draw_board(self, snake_color=Color.GREEN):
+        """Draw the apples and the snake on a blank screen."""
+        self.pix6t4.cls()
+        self.paint_apples(self.apples)
+        self.paint_snake(self.snake, snake_color)
+
     def paint_snake(self, snake, color=Color.GREEN):
         """Paint the snake on the screen."""
         for segment in snake:
@@ -47,6 +73,12 @@ class Snake(Game):
         for apple in apples:
             self.pix6t4.plot(apple[0], apple[1], color)
 
+    def show_score(self):
+        """Scroll the score over the dead snake."""
+        self.score_text.scroll()
+        self.score_text.draw(self.pix6t4)
+        self.pix6t4.present()
+
     def handle_button_pressed(self, button):
         """Handle button press events."""
         if button == Button.UP:
@@ -58,41 +90,47 @@ class Snake(Game):
         elif button == Button.RIGHT:
             self.direction = (0, 1) if self.direction != (0, -1) else self.direction
 
-    def loop(self):
-        """The main game loop."""
-        self.frame_number += 1
-        # Skip frames based on slowness or if dead
-        if (self.frame_number % self.slowness != 0) or not self.alive:
-            return
+    def move(self):
+        """Move the snake one cell, then wait for the next move."""
         # Check if we need to add an apple
         if len(self.apples) < self.max_apples and random.random() < self.apple_probability:
-            x = random.randint(0, 7)
-            y = random.randint(0, 7)
-            if (x, y) not in self.snake and (x, y) not in self.apples:
+            x = random.randint(0, self.pix6t4.height - 1)
+            y = random.randint(0, self.pix6t4.width - 1)
+            if not self.body.test(x, y) and not self.apple_cells.test(x, y):
                 self.apples.append((x, y))
-                self.paint_apples(self.apples)
+                self.apple_cells.set(x, y)
         # Move the snake
         old_head = self.snake[-1]
-        new_head = ((old_head[0] + self.direction[0]) % 8, (old_head[1] + self.direction[1]) % 8)
-        if new_head in self.snake:
+        new_head = ((old_head[0] + self.direction[0]) % self.pix6t4.height,
+                    (old_head[1] + self.direction[1]) % self.pix6t4.width)
+        if self.body.test(*new_head):
             # Snake bit itself. Game over.
-            self.paint_snake(self.snake, Color.RED)
+            self.draw_board(Color.RED)
+            self.pix6t4.present()
             self.alive = False
+            self.score_text = TextStrip(f"SCORE {self.score}", Color.GREEN,
+                                        width=self.pix6t4.width, height=self.pix6t4.height)
             self.pix6t4.beep(frequency=100, duration=500)
-            pass
+            # Let the player see the dead snake for a second before the score scrolls over it
+            self.after(1000, lambda: self.every(150, self.show_score))
+            return
+        self.snake.append(new_head)
+        self.body.set(*new_head)
+        if self.apple_cells.test(*new_head):
+            # Snake ate an apple. Grow the snake and remove the apple.
+            self.apples.remove(new_head)
+            self.apple_cells.clear(*new_head)
+            self.score += 1
+            # Also speed things up
+            if self.slowness > self.min_slowness:
+                self.slowness -= 1
+            self.pix6t4.beep(duration=100)
         else:
-            self.snake.append(new_head)
-            self.paint_snake([new_head])
-            if new_head in self.apples:
-                # Snake ate an apple. Grow the snake and remove the apple.
-                self.apples.remove(new_head)
-                # Also speed things up
-                if self.slowness > self.min_slowness:
-                    self.slowness -= 1
-                self.pix6t4.beep(duration=100)
-            else:
-                # Remove the previous tail.
-                self.pix6t4.plot(self.snake[0][0], self.snake[0][1], Color.BLACK)
-                self.snake = self.snake[1:]
+            # Remove the previous tail.
+            self.body.clear(*self.snake[0])
+            self.snake = self.snake[1:]
+        self.draw_board()
+        self.pix6t4.present()
+        self.after(self.slowness * Snake.step_ms, self.move)
 
 main = Snake
\ No newline at end of file
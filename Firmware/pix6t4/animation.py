@@ -5,6 +5,12 @@ from pix6t4.console import PIX6T4Color
 
 
 class Animation:
+    # Number of frames after which the animation repeats itself, or None if it never does.
+    # Periodic animations can be baked into a frame table, see pix6t4.baked.
+    period = None
+    # Bump this when the frames of a periodic animation change, so frame tables baked before are baked again
+    bake_version = 1
+
     def __init__(self, pix6t4: PIX6T4Color):
         self.pix6t4 = pix6t4
         self.frame_number = 0
@@ -22,4 +28,4 @@ class Animation:
                 r = sqrt((x - self.x_center) ** 2 + (y - self.y_center) ** 2)
                 angle = (atan2(y - self.y_center, x - self.x_center) * 180 / pi + 180) % 360
                 self.pix6t4.plot(x, y, self.pixel_color(x, y, r, angle))
-        self.frame_number += 1
+        self.frame_number = (self.frame_number + 1) % self.period if self.period else self.frame_number + 1
@@ -0,0 +1,258 @@
+import argparse
+import struct
+import sys
+import zlib
+
+from pix6t4.bitmap import ASSET_HEADER, ASSET_MAGIC, ASSET_VERSION, palette as ascii_palette
+from pix6t4.tilemap import compile_tilemap, tiles_from_ascii_art
+
+# Offline compiler from PNG images and ASCII art to compiled assets, see pix6t4.bitmap.Asset.
+# This runs on a computer, not on the device:
+# python -m pix6t4.assets title.png -o assets/title.p6a --colors 16
+# ASCII art maps compile to tile maps instead, see pix6t4.tilemap:
+# python -m pix6t4.assets maze.txt -o maps/mspixman0.p6t --tiles " #.o-<BPIS"
+
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+
+
+def _unfilter(data: bytes, width: int, height: int, bpp: int, stride: int) -> list:
+    """Undo the per-scanline filters of decompressed PNG data, and return the scanlines."""
+    lines = []
+    previous = bytearray(stride)
+    offset = 0
+    for _ in range(height):
+        kind = data[offset]
+        line = bytearray(data[offset + 1:offset + 1 + stride])
+        offset += 1 + stride
+        for i in range(stride):
+            left = line[i - bpp] if i >= bpp else 0
+            up = previous[i]
+            if kind == 1:
+                line[i] = (line[i] + left) & 0xFF
+            elif kind == 2:
+                line[i] = (line[i] + up) & 0xFF
+            elif kind == 3:
+                line[i] = (line[i] + ((left + up) >> 1)) & 0xFF
+            elif kind == 4:
+                up_left = previous[i - bpp] if i >= bpp else 0
+                estimate = left + up - up_left
+                distances = abs(estimate - left), abs(estimate - up), abs(estimate - up_left)
+                if distances[0] <= distances[1] and distances[0] <= distances[2]:
+                    predictor = left
+                elif distances[1] <= distances[2]:
+                    predictor = up
+                else:
+                    predictor = up_left
+                line[i] = (line[i] + predictor) & 0xFF
+            elif kind != 0:
+                raise ValueError(f"Unknown PNG filter {kind}.")
+        lines.append(line)
+        previous = line
+    return lines
+
+
+def read_png(data: bytes) -> tuple:
+    """
+    Decode a non-interlaced PNG into (width, height, rows), where rows are lists of packed
+    0xRRGGBBAA colors. Supports 8-bit grayscale, RGB and RGBA, with or without alpha,
+    and palette images of 1 to 8 bits per pixel.
+    """
+    if data[:8] != PNG_SIGNATURE:
+        raise ValueError("Not a PNG image.")
+    offset = 8
+    compressed = bytearray()
+    png_palette = []
+    transparency = b""
+    while offset < len(data):
+        length, kind = struct.unpack_from(">I4s", data, offset)
+        chunk = data[offset + 8:offset + 8 + length]
+        offset += 12 + length
+        if kind == b"IHDR":
+            width, height, depth, color_type, _, _, interlace = struct.unpack(">IIBBBBB", chunk)
+        elif kind == b"PLTE":
+            png_palette = [tuple(chunk[i:i + 3]) for i in range(0, length, 3)]
+        elif kind == b"tRNS":
+            transparency = chunk
+        elif kind == b"IDAT":
+            compressed += chunk
+        elif kind == b"IEND":
+            break
+    if interlace:
+        raise ValueError("Interlaced PNG images are not supported.")
+    channels = {0: 1, 2: 3, 3: 1, 4: 2, 6: 4}[color_type]
+    if depth != 8 and not (color_type == 3 and depth in (1, 2, 4)):
+        raise ValueError(f"Unsupported PNG bit depth {depth}.")
+    bpp = max(1, channels * depth // 8)
+    stride = (width * channels * depth + 7) // 8
+    lines = _unfilter(zlib.decompress(bytes(compressed)), width, height, bpp, stride)
+    rows = []
+    for line in lines:
+        row = []
+        for x in range(width):
+            if color_type == 3:
+                bit = x * depth
+                index = (line[bit >> 3] >> (8 - depth - (bit & 7))) & ((1 << depth) - 1)
+                r, g, b = png_palette[index]
+                a = transparency[index] if index < len(transparency) else 0xFF
+            elif color_type == 0:
+                r = g = b = line[x]
+                a = 0xFF
+            elif color_type == 4:
+                r = g = b = line[2 * x]
+                a = line[2 * x + 1]
+            elif color_type == 2:
+                r, g, b = line[3 * x:3 * x + 3]
+                a = 0xFF
+            else:
+                r, g, b, a = line[4 * x:4 * x + 4]
+            row.append((r << 24) | (g << 16) | (b << 8) | a)
+        rows.append(row)
+    return width, height, rows
+
+
+def read_ascii(text: str, custom_palette: dict = None) -> tuple:
+    """
+    Read ASCII art into (width, height, rows) of packed colors, with the same characters
+    and default palette as Bitmap.from_ascii_art.
+    """
+    custom_palette = custom_palette or {}
+    lines = text.strip('\n').split('\n')
+    width = max(len(line) for line in lines)
+    rows = []
+    for line in lines:
+        row = []
+        for char in line:
+            color = custom_palette[char] if char in custom_palette else ascii_palette.get(char)
+            row.append(color.value if color is not None else 0x000000FF)
+        rows.append(row + [0x000000FF] * (width - len(line)))
+    return width, len(rows), rows
+
+
+def _cell(value: int) -> int:
+    """Reduce a packed color to its cell in a 5-bit per channel color cube."""
+    return ((value >> 27) << 10) | (((value >> 19) & 0x1F) << 5) | ((value >> 11) & 0x1F)
+
+
+def _opaque(value: int) -> int:
+    """Treat mostly transparent pixels as black, since LEDs have no transparency."""
+    return value | 0xFF if value & 0xFF >= 0x80 else 0x000000FF
+
+
+def choose_palette(rows: list, max_colors: int = 256) -> list:
+    """
+    Choose up to max_colors packed colors for an image. Images with few enough colors keep
+    them all. Otherwise the colors are grouped by cells of a 5-bit per channel cube, and
+    the most used cells contribute the average of their colors.
+    """
+    counts = {}
+    for row in rows:
+        for value in row:
+            value = _opaque(value)
+            counts[value] = counts.get(value, 0) + 1
+    if len(counts) <= max_colors:
+        return sorted(counts, key=lambda value: (-counts[value], value))
+    cells = {}
+    for value, count in counts.items():
+        total = cells.setdefault(_cell(value), [0, 0, 0, 0])
+        total[0] += count
+        total[1] += (value >> 24) * count
+        total[2] += ((value >> 16) & 0xFF) * count
+        total[3] += ((value >> 8) & 0xFF) * count
+    popular = sorted(cells.values(), key=lambda total: -total[0])[:max_colors]
+    return [((r // n) << 24) | ((g // n) << 16) | ((b // n) << 8) | 0xFF for n, r, g, b in popular]
+
+
+class NearestColor:
+    """
+    A lookup from any color to the index of the nearest palette color, over a 5-bit per
+    channel color cube. Each cell is searched once, the first time a color falls into it,
+    and exact palette colors are always mapped to themselves.
+    """
+    def __init__(self, palette: list):
+        """Initialize the lookup for a palette of packed colors."""
+        self.palette = [(value >> 24, (value >> 16) & 0xFF, (value >> 8) & 0xFF) for value in palette]
+        self.exact = {value | 0xFF: index for index, value in reversed(list(enumerate(palette)))}
+        self.table = bytearray(32768)
+        self.known = bytearray(32768)
+
+    def __call__(self, value: int) -> int:
+        """Return the palette index for a packed color."""
+        value = _opaque(value)
+        index = self.exact.get(value)
+        if index is not None:
+            return index
+        cell = _cell(value)
+        if not self.known[cell]:
+            # Search from the center of the cell
+            r, g, b = ((cell >> 10) << 3) | 4, (((cell >> 5) & 0x1F) << 3) | 4, ((cell & 0x1F) << 3) | 4
+            distances = [(pr - r) ** 2 + (pg - g) ** 2 + (pb - b) ** 2 for pr, pg, pb in self.palette]
+            self.table[cell] = distances.index(min(distances))
+            self.known[cell] = 1
+        return self.table[cell]
+
+
+def compile_asset(width: int, height: int, rows: list, palette: list = None, max_colors: int = 256) -> bytes:
+    """
+    Quantize an image to a palette (chosen with choose_palette if not given) and return it
+    as a compiled asset, with 4-bit indices if the palette has 16 colors or fewer.
+    """
+    palette = palette or choose_palette(rows, max_colors)
+    if len(palette) > 256:
+        raise ValueError("A palette has at most 256 colors.")
+    bits = 4 if len(palette) <= 16 else 8
+    nearest = NearestColor(palette)
+    column_bytes = (height * bits + 7) // 8
+    indices = bytearray(width * column_bytes)
+    for x in range(width):
+        for y in range(height):
+            index = nearest(rows[y][x])
+            if bits == 8:
+                indices[x * column_bytes + y] = index
+            elif y & 1:
+                indices[x * column_bytes + (y >> 1)] |= index
+            else:
+                indices[x * column_bytes + (y >> 1)] |= index << 4
+    header = struct.pack(ASSET_HEADER, ASSET_MAGIC, ASSET_VERSION, bits, width, height, len(palette))
+    return header + struct.pack(f"<{len(palette)}I", *palette) + bytes(indices)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compile PNG images and ASCII art into PIX6T4 Color assets.")
+    parser.add_argument("source", help="a .png image, or a text file of ASCII art")
+    parser.add_argument("-o", "--output", help="the compiled asset, by default the source with a .p6a extension")
+    parser.add_argument("--colors", type=int, default=256, help="maximum number of palette colors")
+    parser.add_argument("--ascii-palette", action="store_true",
+                        help="quantize to the ASCII art palette of pix6t4.bitmap instead of choosing one")
+    parser.add_argument("--tiles", help="compile ASCII art into a tile map, where the nth character is tile n")
+    parser.add_argument("--chunk-size", type=int, default=8, help="width and height of the chunks of a tile map")
+    args = parser.parse_args()
+
+    with open(args.source, "rb") as file:
+        data = file.read()
+    if args.tiles is not None:
+        lines = data.decode().strip('\n').split('\n')
+        tilemap = compile_tilemap(tiles_from_ascii_art(lines, {char: i for i, char in enumerate(args.tiles)}),
+                                  args.chunk_size)
+        output = args.output or args.source.rpartition(".")[0] + ".p6t"
+        with open(output, "wb") as file:
+            file.write(tilemap)
+        print(f"{output}: {max(len(line) for line in lines)}x{len(lines)} tiles, {len(tilemap)} bytes")
+        return 0
+    if data.startswith(PNG_SIGNATURE):
+        width, height, rows = read_png(data)
+    else:
+        width, height, rows = read_ascii(data.decode())
+    palette = None
+    if args.ascii_palette:
+        palette = list(dict.fromkeys(color.value for color in ascii_palette.values()))
+    asset = compile_asset(width, height, rows, palette, args.colors)
+    output = args.output or args.source.rpartition(".")[0] + ".p6a"
+    with open(output, "wb") as file:
+        file.write(asset)
+    colors = struct.unpack_from(ASSET_HEADER, asset)[5]
+    print(f"{output}: {width}x{height}, {colors} colors, {len(asset)} bytes")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
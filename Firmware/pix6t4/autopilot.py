@@ -0,0 +1,148 @@
+import random
+
+from pix6t4.console import Button, PIX6T4Color
+
+DIRECTIONS = (Button.UP, Button.DOWN, Button.LEFT, Button.RIGHT)
+
+
+class Autopilot:
+    """
+    An input source that plays a game instead of a human.
+    `poll` is called once per frame, before the console loop, and presses buttons
+    through the same handlers as the hardware and the emulator.
+    """
+    def poll(self, pix6t4: PIX6T4Color):
+        """Press the buttons for this frame. Override this to implement a policy."""
+        pass
+
+    def tap(self, pix6t4: PIX6T4Color, button: Button):
+        """Press and release a button."""
+        pix6t4.handle_button_pressed(button)
+        pix6t4.handle_button_released(button)
+
+
+class RandomAutopilot(Autopilot):
+    """Taps a random direction now and then. Seed the random module for repeatable runs."""
+    def __init__(self, probability: float = 0.1):
+        self.probability = probability
+
+    def poll(self, pix6t4: PIX6T4Color):
+        if random.random() < self.probability:
+            self.tap(pix6t4, DIRECTIONS[random.randint(0, 3)])
+
+
+# Snake and Ms. Pix-Man directions, as (row, column) steps, and the buttons that set them
+BUTTONS_BY_STEP = {(-1, 0): Button.UP, (1, 0): Button.DOWN, (0, -1): Button.LEFT, (0, 1): Button.RIGHT}
+
+
+def hamiltonian_cycle(size: int = 8) -> list:
+    """
+    Return the (row, column) cells of a cycle that visits every cell of a size x size board
+    once: right along the top row, then back and forth over the other columns, and back up
+    the first column. size must be even.
+    """
+    cycle = [(0, column) for column in range(size)]
+    for row in range(1, size):
+        columns = range(size - 1, 0, -1) if row % 2 == 1 else range(1, size)
+        cycle.extend((row, column) for column in columns)
+    cycle.extend((row, 0) for row in range(size - 1, 0, -1))
+    return cycle
+
+
+class SnakeAutopilot(Autopilot):
+    """
+    Plays Snake by following a Hamiltonian cycle of the board, which can't fail and
+    eventually fills the whole board: the longest, worst case workload of the game.
+    While the snake is short, it takes shortcuts along the cycle towards the nearest
+    apple, as long as they can't make it overtake its own tail.
+    """
+    def __init__(self, size: int = 8, shortcuts: bool = True):
+        self.size = size
+        self.shortcuts = shortcuts
+        self.cycle = hamiltonian_cycle(size)
+        self.order = {cell: i for i, cell in enumerate(self.cycle)}
+        self.last_head = None
+
+    def distance(self, start: tuple, end: tuple) -> int:
+        """Return how many steps along the cycle lead from start to end."""
+        return (self.order[end] - self.order[start]) % len(self.cycle)
+
+    def next_cell(self, game) -> tuple:
+        """Choose the cell the snake should move to next."""
+        head = game.snake[-1]
+        following = self.cycle[(self.order[head] + 1) % len(self.cycle)]
+        if not self.shortcuts or not game.apples or len(game.snake) > len(self.cycle) // 2:
+            return following
+        to_tail = self.distance(head, game.snake[0])
+        to_apple = min(self.distance(head, apple) for apple in game.apples)
+        best, best_distance = following, 1
+        for step in BUTTONS_BY_STEP:
+            cell = ((head[0] + step[0]) % self.size, (head[1] + step[1]) % self.size)
+            distance = self.distance(head, cell)
+            # Leave room for the snake to grow by a few cells before reaching its tail
+            if best_distance < distance <= to_apple and distance < to_tail - 4:
+                best, best_distance = cell, distance
+        return best
+
+    def poll(self, pix6t4: PIX6T4Color):
+        game = pix6t4.current_game
+        head = game.snake[-1]
+        if not game.alive or head == self.last_head:
+            return  # Only decide once per move
+        self.last_head = head
+        cell = self.next_cell(game)
+        step = ((cell[0] - head[0] + 1) % self.size - 1, (cell[1] - head[1] + 1) % self.size - 1)
+        if step != game.direction:
+            self.tap(pix6t4, BUTTONS_BY_STEP[step])
+
+
+class MsPixManAutopilot(Autopilot):
+    """
+    Plays Ms. Pix-Man by walking to the nearest candy or cookie, found with a
+    breadth-first search over the maze that wraps around like the game does.
+    """
+    def __init__(self):
+        self.last_position = None
+
+    def first_step(self, game):
+        """Return the first step of the shortest path to food, or None if there's none left."""
+        maze = game.maze
+        height = maze.height
+        width = maze.width
+        start = (game.player_y, game.player_x)
+        first_steps = {start: None}
+        frontier = [start]
+        while frontier:
+            next_frontier = []
+            for y, x in frontier:
+                for step in BUTTONS_BY_STEP:
+                    cell = ((y + step[0]) % height, (x + step[1]) % width)
+                    if cell in first_steps:
+                        continue
+                    tile = maze.get(cell[0], cell[1])
+                    if tile == game.WALL:
+                        continue
+                    first_steps[cell] = first_steps[(y, x)] or step
+                    if tile == game.CANDY or tile == game.COOKIE:
+                        return first_steps[cell]
+                    next_frontier.append(cell)
+            frontier = next_frontier
+        return None
+
+    def poll(self, pix6t4: PIX6T4Color):
+        game = pix6t4.current_game
+        position = (game.player_y, game.player_x)
+        if position == self.last_position and game.direction != (0, 0):
+            return  # Only plan once per move
+        self.last_position = position
+        step = self.first_step(game)
+        if step is not None and step != game.direction:
+            self.tap(pix6t4, BUTTONS_BY_STEP[step])
+
+
+# Autopilots by name, for the command line of bulk simulations
+autopilots = {
+    "random": RandomAutopilot,
+    "snake": SnakeAutopilot,
+    "mspixman": MsPixManAutopilot,
+}
@@ -0,0 +1,255 @@
+import os
+import struct
+import time
+from array import array
+
+from pix6t4.animation import Animation
+from pix6t4.color import Color
+
+# Baked animation file layout: a small header followed by the frames.
+# Each frame is width * height packed 0xRRGGBBAA colors (little-endian uint32),
+# in the same column-major order as the PIX6T4Color.pixels grid.
+# The declared period and bake_version of the animation tell when the frames are out of date.
+MAGIC = b"P6BK"
+VERSION = 2
+HEADER = "<4sBBBHHH"  # magic, version, width, height, frame count, period, bake version
+HEADER_SIZE = struct.calcsize(HEADER)
+
+
+def _snapshot(pixels, frame: array, offset: int = 0):
+    """Copy the packed values of a grid of colors into a frame table."""
+    for column in pixels:
+        for color in column:
+            frame[offset] = color.value
+            offset += 1
+
+
+def _frame_table(size: int) -> array:
+    """Allocate a zeroed table of packed colors without building a temporary list."""
+    return array("I", bytes(4 * size))
+
+
+def _divisors(n: int):
+    """Return the divisors of n in increasing order."""
+    return [d for d in range(1, n + 1) if n % d == 0]
+
+
+def find_period(animation: Animation, period: int = None) -> int:
+    """
+    Render one full declared period of an animation and return the shortest period that
+    actually reproduces it. BeachBall for example declares 360 frames but repeats after 90.
+    Only a hash of each frame is kept, so this runs in constant memory.
+    """
+    period = period or animation.period
+    pixels = animation.pix6t4.pixels
+    frame = _frame_table(len(pixels) * len(pixels[0]))
+    hashes = []
+    animation.frame_number = 0
+    for _ in range(period):
+        animation.draw_frame()
+        _snapshot(animation.pix6t4.pixels, frame)
+        hashes.append(hash(bytes(frame)))
+    animation.frame_number = 0
+    for candidate in _divisors(period):
+        if all(hashes[k] == hashes[k % candidate] for k in range(period)):
+            return candidate
+    return period
+
+
+def bake(animation: Animation, stream, frames: int = None) -> int:
+    """
+    Render `frames` frames of an animation (by default its shortest period) and write
+    them to a binary stream. Returns the number of frames written.
+    """
+    frames = frames or find_period(animation)
+    pixels = animation.pix6t4.pixels
+    width = len(pixels)
+    height = len(pixels[0])
+    frame = _frame_table(width * height)
+    stream.write(struct.pack(HEADER, MAGIC, VERSION, width, height, frames, (animation.period or 0) & 0xFFFF,
+                             animation.bake_version & 0xFFFF))
+    animation.frame_number = 0
+    for _ in range(frames):
+        animation.draw_frame()
+        _snapshot(animation.pix6t4.pixels, frame)
+        stream.write(frame)
+    animation.frame_number = 0
+    return frames
+
+
+def bake_to_file(animation: Animation, path: str) -> int:
+    """Bake an animation into a file, creating its folder if needed."""
+    folder = path.rpartition("/")[0]
+    if folder:
+        try:
+            os.mkdir(folder)
+        except OSError:
+            pass  # Already exists
+    with open(path, "wb") as stream:
+        return bake(animation, stream)
+
+
+class BakedAnimation(Animation):
+    """
+    Plays back a periodic animation from a precomputed frame table.
+    The frames are baked offline with `bake_to_file`, or lazily on the first call to
+    `draw_frame`. Playback reads the table from flash a chunk of frames at a time and
+    copies packed values into the framebuffer instead of recomputing every pixel.
+    If the filesystem is read-only, the table is baked into RAM instead, and if that
+    doesn't fit either, the original animation is played live.
+    """
+    def __init__(self, animation: Animation, path: str = None, chunk_frames: int = 8):
+        super().__init__(animation.pix6t4)
+        self.animation = animation
+        self.path = path if path is not None else f"baked/{type(animation).__name__.lower()}.p6b"
+        self.chunk_frames = chunk_frames
+        self.frames = 0
+        self.frame_size = len(self.pix6t4.pixels) * len(self.pix6t4.pixels[0])
+        self.file = None
+        self.table = None  # In-RAM frame table, when the frames can't be read from flash
+        self.chunk = None
+        self.chunk_view = None
+        self.chunk_index = -1
+        # Two sets of colors are updated in place on alternate frames, so the frame that
+        # was handed out last is never modified while somebody may still be reading it.
+        self.cells = [
+            [[Color(0) for _ in column] for column in self.pix6t4.pixels] for _ in range(2)]
+        self.cell_set = 0
+        self.live = False
+        self.live_frame_ns = 0
+        self.baked_frame_ns = 0
+        self.played_frames = 0
+
+    def load(self):
+        """Open the baked frame table, baking it first if it doesn't exist yet or is out of date."""
+        self.measure_live_frame()
+        self.file = self.open_table()
+        if self.file is None:
+            try:
+                bake_to_file(self.animation, self.path)
+            except OSError:
+                pass  # Read-only filesystem
+            self.file = self.open_table()
+        if self.file is None:
+            self.load_into_ram()
+            return
+        self.chunk = _frame_table(self.chunk_frames * self.frame_size)
+        self.chunk_view = memoryview(self.chunk)
+
+    def open_table(self):
+        """
+        Open the baked file and read its frame count, or return None if it's missing, was baked
+        for another screen size or version of the animation, or is cut short.
+        """
+        try:
+            file = open(self.path, "rb")
+        except OSError:
+            return None
+        header = file.read(HEADER_SIZE)
+        if len(header) == HEADER_SIZE:
+            magic, version, width, height, frames, period, bake_version = struct.unpack(HEADER, header)
+            pixels = self.pix6t4.pixels
+            if (magic == MAGIC and version == VERSION and width == len(pixels) and height == len(pixels[0])
+                    and period == (self.animation.period or 0) & 0xFFFF
+                    and bake_version == self.animation.bake_version & 0xFFFF and frames > 0
+                    and os.stat(self.path)[6] == HEADER_SIZE + frames * self.frame_size * 4):
+                self.frames = frames
+                return file
+        file.close()
+        return None
+
+    def load_into_ram(self):
+        """Bake the frame table into RAM, falling back to live rendering if it doesn't fit."""
+        try:
+            frames = find_period(self.animation)
+            table = _frame_table(frames * self.frame_size)
+            self.animation.frame_number = 0
+            for frame in range(frames):
+                self.animation.draw_frame()
+                _snapshot(self.pix6t4.pixels, table, frame * self.frame_size)
+            self.animation.frame_number = 0
+            self.table = table
+            self.frames = frames
+        except MemoryError:
+            self.live = True
+
+    def measure_live_frame(self):
+        """Time one frame of the original animation, to report the CPU time saved."""
+        start = time.monotonic_ns()
+        self.animation.draw_frame()
+        self.live_frame_ns = time.monotonic_ns() - start
+
+    def read_chunk(self, index: int):
+        """Read a chunk of frames from the baked file into the chunk buffer."""
+        self.file.seek(HEADER_SIZE + index * self.chunk_frames * self.frame_size * 4)
+        self.file.readinto(self.chunk_view)
+        self.chunk_index = index
+
+    def draw_frame(self):
+        """Copy the next baked frame into the framebuffer."""
+        if self.frames == 0 and not self.live:
+            self.load()
+        if self.live:
+            self.animation.draw_frame()
+            return
+        start = time.monotonic_ns()
+        frame = self.frame_number
+        if self.table is not None:
+            source = self.table
+            i = frame * self.frame_size
+        else:
+            chunk_index = frame // self.chunk_frames
+            if chunk_index != self.chunk_index:
+                self.read_chunk(chunk_index)
+            source = self.chunk
+            i = (frame - chunk_index * self.chunk_frames) * self.frame_size
+        self.cell_set ^= 1
+        for column, cells in zip(self.pix6t4.pixels, self.cells[self.cell_set]):
+            for y, cell in enumerate(cells):
+                cell.value = source[i]
+                column[y] = cell
+                i += 1
+        self.frame_number = (frame + 1) % self.frames
+        self.baked_frame_ns += time.monotonic_ns() - start
+        self.played_frames += 1
+
+    def report(self) -> dict:
+        """
+        Report the cost of the baked animation: the RAM it holds, the flash it uses
+        and the CPU time saved per frame compared with rendering it live.
+        """
+        ram = 2 * self.frame_size * 12  # Two sets of colors, pointer + object + int value
+        if self.table is not None:
+            ram += len(self.table) * 4
+        elif self.chunk is not None:
+            ram += len(self.chunk) * 4
+        baked_frame_ns = self.baked_frame_ns // self.played_frames if self.played_frames else 0
+        return {
+            "frames": self.frames,
+            "declared_period": self.animation.period,
+            "ram_bytes": ram,
+            "flash_bytes": 0 if self.file is None else HEADER_SIZE + self.frames * self.frame_size * 4,
+            "live_frame_us": self.live_frame_ns // 1000,
+            "baked_frame_us": baked_frame_ns // 1000,
+            "saved_frame_us": (self.live_frame_ns - baked_frame_ns) // 1000 if self.live_frame_ns else 0,
+        }
+
+
+def main():
+    """
+    Bake an animation offline, before copying it to the device:
+    python -m pix6t4.baked games.attractmode BeachBall [path]
+    """
+    import sys
+    from pix6t4.console import PIX6T4Color
+
+    module_name, class_name = sys.argv[1], sys.argv[2]
+    module = __import__(module_name, None, None, [class_name])
+    animation = getattr(module, class_name)(PIX6T4Color())
+    path = sys.argv[3] if len(sys.argv) > 3 else f"baked/{class_name.lower()}.p6b"
+    frames = bake_to_file(animation, path)
+    print(f"Baked {frames} frames of {class_name} into {path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,321 @@
+import gc
+import random
+import sys
+import time
+
+from pix6t4.bitmap import Bitmap
+from pix6t4.collision import Buckets, Mask, Sprite
+from pix6t4.color import Color
+from pix6t4.fixedpoint import blend, brightness_level, hsl_to_rgba, rgba_to_hsl, scale
+from pix6t4.headless import FakeNeoPixel, PIX6T4ColorHeadless
+from pix6t4.indexed import IndexedFramebuffer
+from pix6t4.pixelbuffer import write_per_pixel
+
+try:
+    import tracemalloc
+except ImportError:
+    tracemalloc = None  # CircuitPython measures allocations on its own heap with gc.mem_alloc
+
+# Microbenchmarks of the primitives that run thousands of times per second, with a
+# regression gate against the baselines recorded in bench_baselines.json.
+# On a computer: python -m pix6t4.bench [--threshold 1.5] [--update]
+# On the device, from the serial console: from pix6t4 import bench; bench.report()
+# then check the captured output on a computer: python -m pix6t4.bench --serial-log capture.txt
+
+THRESHOLD = 1.5  # An op regresses when it costs more than this many times its baseline
+# Plain interpreter work timed with every run. Ops are compared to their baselines relative
+# to it, so a slower or busier machine than the one that recorded them doesn't fail the gate.
+CALIBRATION = "calibration"
+
+TITLE = """
+ ###
+#ggg##
+#gYggg#
+#gggg#r
+ ####  r
+  #gg#
+   #gg#
+   #gg#
+"""
+
+
+def calibrate(i: int) -> int:
+    total = 0
+    for j in range(16):
+        total += (i ^ j) & 7
+    return total
+
+
+def suite() -> list:
+    """Return the benchmarks as (name, operation) pairs, where operations take the iteration number."""
+    color = Color.fromRGB(24, 98, 118)
+    translucent = Color.fromRGBA(100, 200, 255, 0.75)
+    level = brightness_level(0.1)
+    bitmap = Bitmap.from_ascii_art(TITLE)
+    pix6t4 = PIX6T4ColorHeadless()
+    return [
+        ("Color.fromRGBA", lambda i: Color.fromRGBA(i & 0xFF, 98, 118, 0.5)),
+        ("Color.fromHSLA", lambda i: Color.fromHSLA(i % 360, 100, 50)),
+        ("Color.toHSLA", lambda i: color.toHSLA()),
+        ("Color.with_brightness", lambda i: color.with_brightness(0.1)),
+        ("Color.paint_on", lambda i: translucent.paint_on(color)),
+        # The integer color math the Color methods are built on
+        ("fixedpoint.hsl_to_rgba", lambda i: hsl_to_rgba(i % 360, 100, 50)),
+        ("fixedpoint.rgba_to_hsl", lambda i: rgba_to_hsl(color.value)),
+        ("fixedpoint.scale", lambda i: scale(color.value, level)),
+        ("fixedpoint.blend", lambda i: blend(translucent.value, color.value)),
+        ("Bitmap.from_ascii_art", lambda i: Bitmap.from_ascii_art(TITLE)),
+        ("Bitmap.blit", lambda i: bitmap.blit(0, 0, 8, 8, pix6t4.pixels)),
+        ("PIX6T4Color.plot", lambda i: pix6t4.plot(i & 7, (i >> 3) & 7, color)),
+        ("PIX6T4Color.cls", lambda i: pix6t4.cls()),
+    ] + render_suite() + geometry_suite() + collision_suite()
+
+
+def render_suite() -> list:
+    """Writing a frame to the LEDs one pixel at a time, and through the packed buffer."""
+    pix6t4 = PIX6T4ColorHeadless()
+    for x in range(8):
+        for y in range(8):
+            pix6t4.plot(x, y, Color.fromHSLA((x * 8 + y) * 5, 100, 50))
+    leds = FakeNeoPixel(None, pix6t4.layout.num_leds, auto_write=False)
+    buffer = pix6t4.pixel_buffer
+
+    def per_pixel(i):
+        write_per_pixel(leds, pix6t4.layout, pix6t4.pixels, pix6t4.logo, 0.1)
+        leds.show()
+
+    def packed(i):
+        buffer.set_brightness(0.1)
+        leds.transmit(buffer.pack(pix6t4.pixels, pix6t4.logo))
+
+    return [("render.per_pixel", per_pixel), ("render.packed", packed)]
+
+
+def geometry_suite() -> list:
+    """How the costs per frame grow with the number of 8x8 panels, at 8x8, 16x16 and 32x32 pixels."""
+    ops = []
+    for panels in (1, 2, 4):
+        pix6t4 = PIX6T4ColorHeadless(panels_across=panels, panels_down=panels)
+        size = f"{pix6t4.width}x{pix6t4.height}"
+        for x in range(pix6t4.height):
+            for y in range(pix6t4.width):
+                pix6t4.plot(x, y, Color.fromHSLA((x + y) * 10 % 360, 100, 50))
+        framebuffer = IndexedFramebuffer(pix6t4.width, pix6t4.height, palette=[Color.RED, Color.GREEN])
+
+        def switch(i, pix6t4=pix6t4):
+            pix6t4.go_to_next_game()
+            pix6t4.loop()
+
+        ops += [
+            (f"PixelBuffer.pack@{size}", lambda i, pix6t4=pix6t4: pix6t4.pixel_buffer.pack(pix6t4.pixels, pix6t4.logo)),
+            (f"PixelBuffer.pack_indexed@{size}",
+             lambda i, pix6t4=pix6t4, framebuffer=framebuffer: pix6t4.pixel_buffer.pack_indexed(framebuffer, pix6t4.logo)),
+            (f"PIX6T4Color.cls@{size}", lambda i, pix6t4=pix6t4: pix6t4.cls()),
+            (f"switch_transition@{size}", switch),
+            (f"title_screen_loop@{size}", lambda i, pix6t4=pix6t4: pix6t4.loop()),
+        ]
+    return ops
+
+
+def collision_suite() -> list:
+    """A snake's head against its body, and many sprites against each other, pairwise and in buckets."""
+    random.seed(1)
+    body = [(x, y) for x in range(8) for y in range(8)][:40]
+    mask = Mask.from_cells(body)
+    ghost = Mask.from_cells([(0, 1), (1, 0), (1, 1), (1, 2), (2, 0), (2, 2)], 3, 3)
+    ops = [
+        ("collision.cell_list", lambda i: (i & 7, (i >> 3) & 7) in body),
+        ("Mask.test", lambda i: mask.test(i & 7, (i >> 3) & 7)),
+    ]
+    for count in (16, 64, 256):
+        sprites = [Sprite(ghost, random.randint(0, 29), random.randint(0, 29)) for _ in range(count)]
+
+        def pairwise(i, sprites=sprites):
+            for a in range(len(sprites)):
+                for b in range(a + 1, len(sprites)):
+                    sprites[a].hits(sprites[b])
+
+        def bucketed(i, sprites=sprites, buckets=Buckets(4)):
+            buckets.clear()
+            for sprite in sprites:
+                buckets.add(sprite)
+            buckets.pairs()
+
+        ops += [(f"collision.pairwise@{count}", pairwise), (f"Buckets.pairs@{count}", bucketed)]
+    return ops
+
+
+def time_per_op(operation, min_ns: int = 20000000, repeats: int = 5) -> int:
+    """
+    Return the best cost of an operation in nanoseconds, over `repeats` runs that each
+    last at least `min_ns`, so that coarse clocks like the device's are still precise.
+    """
+    gc.collect()  # Don't make the op pay for the garbage of the ones before it
+    iterations = 1
+    while True:
+        start = time.monotonic_ns()
+        for i in range(iterations):
+            operation(i)
+        elapsed = time.monotonic_ns() - start
+        if elapsed >= min_ns:
+            break
+        iterations *= 4
+    best = elapsed
+    for _ in range(repeats - 1):
+        start = time.monotonic_ns()
+        for i in range(iterations):
+            operation(i)
+        best = min(best, time.monotonic_ns() - start)
+    return best // iterations
+
+
+def bytes_per_op(operation, count: int = 16) -> int:
+    """
+    Return the bytes allocated by one call of an operation, on average. The device counts
+    every allocation on its heap while collection is off. CPython counts the memory that
+    was in use at the peak of each call, which misses temporaries freed along the way.
+    """
+    operation(0)  # Fill the caches that are built on first use
+    gc.collect()
+    if tracemalloc is not None:
+        tracemalloc.start()
+        total = 0
+        for i in range(count):
+            start = tracemalloc.get_traced_memory()[0]
+            tracemalloc.reset_peak()
+            operation(i)
+            total += tracemalloc.get_traced_memory()[1] - start
+        tracemalloc.stop()
+        return total // count
+    gc.disable()
+    start = gc.mem_alloc()
+    for i in range(count):
+        operation(i)
+    used = gc.mem_alloc() - start
+    gc.enable()
+    return used // count
+
+
+def median(values) -> int:
+    """Return the middle one of some values."""
+    values = sorted(values)
+    return values[len(values) // 2]
+
+
+def report(min_ns: int = 20000000, names=None, output=print) -> dict:
+    """
+    Run the suite, pass one line per benchmark to `output` unless it's None, and return
+    {name: (ns/op, bytes/op)}. The calibration op always runs, before every op and once
+    more at the end, and its time is the median of those runs, so one lucky or unlucky
+    moment of the machine doesn't scale the whole run.
+    """
+    results = {}
+    samples = []
+    for name, operation in suite() + [(CALIBRATION, calibrate)]:
+        if name == CALIBRATION:
+            results[name] = (median(samples + [time_per_op(calibrate, min_ns, 1)]), bytes_per_op(calibrate))
+        elif names is None or name in names:
+            samples.append(time_per_op(calibrate, min_ns, 1))
+            results[name] = (time_per_op(operation, min_ns), bytes_per_op(operation))
+        else:
+            continue
+        if output is not None:
+            output(f"{name:<32}{results[name][0]:>10} ns/op{results[name][1]:>8} B/op")
+    return results
+
+
+def parse_report(text: str) -> dict:
+    """Read the results back from the printed report, such as a capture of the device's serial console."""
+    results = {}
+    for line in text.splitlines():
+        fields = line.split()
+        if len(fields) == 5 and fields[2] == "ns/op" and fields[4] == "B/op":
+            results[fields[0]] = (int(fields[1]), int(fields[3]))
+    return results
+
+
+def typical(runs: list) -> dict:
+    """
+    Combine the results of several runs into one, with the median of each op's time relative
+    to the calibration op of its run, so baselines don't come from one lucky or unlucky run.
+    """
+    calibration = median(run[CALIBRATION][0] for run in runs)
+    return {name: (round(calibration * median(run[name][0] / run[CALIBRATION][0] for run in runs)),
+                   max(run[name][1] for run in runs))
+            for name in runs[0]}
+
+
+def regressions(results: dict, baselines: dict, threshold: float = THRESHOLD) -> list:
+    """
+    Return a message for every op that costs more than `threshold` times its baseline, in
+    time or in allocated bytes. Times are scaled by how much slower the calibration op ran
+    than in the baselines, when both have it. An op that didn't allocate in its baseline
+    regresses as soon as it allocates. Ops without a baseline are not checked.
+    """
+    speed, note = 1.0, ""
+    if CALIBRATION in results and CALIBRATION in baselines:
+        speed = results[CALIBRATION][0] / max(baselines[CALIBRATION]["ns"], 1)
+        note = f" (calibration at {speed:.2f}x its baseline)"
+    messages = []
+    for name, (ns, allocated) in results.items():
+        if name not in baselines or name == CALIBRATION:
+            continue
+        baseline_ns, baseline_bytes = baselines[name]["ns"], baselines[name]["bytes"]
+        if ns > baseline_ns * speed * threshold:
+            messages.append(f"{name}: {ns} ns/op, baseline {baseline_ns} ns/op{note}")
+        if allocated > baseline_bytes * threshold:
+            messages.append(f"{name}: {allocated} B/op, baseline {baseline_bytes} B/op")
+    return messages
+
+
+def main():
+    import argparse
+    import json
+    import os
+
+    baselines_path = os.path.join(os.path.dirname(__file__), "bench_baselines.json")
+    parser = argparse.ArgumentParser(description="Microbenchmarks of the PIX6T4 Color primitives.")
+    parser.add_argument("--threshold", type=float, help=f"regression threshold, by default the baselines' or {THRESHOLD}")
+    parser.add_argument("--update", action="store_true", help="record the results as the new baselines")
+    parser.add_argument("--serial-log", help="check the report captured from a device instead of running here")
+    parser.add_argument("--min-ms", type=int, default=20, help="minimum duration of each timed run")
+    parser.add_argument("--runs", type=int, default=5, help="runs of the suite that --update takes the median of")
+    parser.add_argument("--retries", type=int, default=3, help="times to run the ops that regressed again")
+    args = parser.parse_args()
+
+    if args.serial_log:
+        with open(args.serial_log) as file:
+            results = parse_report(file.read())
+        platform = "circuitpython"
+    else:
+        results = report(args.min_ms * 1000000)
+        if args.update:
+            runs = [results] + [report(args.min_ms * 1000000, output=None) for _ in range(args.runs - 1)]
+            results = typical(runs)
+        platform = sys.implementation.name
+    with open(baselines_path) as file:
+        baselines = json.load(file)
+    if args.update:
+        baselines.setdefault(platform, {}).update(
+            {name: {"ns": ns, "bytes": allocated} for name, (ns, allocated) in results.items()})
+        with open(baselines_path, "w") as file:
+            json.dump(baselines, file, indent=2, sort_keys=True)
+            file.write("\n")
+        print(f"Updated the {platform} baselines.")
+        return 0
+    threshold = args.threshold or baselines.get("threshold", THRESHOLD)
+    messages = regressions(results, baselines.get(platform, {}), threshold)
+    for _ in range(0 if args.serial_log else args.retries):
+        if not messages:
+            break
+        # A burst of load on the machine can make any op slow once, so only ops that stay slow count
+        again = report(args.min_ms * 1000000, names={message.split(":")[0] for message in messages}, output=None)
+        results = {name: min(result, again.get(name, result)) for name, result in results.items()}
+        messages = regressions(results, baselines.get(platform, {}), threshold)
+    for message in messages:
+        print(f"REGRESSION {message}")
+    return 1 if messages else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,5 +1,15 @@
+import struct
+
 from pix6t4.color import Color
 
+# Compiled asset layout, as written by pix6t4.assets: a small header, the palette as packed
+# 0xRRGGBBAA colors (little-endian uint32), then the 4- or 8-bit palette indices in the
+# column-major order of PIX6T4Color.pixels. Each column is padded to a whole number of bytes.
+ASSET_MAGIC = b"P6AS"
+ASSET_VERSION = 1
+ASSET_HEADER = "<4sBBHHH"  # magic, version, bits per index, width, height, palette size
+ASSET_HEADER_SIZE = struct.calcsize(ASSET_HEADER)
+
 palette = {
     ' ': Color.WHITE,
     'R': Color.RED,
@@ -61,4 +71,89 @@ class Bitmap:
         if 0 <= x < self.width and 0 <= y < self.height:
             self.pixels[y][x] = color
 
+    @staticmethod
+    def from_asset(path: str):
+        """Create a bitmap from a compiled asset file."""
+        with Asset(path) as asset:
+            bitmap = Bitmap(asset.width, asset.height)
+            for x in range(asset.width):
+                column = asset.read_column(x)
+                for y in range(asset.height):
+                    bitmap.pixels[y][x] = asset.colors[asset.index(column, y)]
+        return bitmap
+
+
+class Asset:
+    """
+    A compiled asset, read from a file or a binary stream. Only the header and palette are
+    loaded up front: columns of indices are read from flash on demand into a reusable
+    buffer, so drawing doesn't build intermediate Python objects.
+    """
+    def __init__(self, file):
+        """Open an asset from a path or from a binary stream positioned at its start."""
+        self.stream = open(file, "rb") if isinstance(file, str) else file
+        self.owns_stream = isinstance(file, str)
+        self.start = self.stream.tell()
+        magic, version, self.bits, self.width, self.height, size = struct.unpack(
+            ASSET_HEADER, self.stream.read(ASSET_HEADER_SIZE))
+        if magic != ASSET_MAGIC or version != ASSET_VERSION or self.bits not in (4, 8):
+            raise ValueError("Not a compiled asset.")
+        palette = self.stream.read(4 * size)
+        self.colors = [Color(struct.unpack_from("<I", palette, 4 * i)[0]) for i in range(size)]
+        self.column_bytes = (self.height * self.bits + 7) // 8
+        self.data_start = self.start + ASSET_HEADER_SIZE + 4 * size
+        self.column = bytearray(self.column_bytes)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def close(self):
+        """Close the file, if the asset opened it."""
+        if self.owns_stream:
+            self.stream.close()
+
+    def read_column(self, x: int) -> bytearray:
+        """Read the indices of a column into the column buffer, and return it."""
+        self.stream.seek(self.data_start + x * self.column_bytes)
+        self.stream.readinto(self.column)
+        return self.column
+
+    def index(self, column: bytearray, y: int) -> int:
+        """Return the palette index at row y of a column read with read_column."""
+        if self.bits == 8:
+            return column[y]
+        byte = column[y >> 1]
+        return byte & 0x0F if y & 1 else byte >> 4
+
+    def blit(self, target, x: int = 0, y: int = 0):
+        """Stream the asset onto a matrix of colors such as PIX6T4Color.pixels, with its top-left corner at (x, y)."""
+        colors = self.colors
+        for source_x in range(max(0, -x), min(self.width, len(target) - x)):
+            column = self.read_column(source_x)
+            target_column = target[x + source_x]
+            for source_y in range(max(0, -y), min(self.height, len(target_column) - y)):
+                target_column[y + source_y] = colors[self.index(column, source_y)]
+
+    def load_into(self, framebuffer):
+        """
+        Copy the palette and indices into an IndexedFramebuffer. When the asset has the same
+        size and index width as the framebuffer, the indices are read in a single call.
+        """
+        if len(self.colors) > len(framebuffer.colors):
+            raise ValueError("The asset has more colors than the framebuffer palette.")
+        for index, color in enumerate(self.colors):
+            framebuffer.set_color(index, color)
+        if (self.bits == framebuffer.bits and self.width == framebuffer.width
+                and self.height == framebuffer.height and self.column_bytes * 8 == self.height * self.bits):
+            self.stream.seek(self.data_start)
+            self.stream.readinto(framebuffer.indices)
+            return
+        for x in range(min(self.width, framebuffer.width)):
+            column = self.read_column(x)
+            for y in range(min(self.height, framebuffer.height)):
+                framebuffer.set(x * framebuffer.height + y, self.index(column, y))
+
 main = Bitmap
\ No newline at end of file
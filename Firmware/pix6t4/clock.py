@@ -0,0 +1,131 @@
+import time
+
+# Commands of the emulator clock, see EmulatorClock.command
+FASTER = 0
+SLOWER = 1
+NORMAL = 2
+PAUSE = 3
+STEP = 4
+
+
+class Clock:
+    """Monotonic time for the console and its games: real time, as on the device."""
+    speed = 1
+    paused = False
+
+    def monotonic_ns(self) -> int:
+        """Return the time in nanoseconds."""
+        return time.monotonic_ns()
+
+    def monotonic(self) -> float:
+        """Return the time in seconds."""
+        return self.monotonic_ns() / 1000000000
+
+    def tick(self):
+        """Called before each frame of game logic."""
+        pass
+
+    def real_duration(self, duration: int) -> int:
+        """Convert a duration in milliseconds of console time, such as a beep, to real time."""
+        return duration
+
+    def sleep_until(self, due_ns: int, input_pending=None):
+        """
+        Sleep until the clock reaches `due_ns`. If `input_pending` is given, it's checked
+        while sleeping, and the sleep ends early when it returns True.
+        """
+        while True:
+            remaining = due_ns - self.monotonic_ns()
+            if remaining <= 0 or (input_pending is not None and input_pending()):
+                return
+            time.sleep(min(remaining, 20000000) / 1000000000)
+
+
+class VirtualClock(Clock):
+    """
+    Time that only moves when the console runs a frame, by a fixed frame interval.
+    Everything that depends on it behaves the same however fast the frames actually run.
+    """
+    def __init__(self, frame_ns: int = 50000000):
+        """Initialize the clock at zero, with the duration of a frame."""
+        self.frame_ns = frame_ns
+        self.now_ns = 0
+        self.ticks = 0
+
+    def monotonic_ns(self) -> int:
+        return self.now_ns
+
+    def tick(self):
+        self.now_ns += self.frame_ns
+        self.ticks += 1
+
+    def sleep_until(self, due_ns: int, input_pending=None):
+        """Return at once: virtual time only moves with frames, so the next frame is always due."""
+        return
+
+
+class EmulatorClock(VirtualClock):
+    """
+    A virtual clock driven by real time at an adjustable speed: in fast-forward, several
+    frames of game logic run for each displayed frame, in slow motion fewer than one.
+    It can also be paused, and stepped one frame at a time while paused.
+    """
+    speeds = (0.125, 0.25, 0.5, 1, 2, 4, 8, 16)
+    # Never run more frames than this per displayed frame, so a slow game can't snowball
+    max_ticks = 16
+
+    def __init__(self, frame_ns: int = 50000000, real=time.monotonic_ns):
+        """Initialize the clock at normal speed, on a source of real time in nanoseconds."""
+        super().__init__(frame_ns)
+        self.real = real
+        self.speed_index = self.speeds.index(1)
+        self.paused = False
+        self.pending_steps = 0
+        self.last_real_ns = None
+        self.debt_ns = 0
+
+    @property
+    def speed(self) -> float:
+        return self.speeds[self.speed_index]
+
+    def command(self, command: int):
+        """Change speed, pause or resume, or step one frame."""
+        if command == FASTER:
+            self.speed_index = min(len(self.speeds) - 1, self.speed_index + 1)
+        elif command == SLOWER:
+            self.speed_index = max(0, self.speed_index - 1)
+        elif command == NORMAL:
+            self.speed_index = self.speeds.index(1)
+        elif command == PAUSE:
+            self.paused = not self.paused
+            self.pending_steps = 0
+        elif command == STEP:
+            self.paused = True
+            self.pending_steps += 1
+
+    def ticks_due(self) -> int:
+        """Return how many frames of game logic to run for the real time elapsed since the last call."""
+        now = self.real()
+        elapsed = 0 if self.last_real_ns is None else now - self.last_real_ns
+        self.last_real_ns = now
+        if self.paused:
+            steps = self.pending_steps
+            self.pending_steps = 0
+            return steps
+        self.debt_ns += int(elapsed * self.speed)
+        ticks = self.debt_ns // self.frame_ns
+        if ticks > self.max_ticks:
+            ticks = self.max_ticks
+            self.debt_ns = 0
+        else:
+            self.debt_ns -= ticks * self.frame_ns
+        return ticks
+
+    def real_duration(self, duration: int) -> int:
+        return max(1, int(duration / self.speed))
+
+    def describe(self) -> str:
+        """Describe the state of the clock, for the window title."""
+        if self.paused:
+            return "paused"
+        return "" if self.speed == 1 else f"x{self.speed:g}"
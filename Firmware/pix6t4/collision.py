@@ -0,0 +1,142 @@
+class Mask:
+    """
+    The cells a sprite or a layer occupies, as one int per row with a bit per cell, with the
+    same coordinates as PIX6T4Color.plot: bit y of row x is the cell at (x, y). Testing a
+    cell is a shift and an AND, and two masks overlap if any pair of rows ANDs to non-zero,
+    so checking a sprite against a whole layer costs one operation per row of the sprite.
+    """
+    def __init__(self, width: int = 8, height: int = 8):
+        """Initialize an empty mask of height rows of width cells."""
+        self.width = width
+        self.height = height
+        self.rows = [0] * height
+
+    @staticmethod
+    def from_cells(cells, width: int = 8, height: int = 8) -> 'Mask':
+        """Create a mask from (x, y) cells."""
+        mask = Mask(width, height)
+        for x, y in cells:
+            mask.set(x, y)
+        return mask
+
+    @staticmethod
+    def from_ascii_art(lines: list, occupied: str = "#") -> 'Mask':
+        """Create a mask from lines of text, where the characters in `occupied` are set."""
+        mask = Mask(max(len(line) for line in lines), len(lines))
+        for x, line in enumerate(lines):
+            row = 0
+            for y, char in enumerate(line):
+                if char in occupied:
+                    row |= 1 << y
+            mask.rows[x] = row
+        return mask
+
+    def set(self, x: int, y: int):
+        """Occupy the cell at (x, y)."""
+        self.rows[x] |= 1 << y
+
+    def clear(self, x: int, y: int):
+        """Free the cell at (x, y)."""
+        self.rows[x] &= ~(1 << y)
+
+    def test(self, x: int, y: int) -> bool:
+        """Return True if the cell at (x, y) is occupied. Cells outside the mask are free."""
+        return 0 <= x < self.height and 0 <= y < self.width and (self.rows[x] >> y) & 1 == 1
+
+    def clear_all(self):
+        """Free every cell."""
+        rows = self.rows
+        for x in range(len(rows)):
+            rows[x] = 0
+
+    def count(self) -> int:
+        """Return the number of occupied cells."""
+        total = 0
+        for row in self.rows:
+            while row:
+                row &= row - 1
+                total += 1
+        return total
+
+    def overlaps(self, other: 'Mask', dx: int = 0, dy: int = 0) -> bool:
+        """Return True if another mask, with its origin at (dx, dy) in this one, shares an occupied cell."""
+        rows = self.rows
+        first = max(0, -dx)
+        last = min(other.height, self.height - dx)
+        for x in range(first, last):
+            row = other.rows[x]
+            if row and rows[x + dx] & (row << dy if dy >= 0 else row >> -dy):
+                return True
+        return False
+
+
+class Sprite:
+    """A mask at a position, such as a player or a ghost. (x, y) is its top-left cell."""
+    def __init__(self, mask: Mask, x: int = 0, y: int = 0):
+        self.mask = mask
+        self.x = x
+        self.y = y
+
+    def hits(self, other: 'Sprite') -> bool:
+        """Return True if the two sprites share an occupied cell."""
+        if (other.x >= self.x + self.mask.height or self.x >= other.x + other.mask.height
+                or other.y >= self.y + self.mask.width or self.y >= other.y + other.mask.width):
+            return False
+        return self.mask.overlaps(other.mask, other.x - self.x, other.y - self.y)
+
+    def hits_layer(self, layer: Mask) -> bool:
+        """Return True if the sprite overlaps an occupied cell of a layer, such as the walls of a maze."""
+        return layer.overlaps(self.mask, self.x, self.y)
+
+
+class Buckets:
+    """
+    A broad phase for many sprites: sprites are filed in square buckets of `size` cells by
+    the area they cover, so only sprites that share a bucket are tested against each other.
+    """
+    def __init__(self, size: int = 4):
+        self.size = size
+        self.buckets = {}
+
+    def clear(self):
+        self.buckets.clear()
+
+    def keys(self, sprite: Sprite):
+        """Yield the keys of the buckets a sprite covers."""
+        size = self.size
+        for bx in range(sprite.x // size, (sprite.x + sprite.mask.height - 1) // size + 1):
+            for by in range(sprite.y // size, (sprite.y + sprite.mask.width - 1) // size + 1):
+                yield bx * 65536 + by
+
+    def add(self, sprite: Sprite):
+        """File a sprite at its current position."""
+        for key in self.keys(sprite):
+            bucket = self.buckets.get(key)
+            if bucket is None:
+                self.buckets[key] = [sprite]
+            else:
+                bucket.append(sprite)
+
+    def hits(self, sprite: Sprite) -> list:
+        """Return the filed sprites, other than `sprite`, that overlap it."""
+        found = []
+        for key in self.keys(sprite):
+            for other in self.buckets.get(key, ()):
+                if other is not sprite and other not in found and sprite.hits(other):
+                    found.append(other)
+        return found
+
+    def pairs(self) -> list:
+        """Return every pair of filed sprites that overlap, each pair once."""
+        found = []
+        seen = set()
+        for bucket in self.buckets.values():
+            for i in range(len(bucket)):
+                a = bucket[i]
+                for j in range(i + 1, len(bucket)):
+                    b = bucket[j]
+                    key = (id(a), id(b)) if id(a) < id(b) else (id(b), id(a))
+                    if key not in seen and a.hits(b):
+                        seen.add(key)
+                        found.append((a, b))
+        return found
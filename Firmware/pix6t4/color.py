@@ -1,3 +1,5 @@
+from pix6t4.fixedpoint import blend
+
 class Color:
     def __init__(self, value: int):
         """
@@ -6,6 +8,12 @@ class Color:
         """
         self.value = value
 
+    def __eq__(self, other):
+        return isinstance(other, Color) and self.value == other.value
+
+    # Colors compare by value, which can change in place (see BakedAnimation), so they can't be hashed
+    __hash__ = None
+
     @staticmethod
     def fromInt(value: int):
         """
@@ -92,24 +100,19 @@ class Color:
         The other color must be solid (no transparency).
         The returned color is solid.
         """
-        if other & 0xFF < 0xFF:
+        if other.value & 0xFF < 0xFF:
             raise ValueError("The other color must be solid (no transparency).")
-        hexAlpha = self & 0xFF
-        if hexAlpha == 0xFF:
+        if self.value & 0xFF == 0xFF:
             return self
-        return Color.fromRGB(
-            int((self.red * hexAlpha + other.red * (0xFF - hexAlpha)) / 0xFF),
-            int((self.green * hexAlpha + other.green * (0xFF - hexAlpha)) / 0xFF),
-            int((self.blue * hexAlpha + other.blue * (0xFF - hexAlpha)) / 0xFF)
-        )
+        return Color(blend(self.value, other.value))
     
     def solidify(self):
         """Returns the color without transparency."""
-        return Color(self | 0x000000FF)
+        return Color(self.value | 0x000000FF)
 
     def to_RGBA(self):
         """Convert Color to an RGBA tuple."""
-        return ((self & 0xFF000000) >> 24, (self & 0x00FF0000) >> 16, (self & 0x0000FF00) >> 8, (self & 0x000000FF) / 255.0)
+        return (self.red, self.green, self.blue, self.alpha)
     
     def toHSLA(self):
         """
@@ -1,6 +1,11 @@
 import os
 
+from pix6t4.clock import Clock
 from pix6t4.color import Color
+from pix6t4.governor import Governor
+from pix6t4.storage import MemoryBackend, Storage
+from pix6t4.transition import Crossfade, Slide, capture
+from pix6t4.watchdog import Watchdog
 
 class Button:
     """PIX6T4 Color buttons"""
@@ -29,21 +34,52 @@ class Direction:
 
 class PIX6T4Color:
     """The interface to implement for a PIX6T4 Color, real hardware or emulator."""
-    def __init__(self):
-        """Initialize the PIX6T4 Color interface."""
+    def __init__(self, width: int = 8, height: int = 8):
+        """Initialize the PIX6T4 Color interface, for a display of width x height pixels."""
+        self.width = width
+        self.height = height
         self.direction = Direction.NONE
         self.A = False
         self.B = False
         self.X = False
         self.Y = False
         self.game_running = False
-        self.pixels = [[Color.BLACK for _ in range(8)] for _ in range(8)]
+        self.transition = None
+        self.transition_starts_game = False
+        # Effects used when switching between games and when starting one, None to snap instantly
+        self.switch_transition = Slide
+        self.start_transition = Crossfade
+        # Games draw into pixels, the back buffer, while renderers only read front, see present
+        self.pixels = [[Color.BLACK for _ in range(height)] for _ in range(width)]
+        self.front = [[Color.BLACK for _ in range(height)] for _ in range(width)]
+        self.spare = None  # The back buffer while pixels is front, see draw_on_front
+        # An IndexedFramebuffer shown instead of pixels while the game runs, see use_indexed
+        self.indexed = None
+        self.logo = []  # Colors of the logo LEDs, on boards that have them
+        # The time of the console, for games, sounds and settings
+        self.clock = self.create_clock()
+        self.storage = Storage(self.storage_backend(), monotonic=self.clock.monotonic)
+        # Chooses the frame rate, see run. Renderers that can tell set frame_changed to False for repeated frames.
+        self.governor = Governor(self.clock)
+        self.frame_changed = True
+        # Checks every frame against the budget of the current game, see check_frame
+        self.watchdog = Watchdog()
+        # Sends the timing of every frame when set to a pix6t4.telemetry.Telemetry
+        self.telemetry = None
         self.games = []
         self.discover_games()
         self.current_game = None if len(self.games) == 0 else self.games[0]
         self.current_game_index = 0
-        self.sound_enabled = True
-        self.brightness = 1.0
+        self.sound_enabled = self.storage.get("sound", True)
+        self.brightness = self.storage.get("brightness", 1.0)
+
+    def create_clock(self):
+        """Return the clock of the console. Override this to control time, for example in the emulator."""
+        return Clock()
+
+    def storage_backend(self):
+        """Return where settings and high scores are kept. Override this to make them persistent."""
+        return MemoryBackend()
 
     def discover_games(self):
         """Scans the games folder for available games, loads them and returns them as a dictionary."""
@@ -57,22 +93,136 @@ class PIX6T4Color:
         self.games.sort(key=lambda game: game.priority)
 
     def run(self):
-        """Run the PIX6T4 Color console."""
+        """Run the PIX6T4 Color console, at the frame rate chosen by the governor."""
         while True:
+            start = self.clock.monotonic_ns()
             self.loop()
+            self.governor.wait(start, self.input_pending)
 
     def loop(self):
         """The main loop of the PIX6T4 Color."""
+        self.watchdog.start()
+        if self.telemetry is not None:
+            self.telemetry.start()
+        self.update()
+        self.watchdog.rendering()
+        if self.telemetry is not None:
+            self.telemetry.rendering()
+        self.render()
+        self.check_frame()
+        self.end_frame()
+
+    def advance(self, ticks: int):
+        """Run several frames of game logic, and only render the last one."""
+        for tick in range(ticks):
+            self.watchdog.start()
+            if self.telemetry is not None:
+                self.telemetry.start()
+            self.update()
+            if tick == ticks - 1:
+                self.watchdog.rendering()
+                if self.telemetry is not None:
+                    self.telemetry.rendering()
+                self.render()
+            self.check_frame()
+        if ticks > 0:
+            self.end_frame()
+
+    def check_frame(self):
+        """
+        Record the frame that just finished if it took longer than the budget of the current game,
+        and send its timing if telemetry is on.
+        """
+        budget_ms = self.current_game.frame_budget_ms
+        over_budget = self.watchdog.finish(budget_ms)
+        if self.telemetry is not None:
+            self.telemetry.send(self.clock.ticks)
+        if over_budget:
+            overrun = self.watchdog.record(self.clock.ticks, self.current_game.name, self.state_tag(), budget_ms)
+            self.frame_overrun(overrun)
+
+    def frame_overrun(self, overrun):
+        """Called after a frame went over budget, with its pix6t4.watchdog.Overrun. Override this to show it."""
+        pass
+
+    def state_tag(self) -> str:
+        """Return a short description of what the console is doing, for the watchdog."""
+        if self.transition is not None:
+            return "transition"
+        if not self.game_running:
+            return "title screen"
+        return self.current_game.state_tag()
+
+    def end_frame(self):
+        """
+        Write the settings that have stopped changing, let the governor choose the next frame rate,
+        and show the attract mode if nobody is playing.
+        """
+        # Settings are written between frames, after the watchdog has checked the one just rendered
+        self.storage.tick()
+        if self.transition is not None or not self.game_running:
+            self.governor.wanted_rate = self.governor.full_rate
+        else:
+            self.governor.wanted_rate = self.current_game.frame_rate
+        self.governor.frame_done(self.frame_changed)
+        if self.governor.attract_due():
+            self.start_attract_mode()
+
+    def input_pending(self) -> bool:
+        """Return True if button events are waiting. Override this so that idle frames end early on input."""
+        return False
+
+    def start_attract_mode(self):
+        """Leave the current game or title screen for the attract mode, until a button is pressed."""
+        attract = [game for game in self.games if game.plays_when_idle]
+        if not attract:
+            return
+        self.governor.attract = True
+        self.attract_from = self.current_game_index
         if self.game_running:
+            self.stop_game()
+        self.transition = None
+        self.current_game_index = self.games.index(attract[0])
+        self.current_game = attract[0]
+        self.current_game.timers.clear()
+        self.current_game.start()
+        self.game_running = True
+        self.draw_on_front(not self.current_game.presents_frames)
+
+    def leave_attract_mode(self):
+        """Go back to the title screen that was showing before the attract mode."""
+        self.stop_game()
+        self.current_game_index = self.attract_from
+        self.current_game = self.games[self.attract_from]
+        self.current_game.title_screen()
+
+    def update(self):
+        """Run one frame of game logic, without rendering it."""
+        self.clock.tick()
+        if self.transition is not None:
+            if self.transition.step(self):
+                self.end_transition()
+            else:
+                self.present()
+        elif self.game_running:
+            self.current_game.timers.run()
             self.current_game.loop()
         else:
             self.current_game.title_screen()
-        self.render()
+            self.present()
 
     def handle_button_pressed(self, button: Button):
         """Handle button press events."""
         if self.current_game is None:
             return
+        if self.governor.wake():
+            # The attract mode was only showing because nobody was playing, the button just ends it
+            self.leave_attract_mode()
+            return
+        if self.transition is not None:
+            # Any button skips the transition
+            self.transition.finish(self)
+            self.end_transition()
         if button == Button.UP:
             self.direction |= Direction.NORTH
         elif button == Button.DOWN:
@@ -116,6 +266,9 @@ class PIX6T4Color:
             self.X = False
         elif button == Button.A:
             self.A = False
+        if self.transition is not None and self.transition_starts_game:
+            # The game has already started, it only gets control once the transition is over
+            return
         if not self.game_running:
             if button in (Button.UP, Button.LEFT):
                 self.go_to_next_game()
@@ -125,39 +278,137 @@ class PIX6T4Color:
             self.current_game.handle_button_released(button)
 
     def go_to_previous_game(self):
-        self.current_game_index = (self.current_game_index + 1) % len(self.games)
-        self.current_game = self.games[self.current_game_index]
+        self.switch_to_game((self.current_game_index + 1) % len(self.games))
 
     def go_to_next_game(self):
-        self.current_game_index = (self.current_game_index - 1) % len(self.games)
-        self.current_game = self.games[self.current_game_index]
+        self.switch_to_game((self.current_game_index - 1) % len(self.games))
+
+    def switch_to_game(self, index: int):
+        """Show the title screen of another game, through the switch transition."""
+        before = capture(self.front)
+        self.current_game_index = index
+        self.current_game = self.games[index]
+        self.current_game.title_screen()
+        self.begin_transition(self.switch_transition, before, False)
+
+    def begin_transition(self, effect, before, starts_game: bool):
+        """
+        Play a transition from a captured frame to the current content of the framebuffer.
+        The game only gets control once the transition has finished.
+        """
+        if effect is None:
+            self.game_running = starts_game or self.game_running
+            self.present()
+            self.retain_frame()
+            if starts_game:
+                self.draw_on_front(not self.current_game.presents_frames)
+            return
+        if self.indexed is not None:
+            self.indexed.resolve(self.pixels)
+        self.transition = effect(before, capture(self.pixels), len(self.pixels[0]))
+        self.draw_on_front(False)  # The steps of the transition are presented
+        self.transition_starts_game = starts_game
+        if starts_game:
+            self.game_running = False
+
+    def end_transition(self):
+        """Show the last step of the transition, and hand control to the game once it has finished."""
+        self.transition = None
+        # Games start drawing over the frame the transition ended on
+        self.present()
+        self.retain_frame()
+        if self.transition_starts_game:
+            self.game_running = True
+            self.draw_on_front(not self.current_game.presents_frames)
 
     def handle_select(self):
         """Handle the select button press."""
         if self.game_running:
-            self.game_running = False
+            self.stop_game()
         else:
             self.go_to_next_game()
 
+    def stop_game(self):
+        """Leave the running game and save what it changed."""
+        self.game_running = False
+        self.draw_on_front(False)
+        self.current_game.stop()
+        self.current_game.timers.clear()
+        self.indexed = None
+        self.storage.flush()
+
     def handle_start(self):
         """Handle the start button press."""
+        before = capture(self.front)
+        self.indexed = None
+        self.current_game.timers.clear()
         self.current_game.start()
-        self.game_running = True
+        self.begin_transition(self.start_transition, before, True)
+
+    def use_indexed(self, framebuffer):
+        """
+        Show an IndexedFramebuffer instead of pixels while the current game runs,
+        or go back to pixels with None. Leaving the game goes back to pixels.
+        """
+        self.indexed = framebuffer
+
+    def showing_indexed(self) -> bool:
+        """Return True if the frame to render is in the indexed framebuffer rather than in pixels."""
+        return self.indexed is not None and self.game_running and self.transition is None
 
     def enable_sound(self, enabled: bool = True):
         """Enable or disable sound."""
         self.sound_enabled = enabled
+        self.storage.set("sound", enabled)
+
+    def set_brightness(self, brightness: float):
+        """Set the brightness of the display, between 0 and 1."""
+        self.brightness = brightness
+        self.storage.set("brightness", brightness)
 
     def cls(self, background_color: Color = Color.BLACK):
         """Clear the screen."""
-        for y in range(8):
-            for x in range(8):
-                self.plot(x, y, background_color)
+        for column in self.pixels:
+            for y in range(len(column)):
+                column[y] = background_color
 
     def plot(self, x: int, y: int, color: Color):
         """Plot a pixel at (x, y) with the given color."""
-        if 0 <= x < 8 and 0 <= y < 8:
+        if 0 <= x < self.height and 0 <= y < self.width:
             self.pixels[y][x] = color
+
+    def present(self):
+        """
+        Show the frame drawn into pixels by swapping the buffers, without copying. The frame
+        shown until now becomes the back buffer, so the next frame has to be drawn completely,
+        unless retain_frame is called. Renderers read front, so they never see a frame being drawn.
+        Games with presents_frames call this once they've drawn a frame, the other games draw
+        straight into front, see draw_on_front. The console presents title screens and transitions.
+        """
+        self.pixels, self.front = self.front, self.pixels
+
+    def retain_frame(self):
+        """Copy the frame just presented into the back buffer, to draw the next frame over it."""
+        for back, front in zip(self.pixels, self.front):
+            back[:] = front
+
+    def draw_on_front(self, on_front: bool):
+        """
+        Point pixels at front itself, for games that draw over their previous frame whenever
+        they like, so nothing has to be presented or copied back for them. Without on_front,
+        pixels gets its own buffer back, holding the frame on the screen.
+        """
+        if on_front and self.pixels is not self.front:
+            self.spare = self.pixels
+            self.pixels = self.front
+        elif not on_front and self.pixels is self.front:
+            self.pixels = self.spare
+            self.retain_frame()
+
+    def plot_logo(self, index: int, color: Color):
+        """Set the color of one of the logo LEDs, if the board has it."""
+        if 0 <= index < len(self.logo):
+            self.logo[index] = color
     
     def beep(self, frequency: int = 440, duration: int = 100):
         """Play a beep sound."""
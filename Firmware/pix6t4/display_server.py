@@ -0,0 +1,339 @@
+import asyncio
+import base64
+import hashlib
+import os
+import socket
+import struct
+import threading
+
+# Streams the frames of a console to any number of viewers on the local network, over
+# WebSocket for the browser viewer served at http://host:port/, or over plain TCP.
+# This runs on a computer, not on the device:
+# python -m pix6t4.farm Monty --soak --autopilot snake --frames 100000 --serve 8064
+# python -m pix6t4.emulator --serve 8064
+#
+# Every message is a frame header followed by either a keyframe, the RGB bytes of every
+# pixel row by row, or a delta, a count followed by the index and RGB bytes of each pixel
+# that changed since the previous message to the same viewer. Over TCP, the client first
+# sends TCP_HELLO, and each message is preceded by its length; over WebSocket, each
+# message is a binary message.
+
+KEYFRAME = 0
+DELTA = 1
+FRAME_HEADER = "<BIHH"  # kind, frame number, width, height
+FRAME_HEADER_SIZE = struct.calcsize(FRAME_HEADER)
+DELTA_COUNT = "<H"
+DELTA_PIXEL = "<HBBB"  # index, red, green, blue
+DELTA_PIXEL_SIZE = struct.calcsize(DELTA_PIXEL)
+TCP_HELLO = b"PIX6T4 VIEW\n"
+TCP_LENGTH = "<I"
+WEBSOCKET_GUID = b"258EAFA5-E914-47DA-95CA-C5AB0DC85B11"
+VIEWER_PATH = os.path.join(os.path.dirname(__file__), "viewer.html")
+
+
+def snapshot(pix6t4) -> bytes:
+    """Return the RGB bytes of the frame a console shows, row by row."""
+    columns = pix6t4.width
+    rows = pix6t4.height
+    frame = bytearray(3 * columns * rows)
+    indexed = pix6t4.indexed if pix6t4.showing_indexed() else None
+    for column in range(columns):
+        for row in range(rows):
+            if indexed is not None:
+                value = indexed.palette[indexed.get(column * rows + row)]
+            else:
+                value = pix6t4.front[column][row].value
+            i = 3 * (row * columns + column)
+            frame[i] = value >> 24
+            frame[i + 1] = (value >> 16) & 0xFF
+            frame[i + 2] = (value >> 8) & 0xFF
+    return bytes(frame)
+
+
+def encode_keyframe(number: int, width: int, height: int, rgb: bytes) -> bytes:
+    return struct.pack(FRAME_HEADER, KEYFRAME, number, width, height) + rgb
+
+
+def encode_delta(number: int, width: int, height: int, previous: bytes, rgb: bytes) -> bytes:
+    """
+    Encode the pixels that changed between two frames of the same size, or the whole frame
+    as a keyframe if that's smaller.
+    """
+    changed = bytearray()
+    count = 0
+    for i in range(0, len(rgb), 3):
+        if rgb[i:i + 3] != previous[i:i + 3]:
+            changed += struct.pack(DELTA_PIXEL, i // 3, rgb[i], rgb[i + 1], rgb[i + 2])
+            count += 1
+    if len(changed) >= len(rgb):
+        return encode_keyframe(number, width, height, rgb)
+    return struct.pack(FRAME_HEADER, DELTA, number, width, height) + struct.pack(DELTA_COUNT, count) + changed
+
+
+class FrameDecoder:
+    """Rebuilds frames from the messages of the server, for Python viewers and tests."""
+    def __init__(self):
+        self.number = None
+        self.width = 0
+        self.height = 0
+        self.rgb = None
+
+    def apply(self, message: bytes) -> bytes:
+        """Apply a message to the current frame, and return its RGB bytes."""
+        kind, number, width, height = struct.unpack_from(FRAME_HEADER, message)
+        payload = memoryview(message)[FRAME_HEADER_SIZE:]
+        if kind == KEYFRAME:
+            self.rgb = bytearray(payload)
+        elif self.rgb is None or (width, height) != (self.width, self.height):
+            raise ValueError("A delta needs a keyframe of the same size first.")
+        else:
+            count, = struct.unpack_from(DELTA_COUNT, payload)
+            offset = struct.calcsize(DELTA_COUNT)
+            for _ in range(count):
+                index, red, green, blue = struct.unpack_from(DELTA_PIXEL, payload, offset)
+                self.rgb[3 * index:3 * index + 3] = bytes((red, green, blue))
+                offset += DELTA_PIXEL_SIZE
+        self.number = number
+        self.width = width
+        self.height = height
+        return bytes(self.rgb)
+
+
+def websocket_message(payload: bytes) -> bytes:
+    """Frame a binary WebSocket message, unmasked as sent by servers."""
+    length = len(payload)
+    if length < 126:
+        header = struct.pack("!BB", 0x82, length)
+    elif length < 65536:
+        header = struct.pack("!BBH", 0x82, 126, length)
+    else:
+        header = struct.pack("!BBQ", 0x82, 127, length)
+    return header + payload
+
+
+async def read_websocket_message(reader: asyncio.StreamReader) -> tuple:
+    """Read a message sent by a WebSocket client, and return its opcode and unmasked payload."""
+    first, second = await reader.readexactly(2)
+    length = second & 0x7F
+    if length == 126:
+        length, = struct.unpack("!H", await reader.readexactly(2))
+    elif length == 127:
+        length, = struct.unpack("!Q", await reader.readexactly(8))
+    mask = await reader.readexactly(4) if second & 0x80 else bytes(4)
+    payload = bytearray(await reader.readexactly(length))
+    for i in range(length):
+        payload[i] ^= mask[i & 3]
+    return first & 0x0F, bytes(payload)
+
+
+class Viewer:
+    """A connected viewer, and the last frame it was sent."""
+    def __init__(self, writer: asyncio.StreamWriter, websocket: bool):
+        self.writer = writer
+        self.websocket = websocket
+        self.ready = asyncio.Event()  # Set when there's a newer frame than the last one sent
+        self.number = None
+        self.rgb = None
+        self.size = None
+        self.sent = 0
+        self.skipped = 0
+
+    def frame(self, message: bytes) -> bytes:
+        """Wrap a message for the transport of the viewer."""
+        if self.websocket:
+            return websocket_message(message)
+        return struct.pack(TCP_LENGTH, len(message)) + message
+
+
+class DisplayServer:
+    """
+    Serves the frames rendered by a console to viewers, from an asyncio loop in a thread of
+    its own. The render of the console only hands the latest frame over to the loop, so
+    viewers never hold up the game. A viewer that can't keep up skips ahead to the latest
+    frame once it has taken the previous one, and is dropped if it takes none for
+    `drain_timeout` seconds. Frames are only sent as deltas against what each viewer last
+    received, and viewers that are up to date share the same delta.
+    """
+    def __init__(self, host: str = "127.0.0.1", port: int = 8064, drain_timeout: float = 2.0,
+                 send_buffer: int = 16384):
+        """Serve on host and port, where port 0 picks a free port, see `port` once started."""
+        self.host = host
+        self.port = port
+        self.drain_timeout = drain_timeout
+        self.send_buffer = send_buffer  # Kept small, so late viewers skip frames rather than queue them
+        self.loop = None
+        self.server = None
+        self.thread = None
+        self.viewers = set()
+        self.connections = set()  # Tasks of the open connections, viewers or not
+        self.latest = None  # (number, width, height, rgb) of the latest frame
+        self.deltas = {}  # Messages of the latest frame, by the frame number they're based on
+        self.frames = 0
+        self.dropped = 0
+
+    def start(self) -> 'DisplayServer':
+        """Start serving in a background thread, and return once the server is listening."""
+        listening = threading.Event()
+        errors = []
+
+        def serve():
+            self.loop = asyncio.new_event_loop()
+            try:
+                self.server = self.loop.run_until_complete(
+                    asyncio.start_server(self.handle_connection, self.host, self.port))
+                self.port = self.server.sockets[0].getsockname()[1]
+            except OSError as error:
+                errors.append(error)
+                listening.set()
+                return
+            listening.set()
+            self.loop.run_forever()
+            self.loop.close()
+
+        self.thread = threading.Thread(target=serve, name="display server", daemon=True)
+        self.thread.start()
+        listening.wait()
+        if errors:
+            raise errors[0]
+        return self
+
+    def stop(self):
+        """Disconnect the viewers and stop serving."""
+        if self.loop is None or self.loop.is_closed():
+            return
+
+        async def shutdown():
+            self.server.close()
+            for task in self.connections:
+                task.cancel()
+            await asyncio.gather(*self.connections, return_exceptions=True)
+            await self.server.wait_closed()
+            self.loop.stop()
+
+        asyncio.run_coroutine_threadsafe(shutdown(), self.loop)
+        self.thread.join()
+
+    def attach(self, pix6t4):
+        """Publish every frame a console renders."""
+        original = pix6t4.render
+
+        def render():
+            original()
+            if self.viewers:
+                self.publish(pix6t4.width, pix6t4.height, snapshot(pix6t4))
+        pix6t4.render = render
+
+    def publish(self, width: int, height: int, rgb: bytes):
+        """Hand a frame over to the viewers. Doesn't block, and can be called from any thread."""
+        self.frames += 1
+        self.loop.call_soon_threadsafe(self.new_frame, (self.frames, width, height, rgb))
+
+    def new_frame(self, frame: tuple):
+        """Make a frame the latest one, and wake up the viewers."""
+        self.latest = frame
+        self.deltas.clear()
+        for viewer in self.viewers:
+            if viewer.ready.is_set():
+                viewer.skipped += 1
+            viewer.ready.set()
+
+    def message_for(self, viewer: Viewer) -> bytes:
+        """Return the message that brings a viewer to the latest frame."""
+        number, width, height, rgb = self.latest
+        if viewer.rgb is None or viewer.size != (width, height):
+            return encode_keyframe(number, width, height, rgb)
+        message = self.deltas.get(viewer.number)
+        if message is None:
+            message = encode_delta(number, width, height, viewer.rgb, rgb)
+            self.deltas[viewer.number] = message
+        return message
+
+    async def handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """Tell plain TCP viewers from browsers, which get the viewer page or a WebSocket."""
+        task = asyncio.current_task()
+        self.connections.add(task)
+        try:
+            first = await reader.readline()
+            if first == TCP_HELLO:
+                await self.stream(reader, Viewer(writer, websocket=False))
+            elif first.startswith(b"GET "):
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                if headers.get("upgrade", "").lower() == "websocket":
+                    key = headers.get("sec-websocket-key", "").encode()
+                    accept = base64.b64encode(hashlib.sha1(key + WEBSOCKET_GUID).digest())
+                    writer.write(b"HTTP/1.1 101 Switching Protocols\r\nUpgrade: websocket\r\n"
+                                 b"Connection: Upgrade\r\nSec-WebSocket-Accept: " + accept + b"\r\n\r\n")
+                    await self.stream(reader, Viewer(writer, websocket=True))
+                else:
+                    self.serve_page(writer, first.split()[1] if len(first.split()) > 1 else b"/")
+            await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError, asyncio.CancelledError):
+            pass
+        finally:
+            writer.close()
+            self.connections.discard(task)
+
+    def serve_page(self, writer: asyncio.StreamWriter, path: bytes):
+        """Answer a plain HTTP request with the viewer page."""
+        if path not in (b"/", b"/index.html"):
+            writer.write(b"HTTP/1.1 404 Not Found\r\nContent-Length: 0\r\nConnection: close\r\n\r\n")
+            return
+        with open(VIEWER_PATH, "rb") as file:
+            page = file.read()
+        writer.write(b"HTTP/1.1 200 OK\r\nContent-Type: text/html; charset=utf-8\r\n"
+                     b"Content-Length: " + str(len(page)).encode() + b"\r\nConnection: close\r\n\r\n" + page)
+
+    async def stream(self, reader: asyncio.StreamReader, viewer: Viewer):
+        """Send frames to a viewer until it disconnects or falls too far behind."""
+        sock = viewer.writer.get_extra_info("socket")
+        if sock is not None:
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, self.send_buffer)
+        viewer.writer.transport.set_write_buffer_limits(high=self.send_buffer)
+        self.viewers.add(viewer)
+        if self.latest is not None:
+            viewer.ready.set()
+        closed = asyncio.ensure_future(self.wait_for_close(reader, viewer.websocket))
+        ready = None
+        try:
+            while True:
+                ready = asyncio.ensure_future(viewer.ready.wait())
+                await asyncio.wait((ready, closed), return_when=asyncio.FIRST_COMPLETED)
+                if closed.done():
+                    break
+                viewer.ready.clear()
+                number, width, height, rgb = self.latest
+                viewer.writer.write(viewer.frame(self.message_for(viewer)))
+                viewer.number = number
+                viewer.rgb = rgb
+                viewer.size = (width, height)
+                viewer.sent += 1
+                try:
+                    await asyncio.wait_for(viewer.writer.drain(), self.drain_timeout)
+                except asyncio.TimeoutError:
+                    self.dropped += 1
+                    viewer.writer.transport.abort()
+                    break
+        finally:
+            for task in (ready, closed):
+                if task is not None:
+                    task.cancel()
+            self.viewers.discard(viewer)
+
+    async def wait_for_close(self, reader: asyncio.StreamReader, websocket: bool):
+        """Return once a viewer disconnects. Viewers don't send anything else that matters."""
+        try:
+            while True:
+                if websocket:
+                    opcode, _ = await read_websocket_message(reader)
+                    if opcode == 0x8:
+                        return
+                elif not await reader.read(1024):
+                    return
+        except (ConnectionError, asyncio.IncompleteReadError):
+            return
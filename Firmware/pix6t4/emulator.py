@@ -1,9 +1,17 @@
+import multiprocessing
 from time import sleep
 from PyQt6.QtCore import *
 from PyQt6.QtGui import *
 from PyQt6.QtWidgets import *
 import pyaudio
+from pix6t4.clock import FASTER, NORMAL, PAUSE, SLOWER, STEP, EmulatorClock
 from pix6t4.console import Button, PIX6T4Color
+from pix6t4.display_server import DisplayServer
+from pix6t4.fixedpoint import brightness_level, scale
+from pix6t4.sampler import StackSampler
+from pix6t4.shared import BUTTON_RECORD, SOUND_RECORD, EventRing, RemoteScreen, SharedFrame, run_game_process
+from pix6t4.storage import FileBackend
+from pix6t4.trace import AUDIO_THREAD, Tracer
 
 import sys
 
@@ -27,24 +35,63 @@ class SquareWaveIterable:
         sample = 0x00 if self.current_frame % self.period < self.period // 2 else 0xFF
         self.current_frame += 1
         return sample
+
+class Speaker:
+    """Plays square wave beeps, one at a time."""
+    def __init__(self, tracer=None):
+        self.tracer = tracer  # Traces the audio callbacks if set, see pix6t4.trace
+        self.current_frame = 0
+        self.stream = None
+        self.stream_start = None
+        self.stream_duration = 0
+
+    def stop(self):
+        if self.stream is not None:
+            self.stream.close()
+            self.stream = None
+
+    def beep(self, frequency = 440, duration = 200):
+        self.current_frame = 0
+        self.stream_duration = duration
+        def cb(_, frame_count, time_info, status):
+            if (self.stream_start.addMSecs(self.stream_duration) < QDateTime.currentDateTime()):
+                return (bytes(0), pyaudio.paComplete)
+            start = self.tracer.now_us() if self.tracer is not None else 0
+            samples = bytes(SquareWaveIterable(frequency, frame_count, self.current_frame))
+            self.current_frame += frame_count
+            if self.tracer is not None:
+                self.tracer.complete("audio callback", "audio", start, self.tracer.now_us() - start,
+                                     AUDIO_THREAD, {"frequency": frequency, "frames": frame_count})
+            return (samples, pyaudio.paContinue)
+
+        self.stop()
+        self.stream = audio.open(format=pyaudio.paInt8, channels=1, rate=44100, output=True, stream_callback=cb)
+        self.stream.start_stream()
+        self.stream_start = QDateTime.currentDateTime()
     
 class LedMatrix(QWidget):
     """ A simple LED matrix widget"""
-    def __init__(self, pix6t4: PIX6T4Color, pixelSize=30, rows=8, cols=8, margin=2):
+    def __init__(self, pix6t4: PIX6T4Color, pixelSize=30, margin=2):
         super().__init__()
         self.pixelSize = pixelSize
-        self.rows = rows
-        self.cols = cols
+        self.rows = pix6t4.height
+        self.cols = pix6t4.width
         self.margin = margin
         self.pix6t4 = pix6t4
         self.setFixedSize(self.cols * self.pixelSize, self.rows * self.pixelSize)
-        self.pixels = pix6t4.pixels
+        self.pixels = pix6t4.front
+        self.overrun_repaints = 0  # The background flashes red for a few repaints after a frame overrun
     def paintEvent(self, event):
         painter = QPainter(self)
-        painter.fillRect(0, 0, self.width(), self.height(), QColor(32, 32, 32))
+        if self.overrun_repaints > 0:
+            self.overrun_repaints -= 1
+            painter.fillRect(0, 0, self.width(), self.height(), QColor(160, 0, 0))
+        else:
+            painter.fillRect(0, 0, self.width(), self.height(), QColor(32, 32, 32))
+        level = brightness_level(self.pix6t4.brightness)
         for x, row in enumerate(self.pixels):
             for y, col in enumerate(row):
-                color = QColor(self.pixels[x][y].with_brightness(self.pix6t4.brightness).value >> 8)
+                color = QColor(scale(self.pixels[x][y].value, level) >> 8)
                 painter.fillRect(x * self.pixelSize + self.margin,
                                  y * self.pixelSize + self.margin,
                                  self.pixelSize - self.margin * 2,
@@ -60,15 +107,30 @@ class MainWindow(QMainWindow):
 
     def __setupUi(self):
         self.setWindowTitle("PIX6T4 Color")
-        self.resize(240, 240)
+        # Keep the window about the same size for larger displays, with smaller pixels
+        pixel_size = max(8, 240 // max(self.pix6t4.width, self.pix6t4.height))
+        width, height = self.pix6t4.width * pixel_size, self.pix6t4.height * pixel_size
+        self.resize(width, height)
         self.setSizePolicy(QSizePolicy.Policy.Fixed, QSizePolicy.Policy.Fixed)
-        self.widget = LedMatrix(self.pix6t4)
-        self.widget.setGeometry(QRect(0, 0, 240, 240))
+        self.widget = LedMatrix(self.pix6t4, pixel_size, 1 if pixel_size < 16 else 2)
+        self.widget.setGeometry(QRect(0, 0, width, height))
         self.widget.setAutoFillBackground(True)
         self.setCentralWidget(self.widget)
 
     def keyPressEvent(self, event):
         match event.key():
+            case Qt.Key.Key_Plus | Qt.Key.Key_Equal:
+                self.pix6t4.control_clock(FASTER)
+            case Qt.Key.Key_Minus:
+                self.pix6t4.control_clock(SLOWER)
+            case Qt.Key.Key_0:
+                self.pix6t4.control_clock(NORMAL)
+            case Qt.Key.Key_P:
+                self.pix6t4.control_clock(PAUSE)
+            case Qt.Key.Key_N | Qt.Key.Key_Period:
+                self.pix6t4.control_clock(STEP)
+            case Qt.Key.Key_O:
+                self.pix6t4.dump_overruns()
             case Qt.Key.Key_Escape:
                 self.pix6t4.handle_button_pressed(Button.SELECT)
             case Qt.Key.Key_Enter | Qt.Key.Key_Return:
@@ -111,56 +173,140 @@ class MainWindow(QMainWindow):
 
 class PIX6T4ColorEmulator(PIX6T4Color):
     """Emulator for the PIX6T4 Color console."""
-    def __init__(self):
-        super().__init__()
+    def __init__(self, width: int = 8, height: int = 8, trace_path: str = None, serve_port: int = None):
+        super().__init__(width, height)
+        self.tracer = None if trace_path is None else Tracer(trace_path)
+        if self.tracer is not None:
+            self.tracer.attach(self)
+        self.display_server = None if serve_port is None else DisplayServer("0.0.0.0", serve_port).start()
+        if self.display_server is not None:
+            self.display_server.attach(self)
+            print(f"Serving the display on http://localhost:{self.display_server.port}/")
         app = QApplication(sys.argv)
         window = MainWindow(self)
         self.window = window
         self.widget = window.widget
+        # The window refreshes at the normal speed of the console, and the clock decides
+        # how many frames of game logic run for each refresh
         self.timer = QTimer(window)
         self.timer.setInterval(50)
-        self.timer.timeout.connect(self.loop)
+        self.timer.timeout.connect(self.refresh)
         self.timer.start()
-        self.current_frame = 0
-        self.stream = None
-        self.stream_start = None
-        self.stream_duration = 0
+        self.speaker = Speaker(self.tracer)
+        self.sampler = StackSampler(self).start()
         window.show()
-        sys.exit(app.exec())
+        code = app.exec()
+        if self.tracer is not None:
+            self.speaker.stop()
+            self.tracer.close()
+        if self.display_server is not None:
+            self.display_server.stop()
+        sys.exit(code)
+
+    def create_clock(self):
+        return EmulatorClock()
+
+    def storage_backend(self):
+        """Settings and high scores are kept in a file next to the emulator."""
+        return FileBackend("settings.json")
+
+    def refresh(self):
+        """Run the frames of game logic due on the clock, and show the last one."""
+        self.advance(self.clock.ticks_due())
+
+    def control_clock(self, command: int):
+        """Change the speed of the clock, pause it or step it, and show its state in the title."""
+        self.clock.command(command)
+        self.speaker.stop()
+        state = self.clock.describe()
+        self.window.setWindowTitle("PIX6T4 Color" + (f" ({state})" if state else ""))
+
+    def frame_overrun(self, overrun):
+        """Flash the background of the window, so slow frames show up while playing."""
+        self.widget.overrun_repaints = 5
+
+    def dump_overruns(self):
+        """Print the latest frames that went over budget."""
+        self.watchdog.dump()
 
     def render(self):
         """Render the current state of the PIX6T4 Color."""
-        self.widget.pixels = self.pixels
+        if self.showing_indexed():
+            self.indexed.resolve(self.front)
+        self.widget.pixels = self.front
         self.widget.repaint()
 
     def enable_sound(self, enabled = True):
         super().enable_sound(enabled)
-        if (self.stream) != None and not enabled:
-            self.stream.close()
-            self.stream = None
-    
-    def stop_stream(self):
-        if self.stream is not None:
-            self.stream.close()
-            self.stream = None
+        if not enabled:
+            self.speaker.stop()
 
     def beep(self, frequency = 440, duration = 200):
-        self.current_frame = 0
-        self.stream_duration = duration
         if self.sound_enabled:
-            def cb(_, frame_count, time_info, status):
-                if (self.stream_start.addMSecs(self.stream_duration) < QDateTime.currentDateTime()):
-                    return (bytes(0), pyaudio.paComplete)
-                samples = bytes(SquareWaveIterable(frequency, frame_count, self.current_frame))
-                self.current_frame += frame_count
-                return (samples, pyaudio.paContinue)
-
-            self.stop_stream()
-            self.stream = audio.open(format=pyaudio.paInt8, channels=1, rate=44100, output=True, stream_callback=cb)
-            self.stream.start_stream()
-            self.stream_start = QDateTime.currentDateTime()
+            self.speaker.beep(frequency, self.clock.real_duration(duration))
+
+class PIX6T4ColorSplitEmulator:
+    """
+    Emulator that runs the console in a separate game process. The game writes its frames
+    to shared memory and reads the buttons from a lock-free ring, while this window only
+    shows the latest completed frame, so a slow frame doesn't freeze the window and a slow
+    repaint doesn't delay the game.
+    """
+    def __init__(self, profile_path: str = None, width: int = 8, height: int = 8):
+        self.frame = SharedFrame(width=width, height=height)
+        self.buttons = EventRing(record=BUTTON_RECORD)
+        self.sounds = EventRing(record=SOUND_RECORD)
+        self.screen = RemoteScreen(self.frame, self.buttons)
+        self.game = multiprocessing.Process(
+            target=run_game_process,
+            args=(self.frame.name, self.buttons.name, self.sounds.name, "settings.json", profile_path))
+        self.game.start()
+        app = QApplication(sys.argv)
+        window = MainWindow(self.screen)
+        self.window = window
+        self.widget = window.widget
+        self.speaker = Speaker()
+        # Refresh faster than the game runs, so that frames are shown as soon as they're ready
+        self.timer = QTimer(window)
+        self.timer.setInterval(16)
+        self.timer.timeout.connect(self.refresh)
+        self.timer.start()
+        window.show()
+        code = app.exec()
+        self.frame.running = False
+        self.game.join(2)
+        self.speaker.stop()
+        self.frame.close(unlink=True)
+        self.buttons.close(unlink=True)
+        self.sounds.close(unlink=True)
+        sys.exit(code)
+
+    def refresh(self):
+        """Show the latest frame if it's new, and play the beeps the game asked for."""
+        if self.screen.update():
+            self.widget.pixels = self.screen.pixels
+            self.widget.repaint()
+        sound = self.sounds.get()
+        while sound is not None:
+            self.speaker.beep(*sound)
+            sound = self.sounds.get()
 
 def main():
-    """Run the PIX6T4 Color emulator."""
-    emulator = PIX6T4ColorEmulator()
-    emulator.run()
+    """
+    Run the PIX6T4 Color emulator. With --split, the game runs in its own process,
+    and with --profile FILE, that process is profiled into FILE. With --size WxH,
+    the display is W pixels wide and H pixels high instead of 8x8, like tiled panels.
+    With --trace FILE, the timeline of the frames is written to FILE, for Perfetto.
+    With --serve PORT, the display is also streamed to viewers on the network, see pix6t4.display_server.
+    """
+    width = height = 8
+    if "--size" in sys.argv:
+        width, height = (int(n) for n in sys.argv[sys.argv.index("--size") + 1].lower().split("x"))
+    if "--split" in sys.argv or "--profile" in sys.argv:
+        profile_path = sys.argv[sys.argv.index("--profile") + 1] if "--profile" in sys.argv else None
+        PIX6T4ColorSplitEmulator(profile_path, width, height)
+    else:
+        trace_path = sys.argv[sys.argv.index("--trace") + 1] if "--trace" in sys.argv else None
+        serve_port = int(sys.argv[sys.argv.index("--serve") + 1]) if "--serve" in sys.argv else None
+        emulator = PIX6T4ColorEmulator(width, height, trace_path, serve_port)
+        emulator.run()
@@ -0,0 +1,238 @@
+import argparse
+import cProfile
+import csv
+import multiprocessing
+import random
+import sys
+import time
+import tracemalloc
+
+from pix6t4.autopilot import autopilots
+from pix6t4.display_server import DisplayServer
+from pix6t4.headless import PIX6T4ColorHeadless
+from pix6t4.trace import Tracer
+
+# Bulk simulation of games on headless consoles, spread over a pool of processes.
+# This runs on a computer, not on the device:
+# python -m pix6t4.farm Monty --games 1000 --set slowness=5 --csv results.csv
+
+
+def find_game(pix6t4: PIX6T4ColorHeadless, name: str):
+    """Find a game by its display name or module name, ignoring case."""
+    name = name.lower()
+    for game in pix6t4.games:
+        if game.name.lower() == name or type(game).__module__.rpartition(".")[2] == name:
+            return game
+    raise ValueError(f"Unknown game: {name}")
+
+
+def play(job: tuple) -> dict:
+    """
+    Play one game at full speed on a fresh headless console and return its results.
+    A job is (game name, autopilot name, seed, max frames, overrides), where overrides
+    is a dict of game attributes to set after the game has started.
+    """
+    game_name, autopilot_name, seed, max_frames, overrides = job
+    random.seed(seed)
+    pix6t4 = PIX6T4ColorHeadless()
+    pix6t4.governor.attract_after_ns = None  # Bots play on, whether they press buttons or not
+    game = find_game(pix6t4, game_name)
+    pix6t4.current_game = game
+    pix6t4.current_game_index = pix6t4.games.index(game)
+    pix6t4.handle_start()
+    for attribute, value in overrides.items():
+        setattr(game, attribute, value)
+    autopilot = autopilots[autopilot_name]()
+    frame_times = []
+    frames = 0
+    clock = time.perf_counter_ns
+    while frames < max_frames and not game.is_over():
+        autopilot.poll(pix6t4)
+        start = clock()
+        pix6t4.loop()
+        frame_times.append(clock() - start)
+        frames += 1
+    frame_times.sort()
+    return {
+        "seed": seed,
+        "score": game.score,
+        "frames": frames,
+        "over": game.is_over(),
+        "frame_ns_mean": sum(frame_times) // max(1, frames),
+        "frame_ns_p99": frame_times[min(frames - 1, frames * 99 // 100)] if frames else 0,
+        "frame_ns_max": frame_times[-1] if frames else 0,
+    }
+
+
+def soak(game_name: str, autopilot: str, frames: int, seed: int = 0, samples: int = 10,
+         trace_path: str = None, serve_port: int = None) -> list:
+    """
+    Play one long game in this process and sample the memory it holds along the way,
+    to find leaks. Returns (frame, bytes allocated) samples, taken after a first
+    sample period so that one-time allocations don't count.
+    If trace_path is given, the timeline of the game is written there, see pix6t4.trace.
+    If serve_port is given, the game can be watched on that port, see pix6t4.display_server.
+    """
+    random.seed(seed)
+    pix6t4 = PIX6T4ColorHeadless()
+    pix6t4.governor.attract_after_ns = None  # Bots play on, whether they press buttons or not
+    tracer = None if trace_path is None else Tracer(trace_path)
+    if tracer is not None:
+        tracer.attach(pix6t4)
+    server = None if serve_port is None else DisplayServer("0.0.0.0", serve_port).start()
+    if server is not None:
+        server.attach(pix6t4)
+        print(f"Serving the display on http://localhost:{server.port}/")
+    game = find_game(pix6t4, game_name)
+    pix6t4.current_game = game
+    pix6t4.current_game_index = pix6t4.games.index(game)
+    pix6t4.handle_start()
+    pilot = autopilots[autopilot]()
+    interval = max(1, frames // (samples + 1))
+    memory = []
+    tracemalloc.start()
+    try:
+        for frame in range(1, frames + 1):
+            pilot.poll(pix6t4)
+            pix6t4.loop()
+            if frame % interval == 0 and frame > interval:
+                memory.append((frame, tracemalloc.get_traced_memory()[0]))
+    finally:
+        tracemalloc.stop()
+        if tracer is not None:
+            tracer.close()
+        if server is not None:
+            server.stop()
+    return memory
+
+
+class Aggregate:
+    """Rolling statistics over the results of many games."""
+    def __init__(self):
+        self.games = 0
+        self.score_total = 0
+        self.score_min = None
+        self.score_max = None
+        self.frames_total = 0
+        self.game_overs = 0
+        self.frame_ns_total = 0
+        self.frame_ns_p99_max = 0
+        self.frame_ns_max = 0
+
+    def add(self, result: dict):
+        """Add the results of a game."""
+        self.games += 1
+        score = result["score"]
+        self.score_total += score
+        self.score_min = score if self.score_min is None else min(self.score_min, score)
+        self.score_max = score if self.score_max is None else max(self.score_max, score)
+        self.frames_total += result["frames"]
+        self.game_overs += result["over"]
+        self.frame_ns_total += result["frame_ns_mean"] * result["frames"]
+        self.frame_ns_p99_max = max(self.frame_ns_p99_max, result["frame_ns_p99"])
+        self.frame_ns_max = max(self.frame_ns_max, result["frame_ns_max"])
+
+    def summary(self) -> dict:
+        """Return the statistics so far."""
+        games = max(1, self.games)
+        return {
+            "games": self.games,
+            "score_mean": self.score_total / games,
+            "score_min": self.score_min,
+            "score_max": self.score_max,
+            "frames_mean": self.frames_total / games,
+            "game_over_rate": self.game_overs / games,
+            "frame_us_mean": self.frame_ns_total / max(1, self.frames_total) / 1000,
+            "frame_us_p99_max": self.frame_ns_p99_max / 1000,
+            "frame_us_max": self.frame_ns_max / 1000,
+        }
+
+
+def run(game_name: str, games: int, autopilot: str = "random", max_frames: int = 10000,
+        seed: int = 0, overrides: dict = None, workers: int = None, on_result=None) -> dict:
+    """
+    Play `games` games with seeds seed, seed + 1... over a pool of `workers` processes
+    (by default one per core). Results are streamed back as games finish, passed to
+    `on_result` if given, and aggregated. Returns the aggregated statistics.
+    """
+    jobs = [(game_name, autopilot, seed + i, max_frames, overrides or {}) for i in range(games)]
+    workers = workers or multiprocessing.cpu_count()
+    aggregate = Aggregate()
+    # Hand out jobs in small batches to keep the processes busy without too much chatter
+    chunksize = max(1, games // (workers * 8))
+    with multiprocessing.Pool(workers) as pool:
+        for result in pool.imap_unordered(play, jobs, chunksize):
+            aggregate.add(result)
+            if on_result is not None:
+                on_result(result)
+    return aggregate.summary()
+
+
+def parse_override(text: str):
+    """Parse an attribute=value override, where the value is a number."""
+    attribute, _, value = text.partition("=")
+    try:
+        return attribute, int(value)
+    except ValueError:
+        return attribute, float(value)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Simulate many games on headless PIX6T4 Color consoles.")
+    parser.add_argument("game", help="name of the game, for example Monty or snake")
+    parser.add_argument("--games", type=int, default=100)
+    parser.add_argument("--autopilot", default="random", choices=sorted(autopilots))
+    parser.add_argument("--frames", type=int, default=10000, help="maximum frames per game")
+    parser.add_argument("--seed", type=int, default=0, help="seed of the first game")
+    parser.add_argument("--workers", type=int, default=None, help="processes, one per core by default")
+    parser.add_argument("--set", action="append", default=[], metavar="ATTRIBUTE=VALUE",
+                        help="set a game attribute after start, for example slowness=5")
+    parser.add_argument("--csv", help="write the results of each game to this file")
+    parser.add_argument("--soak", action="store_true",
+                        help="play a single game in this process and track its memory instead")
+    parser.add_argument("--profile", action="store_true", help="profile the soak game")
+    parser.add_argument("--trace", help="write the timeline of the soak game to this file, for Perfetto")
+    parser.add_argument("--serve", type=int, metavar="PORT", help="stream the display of the soak game on this port")
+    args = parser.parse_args()
+
+    if args.soak:
+        profiler = cProfile.Profile() if args.profile else None
+        if profiler is not None:
+            profiler.enable()
+        memory = soak(args.game, args.autopilot, args.frames, args.seed, trace_path=args.trace,
+                      serve_port=args.serve)
+        if profiler is not None:
+            profiler.disable()
+            profiler.print_stats("cumulative")
+        for frame, allocated in memory:
+            print(f"frame {frame:>9}{allocated:>12} bytes")
+        if memory:
+            print(f"growth {memory[-1][1] - memory[0][1]:>21} bytes")
+        return 0
+
+    overrides = dict(parse_override(text) for text in args.set)
+    csv_file = open(args.csv, "w", newline="") if args.csv else None
+    writer = None
+
+    def on_result(result):
+        nonlocal writer
+        if csv_file is not None:
+            if writer is None:
+                writer = csv.DictWriter(csv_file, fieldnames=list(result))
+                writer.writeheader()
+            writer.writerow(result)
+
+    start = time.perf_counter()
+    summary = run(args.game, args.games, args.autopilot, args.frames, args.seed, overrides,
+                  args.workers, on_result)
+    elapsed = time.perf_counter() - start
+    if csv_file is not None:
+        csv_file.close()
+    for key, value in summary.items():
+        print(f"{key:<18}{value}")
+    print(f"{'games_per_second':<18}{summary['games'] / elapsed:.1f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
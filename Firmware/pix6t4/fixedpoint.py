@@ -0,0 +1,101 @@
+# Integer color math for microcontrollers without a floating point unit.
+# Colors are packed 0xRRGGBBAA integers, as in Color.value. Results are within 1
+# of the floating point methods of Color, but nothing is range-checked:
+# these are meant for hot paths where the inputs are already known to be valid.
+
+# For each whole degree of hue, the weight of the chroma in the red, green and blue
+# channels, from 0 (none) to 60 (full). This is the hue hexagon of HSL.
+HUE_WEIGHTS = bytearray(360 * 3)
+for _hue in range(360):
+    _ramp = 60 - abs(_hue % 120 - 60)
+    _sector = _hue // 60
+    HUE_WEIGHTS[_hue * 3:_hue * 3 + 3] = bytes(
+        (60, _ramp, 0) if _sector == 0 else
+        (_ramp, 60, 0) if _sector == 1 else
+        (0, 60, _ramp) if _sector == 2 else
+        (0, _ramp, 60) if _sector == 3 else
+        (_ramp, 0, 60) if _sector == 4 else
+        (60, 0, _ramp))
+del _hue, _ramp, _sector
+
+# Fixed point unit of hsl_to_rgba: saturation (100) * lightness (100) * hue weight (60)
+HSL_UNIT = 600000
+
+
+def div255(x: int) -> int:
+    """Divide a 16-bit value by 255, rounding down, with shifts instead of a division."""
+    return (x + (x >> 8) + 1) >> 8
+
+
+def hsl_to_rgba(hue: int, saturation: int, lightness: int, alpha: int = 0xFF) -> int:
+    """
+    Convert HSL to a packed color.
+    Hue is in whole degrees (0-359), saturation and lightness are percentages (0-100),
+    and alpha is from 0 (transparent) to 255 (opaque).
+    """
+    chroma = (100 - abs(2 * lightness - 100)) * saturation
+    base = lightness * 6000 - chroma * 30
+    i = hue * 3
+    red = (chroma * HUE_WEIGHTS[i] + base) * 255 // HSL_UNIT
+    green = (chroma * HUE_WEIGHTS[i + 1] + base) * 255 // HSL_UNIT
+    blue = (chroma * HUE_WEIGHTS[i + 2] + base) * 255 // HSL_UNIT
+    return (red << 24) | (green << 16) | (blue << 8) | alpha
+
+
+def rgba_to_hsl(value: int):
+    """
+    Convert a packed color to a (hue, saturation, lightness) tuple of integers.
+    Hue is in degrees (0-359), saturation and lightness are percentages (0-100).
+    """
+    red = value >> 24
+    green = (value >> 16) & 0xFF
+    blue = (value >> 8) & 0xFF
+    max_c = max(red, green, blue)
+    min_c = min(red, green, blue)
+    delta = max_c - min_c
+    lightness = (max_c + min_c) * 100 // 510
+    if delta == 0:
+        return (0, 0, lightness)
+    if max_c == red:
+        hue = (60 * (green - blue) // delta + 360) % 360
+    elif max_c == green:
+        hue = (60 * (blue - red) // delta + 120) % 360
+    else:
+        hue = (60 * (red - green) // delta + 240) % 360
+    saturation = delta * 100 // (255 - abs(max_c + min_c - 255))
+    return (hue, saturation, lightness)
+
+
+def brightness_level(brightness: float) -> int:
+    """Convert a brightness between 0 and 1 to an 8-bit multiplier between 0 and 256."""
+    return int(brightness * 256 + 0.5)
+
+
+def scale(value: int, level: int) -> int:
+    """Scale the red, green and blue channels of a packed color by level / 256, keeping alpha."""
+    return (
+        (((value >> 24) * level >> 8) << 24) |
+        ((((value >> 16) & 0xFF) * level >> 8) << 16) |
+        ((((value >> 8) & 0xFF) * level >> 8) << 8) |
+        (value & 0xFF))
+
+
+def brightness_table(level: int) -> bytes:
+    """Precompute the scaled value of every channel intensity for a brightness level."""
+    return bytes(i * level >> 8 for i in range(256))
+
+
+def blend(value: int, background: int) -> int:
+    """
+    Paint a packed color over a solid background, using its alpha channel.
+    The result is solid.
+    """
+    alpha = value & 0xFF
+    if alpha == 0xFF:
+        return value
+    inverse = 0xFF - alpha
+    return (
+        (div255((value >> 24) * alpha + (background >> 24) * inverse) << 24) |
+        (div255(((value >> 16) & 0xFF) * alpha + ((background >> 16) & 0xFF) * inverse) << 16) |
+        (div255(((value >> 8) & 0xFF) * alpha + ((background >> 8) & 0xFF) * inverse) << 8) |
+        0xFF)
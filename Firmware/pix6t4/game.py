@@ -1,29 +1,58 @@
 from pix6t4.color import Color
 from pix6t4.console import Button, PIX6T4Color
+from pix6t4.timers import Timers
 
 class Game:
     """The PIX6T4 Color game engine as a base class."""
     name = "Base Game"
     priority = 1000  # Default priority for games, can be overridden by subclasses
+    score = 0
+    frame_rate = 20  # Frames per second the game needs while something happens, see pix6t4.governor
+    plays_when_idle = False  # True for the game the console falls back to when nobody plays
+    # True for games that draw complete frames and call PIX6T4Color.present themselves, and for games
+    # that only show an IndexedFramebuffer, which opt out of pixels with it. Other games draw over their
+    # previous frame, straight into the front buffer, see PIX6T4Color.draw_on_front.
+    presents_frames = False
+    frame_budget_ms = 40  # Frames that take longer are recorded by the watchdog, see pix6t4.watchdog
 
     def __init__(self, pix6t4: PIX6T4Color):
         """Initialize the game with a PIX6T4 Color instance."""
         self.pix6t4 = pix6t4
+        # Timers run on the console clock while the game runs, and are cleared when it starts or stops
+        self.timers = Timers(pix6t4.clock)
     def title_screen(self):
         """Display the title screen for the game."""
         self.pix6t4.cls()
-        for x in range(8):
-            for y in range(8):
+        for x in range(self.pix6t4.height):
+            for y in range(self.pix6t4.width):
                 self.pix6t4.plot(x, y, Color.WHITE if (x + y) % 2 == 0 else Color.BLACK)
     def start(self):
         """Start the game."""
         pass
+    def stop(self):
+        """Called when the player leaves the game. Override this to save high scores."""
+        pass
+    def is_over(self) -> bool:
+        """Return True once the game has ended and is just waiting for the player to leave."""
+        return False
+    def state_tag(self) -> str:
+        """Return a short description of the state of the game, recorded with frames that go over budget."""
+        return "playing"
     def loop(self):
         """
-        The main game loop.
-        Override this to implement your game.
+        Called on every frame, after the timers that are due.
+        Override this for work that needs to happen on every frame.
         """
-        raise NotImplementedError("This method should be overridden in subclasses.")
+        pass
+    def every(self, ms: int, callback):
+        """Call `callback` every `ms` milliseconds of console time, whatever the frame rate."""
+        return self.timers.every(ms, callback)
+    def after(self, ms: int, callback):
+        """Call `callback` once, `ms` milliseconds of console time from now."""
+        return self.timers.after(ms, callback)
+    def tween(self, ms: int, start: float, end: float, callback, bounce: bool = False, done=None):
+        """Pass a value going from start to end over `ms` milliseconds to `callback` on every frame."""
+        return self.timers.tween(ms, start, end, callback, bounce, done)
     def handle_button_pressed(self, button: Button):
         """Handle button press events.
         Override this to implement button handling in your game."""
@@ -0,0 +1,67 @@
+class Governor:
+    """
+    Chooses the frame rate of the console. Frames run at the rate the game asks for while
+    something happens, drop to `idle_rate` once frames have stopped changing and no button
+    has been pressed for `idle_after` seconds, and go back to full rate on the next press.
+    After `attract_after` seconds without input, the console falls back to the attract mode,
+    which runs at `attract_rate`. Time spent at each rate is accounted for `report`.
+    """
+    def __init__(self, clock, full_rate: int = 20, idle_rate: int = 4, idle_after: float = 1.0,
+                 attract_after: float = 120.0, attract_rate: int = 10):
+        """Initialize the governor at full rate, on the clock of the console."""
+        self.clock = clock
+        self.full_rate = full_rate
+        self.idle_rate = idle_rate
+        self.idle_after_ns = int(idle_after * 1000000000)
+        self.attract_after_ns = None if attract_after is None else int(attract_after * 1000000000)
+        self.attract_rate = attract_rate
+        self.wanted_rate = full_rate
+        self.rate = full_rate
+        self.attract = False  # True while the attract mode runs because nobody is playing
+        now = clock.monotonic_ns()
+        self.last_input_ns = now
+        self.last_change_ns = now
+        self.last_frame_ns = now
+        self.time_at_rate = {}
+
+    def wake(self) -> bool:
+        """
+        Go back to full rate because a button was pressed. Returns True if the console
+        was showing the attract mode because nobody was playing.
+        """
+        self.last_input_ns = self.clock.monotonic_ns()
+        self.rate = self.wanted_rate
+        was_attract = self.attract
+        self.attract = False
+        return was_attract
+
+    def frame_done(self, changed: bool):
+        """Account for the frame that just ran, and choose the rate of the next one."""
+        now = self.clock.monotonic_ns()
+        self.time_at_rate[self.rate] = self.time_at_rate.get(self.rate, 0) + now - self.last_frame_ns
+        self.last_frame_ns = now
+        if changed:
+            self.last_change_ns = now
+        if self.attract:
+            self.rate = self.attract_rate
+        elif now - max(self.last_change_ns, self.last_input_ns) >= self.idle_after_ns:
+            self.rate = min(self.idle_rate, self.wanted_rate)
+        else:
+            self.rate = self.wanted_rate
+
+    def attract_due(self) -> bool:
+        """Return True if nobody has pressed a button for long enough to show the attract mode."""
+        return (not self.attract and self.attract_after_ns is not None
+                and self.clock.monotonic_ns() - self.last_input_ns >= self.attract_after_ns)
+
+    def wait(self, start_ns: int, input_pending=None):
+        """
+        Sleep until the next frame is due at the current rate, counting from the start of
+        the frame. If `input_pending` is given, it's checked while sleeping, and the wait
+        ends early when it returns True, so a button press doesn't wait for a slow frame.
+        """
+        self.clock.sleep_until(start_ns + 1000000000 // self.rate, input_pending)
+
+    def report(self) -> dict:
+        """Return the time spent at each frame rate, in seconds."""
+        return {rate: ns / 1000000000 for rate, ns in sorted(self.time_at_rate.items(), reverse=True)}
@@ -1,18 +1,31 @@
 import board
 import neopixel
+from neopixel_write import neopixel_write
 import pwmio
 import async_buzzer
 import keypad
+import microcontroller
+import usb_cdc
 
+from pix6t4.color import Color
 from pix6t4.console import PIX6T4Color
+from pix6t4.layout import for_revision
+from pix6t4.pixelbuffer import PixelBuffer, write_per_pixel
+from pix6t4.storage import NvmBackend
+from pix6t4.telemetry import Telemetry
 
 class PIX6T4ColorHardware(PIX6T4Color):
-    def __init__(self, revision: int):
-        super().__init__()
+    def __init__(self, revision: int, rotation: int = 0, mirror: bool = False,
+                 panels_across: int = 1, panels_down: int = 1):
+        self.layout = for_revision(revision, rotation, mirror, panels_across, panels_down)
+        super().__init__(self.layout.width, self.layout.height)
         self.revision = revision
-        self.num_pixels = 64 if revision == 1 else 70 # Rev > 1 has more LED for the logo animation
+        self.num_pixels = self.layout.num_leds
+        self.logo = [Color.BLACK for _ in range(self.layout.logo_leds)]
         self.led_pin = board.GP10
         self.leds = neopixel.NeoPixel(self.led_pin, self.num_pixels, auto_write=False)
+        self.pixel_buffer = PixelBuffer(self.layout, self.leds.byteorder)
+        self.fast_render = True
         self.pin_up = board.GP0
         self.pin_down = board.GP1
         self.pin_left = board.GP2
@@ -38,17 +51,39 @@ class PIX6T4ColorHardware(PIX6T4Color):
         self.pin_buzzer = board.A3
         self.buzzer_io = pwmio.PWMOut(self.pin_buzzer, variable_frequency=True)
         self.buzzer = async_buzzer.Buzzer(self.buzzer_io)
-        self.brightness = 0.1
+        self.brightness = self.storage.get("brightness", 0.1)
+        if usb_cdc.data is not None:
+            # Frame timing goes to the data serial port, without ever waiting for the computer
+            usb_cdc.data.write_timeout = 0
+            self.telemetry = Telemetry(usb_cdc.data)
+        self.keypad_overflowed = False
+
+    def storage_backend(self):
+        """Settings and high scores are kept in the microcontroller's non-volatile memory."""
+        return NvmBackend(microcontroller.nvm)
 
     def render(self):
         """Render the current state of the PIX6T4 Color."""
-        i = 0
-        for y, row in enumerate(self.pixels):
-            for x, col in enumerate(row):
-                color = self.pixels[x][y].with_brightness(self.brightness).value >> 8
-                self.leds[i] = color
-                i += 1
-        self.leds.show()
+        if self.fast_render:
+            # Write the packed bytes straight to the strip, bypassing neopixel's __setitem__
+            self.pixel_buffer.set_brightness(self.brightness)
+            if self.showing_indexed():
+                packed = self.pixel_buffer.pack_indexed(self.indexed, self.logo)
+            else:
+                packed = self.pixel_buffer.pack(self.front, self.logo)
+            # The LEDs keep showing the last frame, so repeated frames don't need to be sent
+            self.frame_changed = self.pixel_buffer.changed()
+            if self.frame_changed:
+                neopixel_write(self.leds.pin, packed)
+        else:
+            if self.showing_indexed():
+                self.indexed.resolve(self.front)
+            write_per_pixel(self.leds, self.layout, self.front, self.logo, self.brightness)
+            self.leds.show()
+
+    def input_pending(self) -> bool:
+        """Return True if the keypad has queued button events."""
+        return len(self.buttons.events) > 0
 
     def loop(self):
         """Main loop for the PIX6T4 Color hardware."""
@@ -56,13 +91,38 @@ class PIX6T4ColorHardware(PIX6T4Color):
         event = self.buttons.events.get()
         if event and event.pressed:
             self.handle_button_pressed(event.key_number)
+        if self.telemetry is not None:
+            if self.telemetry.collect_garbage:
+                # Collect between frames, where the pause can be timed, rather than in the middle of one
+                self.telemetry.collect()
+            self.count_lost_input()
         super().loop()
     
+    def count_lost_input(self):
+        """
+        Count the times the keypad queue overflowed. overflowed is read-only and stays set
+        until the queue is cleared, so overflows are counted when it gets set, and it's reset
+        once the queue has drained, when clearing it can't lose an event.
+        """
+        events = self.buttons.events
+        if events.overflowed:
+            if not self.keypad_overflowed:
+                self.telemetry.lost_input += 1
+                self.keypad_overflowed = True
+            if len(events) == 0:
+                events.clear()
+                self.keypad_overflowed = False
+
     def beep(self, frequency: int = 440, duration: int = 200):
         """Play a beep sound."""
         if self.sound_enabled:
             self.buzzer.play([(frequency, duration)])
 
-def main(revision: int = 1):
-    hardware = PIX6T4ColorHardware(revision)
-    hardware.run()
\ No newline at end of file
+def main(revision: int = 1, rotation: int = 0, mirror: bool = False, panels_across: int = 1, panels_down: int = 1):
+    hardware = PIX6T4ColorHardware(revision, rotation, mirror, panels_across, panels_down)
+    try:
+        hardware.run()
+    except KeyboardInterrupt:
+        # Ctrl-C on the serial console stops the console and shows the frames that went over budget
+        hardware.watchdog.dump()
+        raise
\ No newline at end of file
@@ -0,0 +1,87 @@
+from pix6t4.clock import VirtualClock
+from pix6t4.color import Color
+from pix6t4.console import PIX6T4Color
+from pix6t4.layout import for_revision
+from pix6t4.pixelbuffer import PixelBuffer
+from pix6t4.storage import FileBackend, MemoryBackend
+
+
+class FakeNeoPixel:
+    """
+    A stand-in for neopixel.NeoPixel that records the bytes it would send to the strip.
+    Setting pixels one at a time goes through the same parsing, brightness and channel
+    reordering as the real library, so both render paths can be compared.
+    """
+    def __init__(self, pin, n: int, brightness: float = 1.0, auto_write: bool = True,
+                 pixel_order: str = "GRB"):
+        self.pin = pin
+        self.n = n
+        self.brightness = brightness
+        self.auto_write = auto_write
+        self.byteorder = pixel_order
+        self.bpp = len(pixel_order)
+        self.buffer = bytearray(n * self.bpp)
+        self.last_frame = bytes(n * self.bpp)
+        self.frames_sent = 0
+
+    def __len__(self):
+        return self.n
+
+    def __setitem__(self, index: int, value):
+        """Set a pixel from a 0xRRGGBB integer or an (r, g, b) tuple."""
+        if isinstance(value, int):
+            value = ((value >> 16) & 0xFF, (value >> 8) & 0xFF, value & 0xFF)
+        offset = index * self.bpp
+        for channel, name in enumerate(self.byteorder):
+            self.buffer[offset + channel] = int(value["RGB".index(name)] * self.brightness)
+        if self.auto_write:
+            self.show()
+
+    def show(self):
+        """Send the pixels set one at a time to the strip."""
+        self.transmit(self.buffer)
+
+    def transmit(self, buffer):
+        """Send raw bytes to the strip, like neopixel_write does."""
+        self.last_frame = bytes(buffer)
+        self.frames_sent += 1
+
+
+class PIX6T4ColorHeadless(PIX6T4Color):
+    """
+    A PIX6T4 Color without a display or buttons, for tests, benchmarks and bots.
+    Frames are packed exactly like on the hardware, into a fake NeoPixel strip.
+    Settings and high scores are kept in the file at storage_path, or in RAM if it's None.
+    Time is virtual and moves by one frame per loop, so runs are repeatable at any speed.
+    """
+    def __init__(self, revision: int = 2, rotation: int = 0, mirror: bool = False, storage_path: str = None,
+                 panels_across: int = 1, panels_down: int = 1):
+        self.storage_path = storage_path
+        self.layout = for_revision(revision, rotation, mirror, panels_across, panels_down)
+        super().__init__(self.layout.width, self.layout.height)
+        self.revision = revision
+        self.logo = [Color.BLACK for _ in range(self.layout.logo_leds)]
+        self.leds = FakeNeoPixel(None, self.layout.num_leds, auto_write=False)
+        self.pixel_buffer = PixelBuffer(self.layout, self.leds.byteorder)
+        self.beeps = 0
+
+    def create_clock(self):
+        return VirtualClock()
+
+    def storage_backend(self):
+        """Settings and high scores are kept in a file, or in RAM for throwaway consoles."""
+        return MemoryBackend() if self.storage_path is None else FileBackend(self.storage_path)
+
+    def render(self):
+        """Pack the framebuffer into the fake strip."""
+        self.pixel_buffer.set_brightness(self.brightness)
+        if self.showing_indexed():
+            self.leds.transmit(self.pixel_buffer.pack_indexed(self.indexed, self.logo))
+        else:
+            self.leds.transmit(self.pixel_buffer.pack(self.front, self.logo))
+        self.frame_changed = self.pixel_buffer.changed()
+
+    def beep(self, frequency: int = 440, duration: int = 200):
+        """Count beeps instead of playing them."""
+        if self.sound_enabled:
+            self.beeps += 1
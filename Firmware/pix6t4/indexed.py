@@ -0,0 +1,87 @@
+from array import array
+
+from pix6t4.color import Color
+
+
+class IndexedFramebuffer:
+    """
+    A framebuffer of palette indices, as an alternative to the grid of Colors in PIX6T4Color.pixels.
+    Each cell is a 4- or 8-bit index into a palette of up to 16 or 256 packed colors, in the
+    same column-major order as pixels. Changing a palette entry changes every pixel that uses it,
+    so glowing or color cycling costs one palette update per frame instead of a write per pixel.
+    Show it with PIX6T4Color.use_indexed while a game is running.
+    """
+    def __init__(self, width: int = 8, height: int = 8, bits: int = 8, palette: list = None):
+        """Initialize a framebuffer with a palette of Colors, where every pixel uses the first entry."""
+        if bits not in (4, 8):
+            raise ValueError("Indices must be 4 or 8 bits.")
+        palette = palette or [Color.BLACK for _ in range(1 << bits)]
+        if len(palette) > 1 << bits:
+            raise ValueError(f"A palette of {bits}-bit indices has at most {1 << bits} colors.")
+        self.width = width
+        self.height = height
+        self.bits = bits
+        self.size = width * height
+        self.indices = bytearray(self.size if bits == 8 else (self.size + 1) // 2)
+        self.colors = list(palette)
+        self.palette = array("I", [color.value for color in palette])
+        # Incremented on every palette change, so that renderers know when to correct it again
+        self.changes = 0
+
+    def set_color(self, index: int, color: Color):
+        """Set a palette entry."""
+        self.colors[index] = color
+        self.palette[index] = color.value
+        self.changes += 1
+
+    def rotate(self, start: int = 0, end: int = None, step: int = 1):
+        """Cycle the palette entries from start to end (excluded) by `step` places towards start."""
+        end = len(self.palette) if end is None else end
+        palette = self.palette
+        colors = self.colors
+        for _ in range(step % (end - start)):
+            first_value = palette[start]
+            first_color = colors[start]
+            for index in range(start, end - 1):
+                palette[index] = palette[index + 1]
+                colors[index] = colors[index + 1]
+            palette[end - 1] = first_value
+            colors[end - 1] = first_color
+        self.changes += 1
+
+    def get(self, i: int) -> int:
+        """Return the palette index of cell i."""
+        if self.bits == 8:
+            return self.indices[i]
+        byte = self.indices[i >> 1]
+        return byte & 0x0F if i & 1 else byte >> 4
+
+    def set(self, i: int, index: int):
+        """Set the palette index of cell i."""
+        if self.bits == 8:
+            self.indices[i] = index
+        elif i & 1:
+            self.indices[i >> 1] = (self.indices[i >> 1] & 0xF0) | index
+        else:
+            self.indices[i >> 1] = (self.indices[i >> 1] & 0x0F) | (index << 4)
+
+    def plot(self, x: int, y: int, index: int):
+        """Set a pixel to a palette index, with the same coordinates as PIX6T4Color.plot."""
+        if 0 <= x < self.height and 0 <= y < self.width:
+            self.set(y * self.height + x, index)
+
+    def fill(self, index: int = 0):
+        """Set every pixel to a palette index."""
+        value = index if self.bits == 8 else index | (index << 4)
+        indices = self.indices
+        for i in range(len(indices)):
+            indices[i] = value
+
+    def resolve(self, pixels):
+        """Write the colors of the pixels into a grid of Colors, for code that reads PIX6T4Color.pixels."""
+        colors = self.colors
+        i = 0
+        for column in pixels:
+            for y in range(len(column)):
+                column[y] = colors[self.get(i)]
+                i += 1
@@ -0,0 +1,109 @@
+from array import array
+
+
+class LedLayout:
+    """
+    Maps the framebuffer of a PIX6T4 Color onto its chain of LEDs.
+    The table is built once, and holds for each framebuffer cell, in the order of
+    PIX6T4Color.pixels (pixels[x][y] is displayed at column x, row y), the index of the
+    LED that shows it. The matrix is wired row by row, optionally in a serpentine, and
+    the panel can be mounted rotated by a multiple of 90 degrees and/or mirrored.
+    Extra LEDs after the matrix, such as the logo of revision 2 boards, get their own channel.
+    """
+    def __init__(self, width: int = 8, height: int = 8, rotation: int = 0, mirror: bool = False,
+                 serpentine: bool = False, logo_leds: int = 0, first_led: int = 0):
+        """Build the table for a panel of width x height LEDs starting at first_led in the chain."""
+        if rotation not in (0, 90, 180, 270):
+            raise ValueError("Rotation must be 0, 90, 180 or 270 degrees.")
+        self.width = width
+        self.height = height
+        self.rotation = rotation
+        self.mirror = mirror
+        self.serpentine = serpentine
+        self.first_led = first_led
+        self.logo_start = first_led + width * height
+        self.logo_leds = logo_leds
+        self.num_leds = width * height + logo_leds
+        self.table = array("H", bytes(2 * width * height))
+        i = 0
+        for x in range(width):
+            for y in range(height):
+                self.table[i] = self.led_index(x, y)
+                i += 1
+
+    def led_index(self, x: int, y: int) -> int:
+        """Return the index in the chain of the LED that shows column x, row y of the display."""
+        width, height = self.width, self.height
+        if self.mirror:
+            x = width - 1 - x
+        if self.rotation == 0:
+            panel_width, panel_x, panel_y = width, x, y
+        elif self.rotation == 90:
+            panel_width, panel_x, panel_y = height, height - 1 - y, x
+        elif self.rotation == 180:
+            panel_width, panel_x, panel_y = width, width - 1 - x, height - 1 - y
+        else:
+            panel_width, panel_x, panel_y = height, y, width - 1 - x
+        if self.serpentine and panel_y % 2 == 1:
+            panel_x = panel_width - 1 - panel_x
+        return self.first_led + panel_y * panel_width + panel_x
+
+
+class TiledLayout(LedLayout):
+    """
+    A display made of several panels chained one after the other, such as 16x16 from four
+    8x8 modules. Panels are chained row by row from the top left, optionally in a
+    serpentine so that the cable goes back along every other row of panels, and each
+    panel has its own rotation, mirror and wiring. All of this goes into the same table
+    as a single panel, so packing a frame costs the same per pixel however it's tiled.
+    Logo LEDs come after the panel at index `logo_after` in the chain, by default the last one.
+    """
+    def __init__(self, panels_across: int = 2, panels_down: int = 2, panel_width: int = 8, panel_height: int = 8,
+                 rotations: list = None, mirror: bool = False, serpentine: bool = False,
+                 serpentine_chain: bool = False, logo_leds: int = 0, logo_after: int = None, first_led: int = 0):
+        """Build the table for a grid of panels, with the rotation of each panel in chain order."""
+        count = panels_across * panels_down
+        rotations = rotations or [0] * count
+        logo_after = count - 1 if logo_after is None else logo_after
+        panel_leds = panel_width * panel_height
+        self.panels_across = panels_across
+        self.panel_width = panel_width
+        self.panel_height = panel_height
+        self.serpentine_chain = serpentine_chain
+        self.panels = [
+            LedLayout(panel_width, panel_height, rotations[i], mirror, serpentine,
+                      first_led=first_led + i * panel_leds + (logo_leds if i > logo_after else 0))
+            for i in range(count)]
+        super().__init__(panels_across * panel_width, panels_down * panel_height,
+                         logo_leds=logo_leds, first_led=first_led)
+        self.logo_start = first_led + (logo_after + 1) * panel_leds
+
+    def led_index(self, x: int, y: int) -> int:
+        """Return the index in the chain of the LED that shows column x, row y of the display."""
+        panel_x, panel_y = x // self.panel_width, y // self.panel_height
+        if self.serpentine_chain and panel_y % 2 == 1:
+            panel_x = self.panels_across - 1 - panel_x
+        panel = self.panels[panel_y * self.panels_across + panel_x]
+        return panel.led_index(x % self.panel_width, y % self.panel_height)
+
+
+_layouts = {}
+
+
+def for_revision(revision: int, rotation: int = 0, mirror: bool = False,
+                 panels_across: int = 1, panels_down: int = 1) -> LedLayout:
+    """
+    Return the LED layout of a board revision, building it only the first time it's needed.
+    Boards can be extended with more panels of the same size, chained after the board's own
+    panel and logo LEDs.
+    """
+    key = (revision, rotation, mirror, panels_across, panels_down)
+    if key not in _layouts:
+        # Rev > 1 has 6 more LEDs for the logo animation, after the matrix
+        logo_leds = 0 if revision == 1 else 6
+        if panels_across == 1 and panels_down == 1:
+            _layouts[key] = LedLayout(rotation=rotation, mirror=mirror, logo_leds=logo_leds)
+        else:
+            _layouts[key] = TiledLayout(panels_across, panels_down, rotations=[rotation] * (panels_across * panels_down),
+                                        mirror=mirror, logo_leds=logo_leds, logo_after=0)
+    return _layouts[key]
@@ -0,0 +1,181 @@
+from array import array
+from math import ceil, floor
+
+from pix6t4.color import Color
+
+NONE = -1  # End of a linked list of particle slots
+SATURATE = bytes(min(255, i) for i in range(511))  # Sums of two channels, clamped to 255
+
+
+class ParticlePool:
+    """
+    A fixed-size pool of particles for animations.
+    Particles live in preallocated arrays indexed by slot, so spawning and killing them
+    never allocates. Live particles are bucketed by row in intrusive linked lists,
+    so an effect can visit only the particles of a given row, each of them once.
+    """
+    def __init__(self, capacity: int, rows: int):
+        """Initialize a pool of `capacity` particles spread over `rows` rows."""
+        self.capacity = capacity
+        self.rows = rows
+        self.x = array("f", [0] * capacity)
+        self.y = array("f", [0] * capacity)
+        self.vx = array("f", [0] * capacity)
+        self.vy = array("f", [0] * capacity)
+        self.row = array("h", [NONE] * capacity)  # Row bucket of each slot, NONE when free
+        self.next = array("h", [NONE] * capacity)
+        self.previous = array("h", [NONE] * capacity)
+        self.heads = array("h", [NONE] * rows)
+        # Free slots are kept on a stack
+        self.free = array("h", range(capacity - 1, -1, -1))
+        self.free_count = capacity
+
+    def __len__(self):
+        """Return the number of live particles."""
+        return self.capacity - self.free_count
+
+    def spawn(self, x: float, y: float, vx: float = 0, vy: float = 0) -> int:
+        """Spawn a particle and return its slot, or NONE if the pool is full."""
+        if self.free_count == 0:
+            return NONE
+        self.free_count -= 1
+        slot = self.free[self.free_count]
+        self.x[slot] = x
+        self.y[slot] = y
+        self.vx[slot] = vx
+        self.vy[slot] = vy
+        self.link(slot, int(y) % self.rows)
+        return slot
+
+    def kill(self, slot: int):
+        """Return a particle to the pool."""
+        if self.row[slot] == NONE:
+            return
+        self.unlink(slot)
+        self.free[self.free_count] = slot
+        self.free_count += 1
+
+    def link(self, slot: int, row: int):
+        """Insert a slot at the head of a row bucket."""
+        head = self.heads[row]
+        self.row[slot] = row
+        self.previous[slot] = NONE
+        self.next[slot] = head
+        if head != NONE:
+            self.previous[head] = slot
+        self.heads[row] = slot
+
+    def unlink(self, slot: int):
+        """Remove a slot from its row bucket."""
+        previous = self.previous[slot]
+        next = self.next[slot]
+        if previous == NONE:
+            self.heads[self.row[slot]] = next
+        else:
+            self.next[previous] = next
+        if next != NONE:
+            self.previous[next] = previous
+        self.row[slot] = NONE
+
+    def in_row(self, row: int):
+        """Iterate over the slots of the live particles in a row."""
+        slot = self.heads[row]
+        while slot != NONE:
+            next = self.next[slot]  # Read first so the particle can be killed by the caller
+            yield slot
+            slot = next
+
+    def step(self, x_min: float, x_max: float):
+        """
+        Move every live particle by its velocity, killing those that leave [x_min, x_max].
+        Particles that change row are moved to their new bucket.
+        """
+        rows = self.row
+        for slot in range(self.capacity):
+            row = rows[slot]
+            if row == NONE:
+                continue
+            x = self.x[slot] + self.vx[slot]
+            y = self.y[slot] + self.vy[slot]
+            self.x[slot] = x
+            self.y[slot] = y
+            if x < x_min or x > x_max:
+                self.kill(slot)
+            else:
+                new_row = int(y) % self.rows
+                if new_row != row:
+                    self.unlink(slot)
+                    self.link(slot, new_row)
+
+
+class LightBuffer:
+    """
+    An off-screen buffer of light intensities, for effects that add up light.
+    Intensities saturate at 255 and are turned into colors through a ramp
+    of 256 precomputed colors, which are added onto the framebuffer.
+    """
+    def __init__(self, width: int, height: int):
+        """Initialize a dark buffer of the given size."""
+        self.width = width
+        self.height = height
+        self.intensities = bytearray(width * height)
+        self.dark = bytes(width * height)
+
+    def clear(self):
+        """Turn off all the lights."""
+        self.intensities[:] = self.dark
+
+    def add(self, x: int, y: int, intensity: int):
+        """Add light at (x, y), with the same coordinates as PIX6T4Color.plot."""
+        if 0 <= x < self.width and 0 <= y < self.height:
+            i = y * self.width + x
+            self.intensities[i] = min(255, self.intensities[i] + intensity)
+
+    def add_trail(self, x: float, y: int, length: int, scale: int):
+        """
+        Add the light of a particle at (x, y) with a trail fading over `length` pixels
+        towards smaller x. A pixel at distance d behind the particle gets (length - d) * scale.
+        """
+        if not 0 <= y < self.height:
+            return
+        intensities = self.intensities
+        row = y * self.width
+        first = max(0, floor(x - length) + 1)
+        last = min(self.width, ceil(x))
+        for px in range(first, last):
+            i = row + px
+            intensities[i] = min(255, intensities[i] + int((length - (x - px)) * scale))
+
+    def write_to(self, pix6t4, ramp: list):
+        """
+        Add the light to the framebuffer, mapping each intensity through a color ramp and
+        adding it channel by channel onto the pixel, saturating at 255. Dark pixels of the
+        buffer leave the framebuffer as it is, and lit ones on black pixels reuse the ramp's colors.
+        """
+        intensities = self.intensities
+        width = self.width
+        pixels = pix6t4.pixels
+        saturate = SATURATE
+        for y in range(min(self.height, len(pixels))):
+            column = pixels[y]
+            row = y * width
+            for x in range(min(width, len(column))):
+                intensity = intensities[row + x]
+                if not intensity:
+                    continue
+                light = ramp[intensity]
+                old = column[x].value
+                if not old >> 8:
+                    column[x] = light
+                    continue
+                value = light.value
+                column[x] = Color((saturate[(old >> 24) + (value >> 24)] << 24) |
+                                  (saturate[((old >> 16) & 0xFF) + ((value >> 16) & 0xFF)] << 16) |
+                                  (saturate[((old >> 8) & 0xFF) + ((value >> 8) & 0xFF)] << 8) | 0xFF)
+
+
+def ramp(color: Color) -> list:
+    """Precompute the 256 colors from black to the given color."""
+    return [
+        Color.fromRGB(color.red * i // 255, color.green * i // 255, color.blue * i // 255)
+        for i in range(256)]
@@ -0,0 +1,142 @@
+from array import array
+
+from pix6t4.fixedpoint import brightness_level, brightness_table, scale
+from pix6t4.layout import LedLayout
+
+
+class PixelBuffer:
+    """
+    Packs the framebuffer straight into the bytes sent to a NeoPixel strip.
+    This bypasses the per-pixel parsing, brightness and channel reordering of the
+    neopixel library: each channel goes through a precomputed correction table
+    (brightness, and optionally gamma) into its precomputed offset in the buffer.
+    """
+    def __init__(self, layout: LedLayout, pixel_order: str = "GRB", gamma: float = 1.0):
+        """Initialize a buffer for the LEDs of a layout, with the channel order of the strip."""
+        self.layout = layout
+        self.bpp = len(pixel_order)
+        self.buffer = bytearray(layout.num_leds * self.bpp)
+        self.view = memoryview(self.buffer)
+        self.previous = bytearray(len(self.buffer))
+        self.red = self.offsets(layout.table, pixel_order.index("R"))
+        self.green = self.offsets(layout.table, pixel_order.index("G"))
+        self.blue = self.offsets(layout.table, pixel_order.index("B"))
+        self.gamma = gamma
+        self.level = -1
+        self.correction = None
+        # The palette of the last indexed framebuffer, corrected into strip bytes (3 per entry)
+        self.palette_bytes = bytearray(3 * 256)
+        self.palette_source = None
+        self.palette_changes = -1
+        self.palette_level = -1
+        self.set_brightness(1.0)
+
+    def offsets(self, table, channel: int) -> array:
+        """Precompute the offset in the buffer of a channel for each framebuffer cell."""
+        return array("H", [led * self.bpp + channel for led in table])
+
+    def set_brightness(self, brightness: float):
+        """Rebuild the correction table, only if the brightness has changed."""
+        level = brightness_level(brightness)
+        if level == self.level:
+            return
+        self.level = level
+        if self.gamma == 1.0:
+            self.correction = brightness_table(level)
+        else:
+            self.correction = bytes(
+                int(((i / 255) ** self.gamma) * 255 + 0.5) * level >> 8 for i in range(256))
+
+    def pack(self, pixels, logo=()) -> memoryview:
+        """Convert the framebuffer and logo colors into strip bytes, and return the buffer."""
+        buffer = self.buffer
+        correction = self.correction
+        red, green, blue = self.red, self.green, self.blue
+        i = 0
+        for column in pixels:
+            for color in column:
+                value = color.value
+                buffer[red[i]] = correction[value >> 24]
+                buffer[green[i]] = correction[(value >> 16) & 0xFF]
+                buffer[blue[i]] = correction[(value >> 8) & 0xFF]
+                i += 1
+        self.pack_logo(logo)
+        return self.view
+
+    def pack_indexed(self, framebuffer, logo=()) -> memoryview:
+        """
+        Convert an indexed framebuffer and logo colors into strip bytes, and return the buffer.
+        The palette is corrected once, and only again when it or the brightness changes,
+        so that each pixel is three lookups in it.
+        """
+        corrected = self.palette_bytes
+        if (framebuffer is not self.palette_source or framebuffer.changes != self.palette_changes
+                or self.level != self.palette_level):
+            correction = self.correction
+            p = 0
+            for value in framebuffer.palette:
+                corrected[p] = correction[value >> 24]
+                corrected[p + 1] = correction[(value >> 16) & 0xFF]
+                corrected[p + 2] = correction[(value >> 8) & 0xFF]
+                p += 3
+            self.palette_source = framebuffer
+            self.palette_changes = framebuffer.changes
+            self.palette_level = self.level
+        buffer = self.buffer
+        red, green, blue = self.red, self.green, self.blue
+        indices = framebuffer.indices
+        if framebuffer.bits == 8:
+            for i in range(framebuffer.size):
+                p = indices[i] * 3
+                buffer[red[i]] = corrected[p]
+                buffer[green[i]] = corrected[p + 1]
+                buffer[blue[i]] = corrected[p + 2]
+        else:
+            for i in range(framebuffer.size):
+                byte = indices[i >> 1]
+                p = (byte & 0x0F if i & 1 else byte >> 4) * 3
+                buffer[red[i]] = corrected[p]
+                buffer[green[i]] = corrected[p + 1]
+                buffer[blue[i]] = corrected[p + 2]
+        self.pack_logo(logo)
+        return self.view
+
+    def changed(self) -> bool:
+        """Return True if the packed bytes differ from the last time this was called."""
+        if self.buffer == self.previous:
+            return False
+        self.previous[:] = self.buffer
+        return True
+
+    def pack_logo(self, logo):
+        """Convert the logo colors into strip bytes."""
+        if not logo:
+            return
+        buffer = self.buffer
+        correction = self.correction
+        offset = self.layout.logo_start * self.bpp
+        r, g, b = self.red[0] % self.bpp, self.green[0] % self.bpp, self.blue[0] % self.bpp
+        for color in logo:
+            value = color.value
+            buffer[offset + r] = correction[value >> 24]
+            buffer[offset + g] = correction[(value >> 16) & 0xFF]
+            buffer[offset + b] = correction[(value >> 8) & 0xFF]
+            offset += self.bpp
+
+
+def write_per_pixel(leds, layout: LedLayout, pixels, logo, brightness: float):
+    """
+    Set the LEDs of a neopixel strip one at a time. This is the slower path that goes
+    through the library's __setitem__, kept as a fallback and as a reference.
+    """
+    level = brightness_level(brightness)
+    table = layout.table
+    i = 0
+    for column in pixels:
+        for color in column:
+            leds[table[i]] = scale(color.value, level) >> 8
+            i += 1
+    led = layout.logo_start
+    for color in logo:
+        leds[led] = scale(color.value, level) >> 8
+        led += 1
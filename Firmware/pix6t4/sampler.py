@@ -0,0 +1,53 @@
+import sys
+import threading
+import time
+import traceback
+
+# Stack samples of frames that go over budget, for the emulator.
+# This runs on a computer, not on the device.
+
+
+class StackSampler:
+    """
+    Watches the frames of a console from a background thread. When a frame has been
+    running for longer than the budget of the current game, the stack of the thread
+    running the console is written to `output`, once per frame, while the frame is still
+    in progress, so it shows where the time goes rather than where the frame ended.
+    """
+    def __init__(self, pix6t4, interval: float = 0.005, output=None):
+        """Watch a console run by the current thread, checking every `interval` seconds."""
+        self.pix6t4 = pix6t4
+        self.thread_id = threading.get_ident()
+        self.interval = interval
+        self.output = output or sys.stderr
+        self.samples = 0
+        self.running = False
+        self.thread = threading.Thread(target=self.watch, daemon=True)
+
+    def start(self):
+        self.running = True
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.running = False
+        self.thread.join()
+
+    def watch(self):
+        watchdog = self.pix6t4.watchdog
+        sampled = 0
+        while self.running:
+            time.sleep(self.interval)
+            start = watchdog.start_ns
+            if start == 0 or start == sampled:
+                continue
+            budget_ms = self.pix6t4.current_game.frame_budget_ms
+            if watchdog.monotonic_ns() - start > budget_ms * 1000000:
+                frame = sys._current_frames().get(self.thread_id)
+                if frame is None or watchdog.start_ns != start:
+                    continue
+                sampled = start
+                self.samples += 1
+                self.output.write(f"Frame {self.pix6t4.clock.ticks} of {self.pix6t4.current_game.name} "
+                                  f"over its {budget_ms} ms budget, in:\n" + "".join(traceback.format_stack(frame)))
+                self.output.flush()
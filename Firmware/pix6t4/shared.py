@@ -0,0 +1,262 @@
+import cProfile
+import struct
+import sys
+import time
+from multiprocessing import shared_memory
+
+from pix6t4.clock import EmulatorClock
+from pix6t4.color import Color
+from pix6t4.console import PIX6T4Color
+from pix6t4.fixedpoint import brightness_level
+from pix6t4.sampler import StackSampler
+from pix6t4.storage import FileBackend, MemoryBackend
+
+# Shared memory between the emulator window and a game process, see PIX6T4ColorEmulator.
+# This runs on a computer, not on the device.
+
+# Frame block layout: a header, then width * height packed 0xRRGGBBAA colors in the
+# column-major order of PIX6T4Color.pixels. The sequence is odd while a frame is being
+# written, so the reader can tell a completed frame from a torn one without a lock.
+FRAME_HEADER = "<IHBBB"  # sequence, brightness level, width, height, running
+FRAME_HEADER_SIZE = 12
+
+# Ring block layout: the count of records written, the count of records read, then the slots
+RING_HEADER = "<II"
+RING_HEADER_SIZE = struct.calcsize(RING_HEADER)
+BUTTON_RECORD = "<BB"  # button, pressed (or a clock command, with CLOCK_COMMAND)
+CLOCK_COMMAND = 2
+DUMP_OVERRUNS = 3
+SOUND_RECORD = "<HH"  # frequency, duration
+
+
+class SharedFrame:
+    """The latest frame of the game process, written by the game and read by the window."""
+    def __init__(self, name: str = None, width: int = 8, height: int = 8):
+        """Create a new frame block, or attach to an existing one by name."""
+        if name is None:
+            self.memory = shared_memory.SharedMemory(create=True, size=FRAME_HEADER_SIZE + 4 * width * height)
+            struct.pack_into(FRAME_HEADER, self.memory.buf, 0, 0, 256, width, height, 1)
+        else:
+            self.memory = shared_memory.SharedMemory(name)
+        self.name = self.memory.name
+        _, _, self.width, self.height, _ = struct.unpack_from(FRAME_HEADER, self.memory.buf)
+        self.values = self.memory.buf[FRAME_HEADER_SIZE:FRAME_HEADER_SIZE + 4 * self.width * self.height].cast("I")
+
+    @property
+    def sequence(self) -> int:
+        return struct.unpack_from("<I", self.memory.buf, 0)[0]
+
+    @property
+    def running(self) -> bool:
+        return self.memory.buf[8] == 1
+
+    @running.setter
+    def running(self, running: bool):
+        self.memory.buf[8] = 1 if running else 0
+
+    def write(self, pixels, brightness: float):
+        """Publish a frame from a grid of Colors."""
+        buffer = self.memory.buf
+        sequence = self.sequence + 1
+        struct.pack_into("<I", buffer, 0, sequence)
+        struct.pack_into("<H", buffer, 4, brightness_level(brightness))
+        values = self.values
+        i = 0
+        for column in pixels:
+            for color in column:
+                values[i] = color.value
+                i += 1
+        struct.pack_into("<I", buffer, 0, sequence + 1)
+
+    def read(self, values) -> int:
+        """
+        Copy the latest completed frame into a list or array of packed colors, and return
+        its sequence, or None if a frame was being written.
+        """
+        sequence = self.sequence
+        if sequence & 1:
+            return None
+        values[:] = self.values
+        return sequence if self.sequence == sequence else None
+
+    def level(self) -> int:
+        """Return the brightness level of the latest frame."""
+        return struct.unpack_from("<H", self.memory.buf, 4)[0]
+
+    def close(self, unlink: bool = False):
+        """Detach from the block, and destroy it if this process created it."""
+        self.values.release()
+        self.memory.close()
+        if unlink:
+            self.memory.unlink()
+
+
+class EventRing:
+    """
+    A single-producer, single-consumer queue of fixed-size records in shared memory.
+    The producer only writes the slots and the write count, the consumer only the read
+    count, so neither side needs a lock. Records are dropped when the ring is full.
+    """
+    def __init__(self, name: str = None, capacity: int = 64, record: str = BUTTON_RECORD):
+        """Create a new ring, or attach to an existing one by name."""
+        self.record = record
+        self.record_size = struct.calcsize(record)
+        self.capacity = capacity
+        if name is None:
+            self.memory = shared_memory.SharedMemory(create=True, size=RING_HEADER_SIZE + capacity * self.record_size)
+            struct.pack_into(RING_HEADER, self.memory.buf, 0, 0, 0)
+        else:
+            self.memory = shared_memory.SharedMemory(name)
+        self.name = self.memory.name
+
+    def put(self, *values) -> bool:
+        """Add a record, and return False if the ring was full."""
+        written, read = struct.unpack_from(RING_HEADER, self.memory.buf)
+        if written - read >= self.capacity:
+            return False
+        offset = RING_HEADER_SIZE + (written % self.capacity) * self.record_size
+        struct.pack_into(self.record, self.memory.buf, offset, *values)
+        # Publish the record only once it's complete
+        struct.pack_into("<I", self.memory.buf, 0, (written + 1) & 0xFFFFFFFF)
+        return True
+
+    def get(self):
+        """Remove and return the oldest record, or None if the ring is empty."""
+        written, read = struct.unpack_from(RING_HEADER, self.memory.buf)
+        if written == read:
+            return None
+        offset = RING_HEADER_SIZE + (read % self.capacity) * self.record_size
+        values = struct.unpack_from(self.record, self.memory.buf, offset)
+        struct.pack_into("<I", self.memory.buf, 4, (read + 1) & 0xFFFFFFFF)
+        return values
+
+    def close(self, unlink: bool = False):
+        """Detach from the ring, and destroy it if this process created it."""
+        self.memory.close()
+        if unlink:
+            self.memory.unlink()
+
+
+class RemoteScreen:
+    """
+    The window side of a game process: the latest completed frame as a grid of Colors,
+    and the buttons, which are sent to the game. It stands in for the console in the window.
+    """
+    def __init__(self, frame: SharedFrame, buttons: EventRing):
+        self.frame = frame
+        self.buttons = buttons
+        self.width = frame.width
+        self.height = frame.height
+        self.values = [0x000000FF for _ in range(frame.width * frame.height)]
+        self.pixels = [[Color.BLACK for _ in range(frame.height)] for _ in range(frame.width)]
+        self.brightness = 1.0
+        self.sequence = 0
+
+    def update(self) -> bool:
+        """Pick up the latest completed frame, and return True if it's new."""
+        sequence = self.frame.read(self.values)
+        if sequence is None or sequence == self.sequence:
+            return False
+        self.sequence = sequence
+        self.brightness = self.frame.level() / 256
+        height = self.frame.height
+        for i, value in enumerate(self.values):
+            column = self.pixels[i // height]
+            if column[i % height].value != value:
+                column[i % height] = Color(value)
+        return True
+
+    def handle_button_pressed(self, button: int):
+        self.buttons.put(button, 1)
+
+    def handle_button_released(self, button: int):
+        self.buttons.put(button, 0)
+
+    def control_clock(self, command: int):
+        """The clock runs in the game process, so commands go along with the buttons."""
+        self.buttons.put(command, CLOCK_COMMAND)
+
+    def dump_overruns(self):
+        """The watchdog runs in the game process, which prints its overruns."""
+        self.buttons.put(0, DUMP_OVERRUNS)
+
+
+class PIX6T4ColorProcess(PIX6T4Color):
+    """A PIX6T4 Color that runs in its own process, and talks to the emulator window through shared memory."""
+    def __init__(self, frame: SharedFrame, buttons: EventRing, sounds: EventRing, storage_path: str = None):
+        self.storage_path = storage_path
+        super().__init__(frame.width, frame.height)
+        self.frame = frame
+        self.buttons = buttons
+        self.sounds = sounds
+
+    def create_clock(self):
+        return EmulatorClock()
+
+    def storage_backend(self):
+        """Settings and high scores are kept in the emulator's file, or in RAM for throwaway consoles."""
+        return MemoryBackend() if self.storage_path is None else FileBackend(self.storage_path)
+
+    def run(self, interval: float = 0.05):
+        """Every `interval` seconds, run the frames due on the clock, until the window stops the game process."""
+        while self.frame.running:
+            self.handle_events()
+            self.advance(self.clock.ticks_due())
+            time.sleep(interval)
+        self.storage.flush()
+
+    def handle_events(self):
+        """Handle the buttons pressed and the clock commands sent by the window."""
+        event = self.buttons.get()
+        while event is not None:
+            code, pressed = event
+            if pressed == CLOCK_COMMAND:
+                self.clock.command(code)
+            elif pressed == DUMP_OVERRUNS:
+                self.watchdog.dump()
+            elif pressed:
+                self.handle_button_pressed(code)
+            else:
+                self.handle_button_released(code)
+            event = self.buttons.get()
+
+    def render(self):
+        """Publish the frame to the window."""
+        if self.showing_indexed():
+            self.indexed.resolve(self.front)
+        self.frame.write(self.front, self.brightness)
+
+    def frame_overrun(self, overrun):
+        """Log the frames that go over budget, since the window can't see them."""
+        print(f"Overrun: {overrun}", file=sys.stderr)
+
+    def beep(self, frequency: int = 440, duration: int = 200):
+        """Ask the window to play a beep."""
+        if self.sound_enabled:
+            self.sounds.put(frequency, self.clock.real_duration(duration))
+
+
+def run_game_process(frame_name: str, buttons_name: str, sounds_name: str,
+                     storage_path: str = None, profile_path: str = None):
+    """
+    The entry point of the game process. If profile_path is given, the game process is
+    profiled on its own and the statistics are written there when it stops.
+    """
+    frame = SharedFrame(frame_name)
+    buttons = EventRing(buttons_name, record=BUTTON_RECORD)
+    sounds = EventRing(sounds_name, record=SOUND_RECORD)
+    pix6t4 = PIX6T4ColorProcess(frame, buttons, sounds, storage_path)
+    sampler = StackSampler(pix6t4).start()
+    profiler = cProfile.Profile() if profile_path else None
+    if profiler is not None:
+        profiler.enable()
+    try:
+        pix6t4.run()
+    finally:
+        if profiler is not None:
+            profiler.disable()
+            profiler.dump_stats(profile_path)
+        sampler.stop()
+        frame.close()
+        buttons.close()
+        sounds.close()
@@ -0,0 +1,122 @@
+import json
+import time
+
+
+class MemoryBackend:
+    """Keeps the settings in RAM only. They are lost when the console stops."""
+    def __init__(self):
+        self.data = {}
+
+    def load(self) -> dict:
+        return dict(self.data)
+
+    def save(self, values: dict):
+        self.data = dict(values)
+
+
+class FileBackend:
+    """Stores the settings as JSON in a file, for the emulator and headless consoles."""
+    def __init__(self, path: str):
+        self.path = path
+
+    def load(self) -> dict:
+        try:
+            with open(self.path, "r") as file:
+                return json.load(file)
+        except (OSError, ValueError):
+            return {}
+
+    def save(self, values: dict):
+        with open(self.path, "w") as file:
+            json.dump(values, file)
+
+
+class NvmBackend:
+    """
+    Stores the settings as JSON in the non-volatile memory of the microcontroller
+    (microcontroller.nvm), after a two-byte length.
+    """
+    def __init__(self, nvm):
+        self.nvm = nvm
+
+    def load(self) -> dict:
+        length = self.nvm[0] | (self.nvm[1] << 8)
+        if length == 0 or length == 0xFFFF or length > len(self.nvm) - 2:
+            return {}  # Erased or never written
+        try:
+            return json.loads(bytes(self.nvm[2:2 + length]).decode())
+        except (UnicodeError, ValueError):
+            return {}
+
+    def save(self, values: dict):
+        data = json.dumps(values).encode()
+        if len(data) > len(self.nvm) - 2:
+            raise ValueError("Settings don't fit in non-volatile memory.")
+        self.nvm[0:2 + len(data)] = bytes((len(data) & 0xFF, len(data) >> 8)) + data
+
+
+class Storage:
+    """
+    A small key-value store for settings and high scores.
+    Reads are served from a cache loaded once at boot. Writes only change the cache,
+    and are written to the backend in one go by `flush`, either at the end of a game
+    or by `tick` once no change has happened for `debounce` seconds. This saves flash
+    from wearing out and frames from stalling on blocking writes.
+    """
+    def __init__(self, backend, debounce: float = 2.0, monotonic=time.monotonic):
+        """Initialize the store and load its values from the backend, with a source of time in seconds."""
+        self.backend = backend
+        self.debounce = debounce
+        self.monotonic = monotonic
+        self.values = backend.load()
+        self.dirty = False
+        self.flush_time = 0
+
+    def get(self, key: str, default=None):
+        """Return the value for a key, or the default if it was never set."""
+        return self.values.get(key, default)
+
+    def set(self, key: str, value):
+        """Set the value for a key. It will be written to the backend later."""
+        if self.values.get(key) == value:
+            return
+        self.values[key] = value
+        self.dirty = True
+        self.flush_time = self.monotonic() + self.debounce
+
+    def tick(self, now: float = None):
+        """Write pending changes to the backend if they have settled."""
+        if self.dirty and (self.monotonic() if now is None else now) >= self.flush_time:
+            self.flush()
+
+    def flush(self):
+        """
+        Write pending changes to the backend now. If they don't fit, the high scores are
+        left out of the write, and if they still don't fit or the backend fails, the write
+        is dropped and the values stay in RAM only, rather than failing on every frame.
+        """
+        if not self.dirty:
+            return
+        self.dirty = False
+        try:
+            self.backend.save(self.values)
+        except ValueError:
+            settings = {key: value for key, value in self.values.items() if not key.startswith("high_score.")}
+            try:
+                self.backend.save(settings)
+                print("Settings storage full, high scores were not saved")
+            except (OSError, ValueError) as error:
+                print(f"Settings were not saved: {error}")
+        except OSError as error:
+            print(f"Settings were not saved: {error}")
+
+    def high_score(self, game_name: str) -> int:
+        """Return the high score of a game."""
+        return self.get("high_score." + game_name, 0)
+
+    def submit_score(self, game_name: str, score: int) -> bool:
+        """Record a score, and return True if it's a new high score."""
+        if score <= self.high_score(game_name):
+            return False
+        self.set("high_score." + game_name, score)
+        return True
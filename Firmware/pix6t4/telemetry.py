@@ -0,0 +1,81 @@
+import gc
+import struct
+import time
+
+# Binary telemetry records, one per frame, written to a stream such as usb_cdc.data.
+# usb_cdc.data only exists when boot.py enables it with usb_cdc.enable(console=True, data=True).
+# Decode them on a computer with pix6t4.telemetry_reader.
+
+TELEMETRY_MAGIC = 0x5AA5  # Starts every record, so a reader can find the next one after lost bytes
+# magic, sequence, frame, frame time (us), render time (us), GC pause (us), free heap (bytes),
+# records dropped by the stream, button events dropped by the keypad
+TELEMETRY_RECORD = "<HHIIIIIHH"
+TELEMETRY_RECORD_SIZE = struct.calcsize(TELEMETRY_RECORD)
+TICKS_MAX = (1 << 29) - 1  # supervisor.ticks_ms wraps around after this
+
+try:
+    from supervisor import ticks_ms  # A small int that wraps around, so timing with it doesn't allocate
+except ImportError:
+    def ticks_ms() -> int:
+        return (time.monotonic_ns() // 1000000) & TICKS_MAX
+
+
+class Telemetry:
+    """
+    Sends a fixed-size record per frame to a stream. Records are packed into a preallocated
+    buffer and frames are timed with ticks_ms, whose values stay small ints on the device
+    unlike time.monotonic_ns, so sending one doesn't allocate. A record the stream doesn't
+    take completely is counted as dropped rather than retried, and the count goes with the
+    next records, so sending never holds up a frame.
+    """
+    def __init__(self, stream, ticks=ticks_ms, tick_us: int = 1000):
+        """Send records to a stream with a write method, such as usb_cdc.data or a file, timed by `ticks` of `tick_us`."""
+        self.stream = stream
+        self.ticks = ticks
+        self.tick_us = tick_us
+        self.buffer = bytearray(TELEMETRY_RECORD_SIZE)
+        self.sequence = 0
+        self.dropped = 0
+        self.lost_input = 0  # Set by the platform, see PIX6T4ColorHardware.count_lost_input
+        # Collecting garbage before every frame makes GC pauses measurable, but changes the
+        # timing of the frames, so it's off unless the platform turns it on
+        self.collect_garbage = False
+        self.gc_us = 0  # The last collection timed with collect, sent with the next record
+        self.frame_start = 0
+        self.render_start = None
+        self.mem_free = getattr(gc, "mem_free", None)  # CircuitPython only
+
+    def elapsed_us(self, start: int, end: int) -> int:
+        """Return the time between two ticks in microseconds, through the wrap-around of the ticks."""
+        return min((end - start) & TICKS_MAX, 0xFFFFFFFF // self.tick_us) * self.tick_us
+
+    def start(self):
+        """Mark the start of a frame."""
+        self.frame_start = self.ticks()
+        self.render_start = None
+
+    def rendering(self):
+        """Mark the start of the render of the frame."""
+        self.render_start = self.ticks()
+
+    def collect(self):
+        """Collect garbage between frames, and time it for the next record."""
+        start = self.ticks()
+        gc.collect()
+        self.gc_us = self.elapsed_us(start, self.ticks())
+
+    def send(self, frame: int):
+        """Send the record of the frame that just finished."""
+        end = self.ticks()
+        render_us = 0 if self.render_start is None else self.elapsed_us(self.render_start, end)
+        struct.pack_into(TELEMETRY_RECORD, self.buffer, 0, TELEMETRY_MAGIC, self.sequence & 0xFFFF,
+                         frame & 0xFFFFFFFF, self.elapsed_us(self.frame_start, end), render_us, self.gc_us,
+                         self.mem_free() if self.mem_free else 0, min(self.dropped, 0xFFFF), min(self.lost_input, 0xFFFF))
+        self.sequence += 1
+        self.gc_us = 0
+        try:
+            written = self.stream.write(self.buffer)
+        except OSError:
+            written = 0
+        if (written or 0) < TELEMETRY_RECORD_SIZE:
+            self.dropped += 1
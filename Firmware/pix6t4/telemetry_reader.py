@@ -0,0 +1,148 @@
+import argparse
+import csv
+import os
+import struct
+import sys
+import time
+
+from pix6t4.telemetry import TELEMETRY_MAGIC, TELEMETRY_RECORD, TELEMETRY_RECORD_SIZE
+
+# Live decoder of the telemetry of a device, see pix6t4.telemetry.
+# This runs on a computer, not on the device:
+# python -m pix6t4.telemetry_reader /dev/ttyACM1 --csv frames.csv
+
+FIELDS = ("sequence", "frame", "frame_us", "render_us", "gc_us", "free_heap", "dropped", "lost_input")
+MAGIC_BYTES = struct.pack("<H", TELEMETRY_MAGIC)
+
+
+class Decoder:
+    """
+    Turns a byte stream into telemetry records. Bytes that don't start a record are skipped
+    until the next magic, so the decoder finds its way again after bytes were lost, and
+    gaps in the sequence are counted as missed records.
+    """
+    def __init__(self):
+        self.pending = bytearray()
+        self.skipped = 0  # Bytes thrown away while looking for a record
+        self.missed = 0  # Records the sequence says were sent but never arrived
+        self.sequence = None
+
+    def feed(self, data: bytes) -> list:
+        """Add bytes from the stream, and return the records they complete, as dicts."""
+        self.pending += data
+        records = []
+        while len(self.pending) >= TELEMETRY_RECORD_SIZE:
+            if self.pending[:2] != MAGIC_BYTES:
+                start = self.pending.find(MAGIC_BYTES, 1)
+                if start < 0:
+                    # Keep the last byte, it may be the first half of a magic
+                    start = len(self.pending) - 1
+                self.skipped += start
+                del self.pending[:start]
+                continue
+            record = dict(zip(FIELDS, struct.unpack_from(TELEMETRY_RECORD, self.pending)[1:]))
+            del self.pending[:TELEMETRY_RECORD_SIZE]
+            if self.sequence is not None:
+                self.missed += (record["sequence"] - self.sequence - 1) & 0xFFFF
+            self.sequence = record["sequence"]
+            records.append(record)
+        return records
+
+
+class RollingStats:
+    """Statistics over the latest `window` records."""
+    def __init__(self, window: int = 100):
+        self.window = window
+        self.records = []
+        self.count = 0
+
+    def add(self, record: dict):
+        self.records.append(record)
+        if len(self.records) > self.window:
+            del self.records[0]
+        self.count += 1
+
+    def summary(self, field: str) -> tuple:
+        """Return the mean, the 95th percentile and the maximum of a field."""
+        values = sorted(record[field] for record in self.records)
+        if not values:
+            return 0, 0, 0
+        return sum(values) // len(values), values[min(len(values) - 1, len(values) * 95 // 100)], values[-1]
+
+    def describe(self) -> str:
+        """Return a one-line summary, with times in milliseconds."""
+        if not self.records:
+            return "no frames yet"
+        parts = [f"{self.count} frames"]
+        for field in ("frame_us", "render_us", "gc_us"):
+            mean, p95, peak = self.summary(field)
+            parts.append(f"{field[:-3]} {mean / 1000:.1f}/{p95 / 1000:.1f}/{peak / 1000:.1f} ms")
+        latest = self.records[-1]
+        parts.append(f"free {latest['free_heap']} B, dropped {latest['dropped']}, lost input {latest['lost_input']}")
+        return ", ".join(parts)
+
+
+def open_serial(path: str) -> int:
+    """Open a serial port or pseudo-terminal in raw mode, and return its file descriptor."""
+    import termios
+    import tty
+
+    fd = os.open(path, os.O_RDONLY | os.O_NOCTTY)
+    tty.setraw(fd, termios.TCSANOW)
+    return fd
+
+
+def read(fd: int, decoder: Decoder, stats: RollingStats, writer=None, duration: float = None,
+         report_every: float = 1.0, output=None):
+    """
+    Decode records from a file descriptor until it closes or `duration` seconds have passed,
+    writing each record to a csv.DictWriter if given, and the rolling stats to `output`.
+    """
+    output = output or sys.stdout
+    start = last_report = time.monotonic()
+    while duration is None or time.monotonic() - start < duration:
+        try:
+            data = os.read(fd, 4096)
+        except OSError:
+            break  # The device went away
+        if not data:
+            break
+        for record in decoder.feed(data):
+            stats.add(record)
+            if writer is not None:
+                writer.writerow(record)
+        if time.monotonic() - last_report >= report_every:
+            last_report = time.monotonic()
+            print(stats.describe(), file=output)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Decode the telemetry of a PIX6T4 Color.")
+    parser.add_argument("port", help="the data serial port of the device, such as /dev/ttyACM1")
+    parser.add_argument("--csv", help="write every record to this CSV file")
+    parser.add_argument("--window", type=int, default=100, help="number of frames in the rolling stats")
+    parser.add_argument("--duration", type=float, help="stop after this many seconds")
+    args = parser.parse_args()
+
+    fd = open_serial(args.port)
+    decoder = Decoder()
+    stats = RollingStats(args.window)
+    file = open(args.csv, "w", newline="") if args.csv else None
+    writer = csv.DictWriter(file, FIELDS) if file else None
+    if writer is not None:
+        writer.writeheader()
+    try:
+        read(fd, decoder, stats, writer, args.duration)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        os.close(fd)
+        if file is not None:
+            file.close()
+    print(stats.describe())
+    print(f"{decoder.missed} records missed, {decoder.skipped} bytes skipped")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,93 @@
+import io
+import struct
+import unittest
+import zlib
+from unittest import TestCase
+from pix6t4.assets import NearestColor, choose_palette, compile_asset, read_ascii, read_png
+from pix6t4.bitmap import Asset, Bitmap
+from pix6t4.color import Color
+from pix6t4.indexed import IndexedFramebuffer
+
+def paeth(left, up, up_left):
+    estimate = left + up - up_left
+    if abs(estimate - left) <= abs(estimate - up) and abs(estimate - left) <= abs(estimate - up_left):
+        return left
+    return up if abs(estimate - up) <= abs(estimate - up_left) else up_left
+
+def encode_png(width, height, rows):
+    """Encode RGBA rows as a PNG, cycling through the five scanline filters."""
+    raw = bytearray()
+    previous = bytes(width * 4)
+    for y, row in enumerate(rows):
+        line = b"".join(struct.pack(">I", value) for value in row)
+        kind = y % 5
+        raw.append(kind)
+        for i, value in enumerate(line):
+            left = line[i - 4] if i >= 4 else 0
+            up_left = previous[i - 4] if i >= 4 else 0
+            predictor = [0, left, previous[i], (left + previous[i]) >> 1, paeth(left, previous[i], up_left)][kind]
+            raw.append((value - predictor) & 0xFF)
+        previous = line
+    def chunk(kind, data):
+        return struct.pack(">I", len(data)) + kind + data + struct.pack(">I", zlib.crc32(kind + data))
+    return (b"\x89PNG\r\n\x1a\n" + chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 6, 0, 0, 0)) +
+            chunk(b"IDAT", zlib.compress(bytes(raw))) + chunk(b"IEND", b""))
+
+class TestAssets(TestCase):
+    def test_png_decodes_every_filter(self):
+        rows = [[((x * 37 + y * 11) & 0xFF) << 24 | (x * y & 0xFF) << 16 | (200 - x - y) << 8 | 0xFF
+                 for x in range(9)] for y in range(10)]
+        self.assertEqual(read_png(encode_png(9, 10, rows)), (9, 10, rows))
+
+    def test_nearest_color_keeps_exact_colors(self):
+        palette = [Color.BLACK.value, Color.RED.value, Color.WHITE.value]
+        nearest = NearestColor(palette)
+        self.assertEqual([nearest(value) for value in palette], [0, 1, 2])
+        self.assertEqual(nearest(0xE01010FF), 1)
+        self.assertEqual(nearest(0xD0D0D0FF), 2)
+        self.assertEqual(nearest(0xFFFFFF00), 0)  # transparent
+
+    def test_many_colors_are_reduced_to_the_most_used(self):
+        rows = [[(x << 24) | (y << 16) | 0xFF for x in range(64)] for y in range(64)]
+        self.assertEqual(len(choose_palette(rows, 16)), 16)
+
+    def test_ascii_asset_matches_from_ascii_art(self):
+        art = """
+#rrYYY##
+rBrYYYY#
+rrYYBYrr
+YYYYYY##
+YYYY####
+YYYYYYrr
+#YYYYYY#
+##YYYY##
+"""
+        asset = Asset(io.BytesIO(compile_asset(*read_ascii(art))))
+        self.assertEqual((asset.bits, asset.width, asset.height, len(asset.colors)), (4, 8, 8, 4))
+        expected = [[Color.BLACK for _ in range(8)] for _ in range(8)]
+        Bitmap.from_ascii_art(art).blit(0, 0, 8, 8, expected)
+        pixels = [[Color.WHITE for _ in range(8)] for _ in range(8)]
+        asset.blit(pixels)
+        self.assertEqual(pixels, expected)
+
+    def test_loads_into_an_indexed_framebuffer_in_bulk(self):
+        rows = [[Color.RED.value if (x + y) % 3 else Color.BLUE.value for x in range(8)] for y in range(8)]
+        asset = Asset(io.BytesIO(compile_asset(8, 8, rows)))
+        framebuffer = IndexedFramebuffer(bits=4, palette=[Color.BLACK] * 16)
+        asset.load_into(framebuffer)
+        pixels = [[Color.BLACK for _ in range(8)] for _ in range(8)]
+        framebuffer.resolve(pixels)
+        self.assertEqual([[color.value for color in column] for column in pixels],
+                         [[rows[y][x] for y in range(8)] for x in range(8)])
+
+    def test_blit_clips_to_the_target(self):
+        rows = [[Color.GREEN.value] * 3 for _ in range(2)]
+        asset = Asset(io.BytesIO(compile_asset(3, 2, rows)))
+        pixels = [[Color.BLACK for _ in range(8)] for _ in range(8)]
+        asset.blit(pixels, 6, -1)
+        lit = [(x, y) for x in range(8) for y in range(8) if pixels[x][y] == Color.GREEN]
+        self.assertEqual(lit, [(6, 0), (7, 0)])
+
+    def test_rejects_other_files(self):
+        with self.assertRaises(ValueError):
+            Asset(io.BytesIO(b"P6BK" + bytes(16)))
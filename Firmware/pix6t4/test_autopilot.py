@@ -0,0 +1,19 @@
+import unittest
+from unittest import TestCase
+from pix6t4.autopilot import hamiltonian_cycle
+from pix6t4.farm import play
+
+class TestAutopilot(TestCase):
+    def test_hamiltonian_cycle_visits_every_cell_once_through_neighbors(self):
+        cycle = hamiltonian_cycle(8)
+        self.assertEqual(sorted(cycle), [(row, column) for row in range(8) for column in range(8)])
+        for (row, column), (next_row, next_column) in zip(cycle, cycle[1:] + cycle[:1]):
+            self.assertEqual(abs(next_row - row) + abs(next_column - column), 1)
+
+    def test_snake_autopilot_fills_the_board(self):
+        result = play(("Monty", "snake", 0, 100000, {}))
+        self.assertEqual(result["score"], 62)  # 2 cells to start with, 62 apples
+
+    def test_mspixman_autopilot_eats_all_the_candy(self):
+        result = play(("mspixman", "mspixman", 0, 20000, {}))
+        self.assertEqual(result["score"], 1330)
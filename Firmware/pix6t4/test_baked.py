@@ -0,0 +1,67 @@
+import io
+import os
+import tempfile
+import unittest
+from unittest import TestCase
+from pix6t4.baked import BakedAnimation, bake, find_period, HEADER_SIZE
+from pix6t4.console import PIX6T4Color
+from games.attractmode import BeachBall
+
+def frame_values(pix6t4):
+    return [color.value for column in pix6t4.pixels for color in column]
+
+class TestBaked(TestCase):
+    def test_finds_the_shortest_period(self):
+        self.assertEqual(find_period(BeachBall(PIX6T4Color())), 90)
+
+    def test_bake_writes_header_and_frames(self):
+        stream = io.BytesIO()
+        frames = bake(BeachBall(PIX6T4Color()), stream)
+        self.assertEqual(frames, 90)
+        self.assertEqual(len(stream.getvalue()), HEADER_SIZE + 90 * 64 * 4)
+
+    def test_baked_playback_matches_live_animation(self):
+        live_console = PIX6T4Color()
+        live = BeachBall(live_console)
+        baked_console = PIX6T4Color()
+        with tempfile.TemporaryDirectory() as folder:
+            baked = BakedAnimation(BeachBall(baked_console), os.path.join(folder, "beachball.p6b"), chunk_frames=7)
+            for _ in range(200):
+                live.draw_frame()
+                baked.draw_frame()
+                self.assertEqual(frame_values(baked_console), frame_values(live_console))
+            report = baked.report()
+            baked.file.close()
+        self.assertEqual(report["frames"], 90)
+        self.assertEqual(report["flash_bytes"], HEADER_SIZE + 90 * 64 * 4)
+
+    def test_falls_back_to_ram_when_flash_is_read_only(self):
+        baked = BakedAnimation(BeachBall(PIX6T4Color()), "/nonexistent/folder/beachball.p6b")
+        baked.draw_frame()
+        self.assertIsNone(baked.file)
+        self.assertEqual(len(baked.table), 90 * 64)
+
+    def test_out_of_date_files_are_baked_again(self):
+        class Edited(BeachBall):
+            bake_version = 2
+
+        with tempfile.TemporaryDirectory() as folder:
+            path = os.path.join(folder, "beachball.p6b")
+            with open(path, "wb") as stream:
+                bake(BeachBall(PIX6T4Color(16, 8)), stream)
+            for animation, console in ((BeachBall, PIX6T4Color(8, 16)), (Edited, PIX6T4Color(8, 16))):
+                live_console = PIX6T4Color(8, 16)
+                live = animation(live_console)
+                baked = BakedAnimation(animation(console), path)
+                for _ in range(20):
+                    live.draw_frame()
+                    baked.draw_frame()
+                    self.assertEqual(frame_values(console), frame_values(live_console))
+                self.assertIsNotNone(baked.file)
+                baked.file.close()
+            with open(path, "r+b") as stream:
+                stream.truncate(HEADER_SIZE + 64 * 4)
+            baked = BakedAnimation(Edited(PIX6T4Color(8, 16)), path)
+            baked.draw_frame()
+            baked.file.close()
+            self.assertEqual(os.path.getsize(path), HEADER_SIZE + baked.frames * 128 * 4)
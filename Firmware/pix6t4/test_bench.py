@@ -0,0 +1,37 @@
+import unittest
+from unittest import TestCase
+from pix6t4.bench import CALIBRATION, parse_report, regressions, report, suite, typical
+
+class TestBench(TestCase):
+    def test_report_can_be_read_back(self):
+        lines = []
+        results = report(min_ns=100000, names=("Color.fromRGBA", "PIX6T4Color.plot"), output=lines.append)
+        self.assertEqual(set(results), {CALIBRATION, "Color.fromRGBA", "PIX6T4Color.plot"})
+        self.assertEqual(len(lines), 3)
+        text = "\n".join(f"{name:<32}{ns:>10} ns/op{allocated:>8} B/op" for name, (ns, allocated) in results.items())
+        self.assertEqual(parse_report("soft reboot\n>>> bench.report()\n" + text + "\n>>> "), results)
+
+    def test_suite_covers_every_size_and_can_be_read_back(self):
+        names = [name for name, _ in suite()]
+        for size in ("8x8", "16x16", "32x32"):
+            self.assertIn("PixelBuffer.pack@" + size, names)
+        self.assertIn("Buckets.pairs@256", names)
+        self.assertEqual(len(set(names)), len(names))
+        self.assertTrue(all(len(name.split()) == 1 for name in names))  # parse_report splits on spaces
+
+    def test_regressions_past_the_threshold_are_reported(self):
+        baselines = {"fast": {"ns": 100, "bytes": 0}, "slow": {"ns": 1000, "bytes": 64}}
+        self.assertEqual(regressions({"fast": (140, 0), "slow": (1400, 64), "new": (5, 5)}, baselines, 1.5), [])
+        self.assertEqual(regressions({"fast": (160, 0)}, baselines, 1.5), ["fast: 160 ns/op, baseline 100 ns/op"])
+        self.assertEqual(regressions({"fast": (100, 16)}, baselines, 1.5), ["fast: 16 B/op, baseline 0 B/op"])
+
+    def test_times_are_relative_to_the_calibration(self):
+        baselines = {CALIBRATION: {"ns": 100, "bytes": 0}, "op": {"ns": 1000, "bytes": 0}}
+        self.assertEqual(regressions({CALIBRATION: (200, 0), "op": (2800, 0)}, baselines, 1.5), [])
+        self.assertEqual(regressions({CALIBRATION: (100, 0), "op": (1600, 0)}, baselines, 1.5),
+                         ["op: 1600 ns/op, baseline 1000 ns/op (calibration at 1.00x its baseline)"])
+
+    def test_baselines_take_the_median_run(self):
+        runs = [{CALIBRATION: (100, 0), "op": (300, 8)}, {CALIBRATION: (200, 0), "op": (400, 8)},
+                {CALIBRATION: (100, 0), "op": (900, 16)}]
+        self.assertEqual(typical(runs), {CALIBRATION: (100, 0), "op": (300, 16)})
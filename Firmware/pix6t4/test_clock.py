@@ -0,0 +1,58 @@
+import unittest
+from unittest import TestCase
+from pix6t4.clock import FASTER, NORMAL, PAUSE, SLOWER, STEP, EmulatorClock
+from pix6t4.headless import PIX6T4ColorHeadless
+
+class FakeTime:
+    def __init__(self):
+        self.now = 0
+
+    def __call__(self):
+        return self.now
+
+class TestClock(TestCase):
+    def setUp(self):
+        self.real = FakeTime()
+        self.clock = EmulatorClock(frame_ns=50, real=self.real)
+        self.clock.ticks_due()
+
+    def elapse(self, ns):
+        self.real.now += ns
+        return self.clock.ticks_due()
+
+    def test_speed_sets_ticks_per_refresh(self):
+        self.assertEqual(self.elapse(50), 1)
+        self.clock.command(FASTER)
+        self.clock.command(FASTER)
+        self.assertEqual(self.elapse(50), 4)
+        self.clock.command(NORMAL)
+        self.clock.command(SLOWER)
+        self.assertEqual([self.elapse(50) for _ in range(4)], [0, 1, 0, 1])
+        self.assertEqual(self.clock.real_duration(200), 400)
+
+    def test_fast_forward_is_capped(self):
+        for _ in range(10):
+            self.clock.command(FASTER)
+        self.assertEqual(self.clock.speed, 16)
+        self.assertEqual(self.elapse(5000), EmulatorClock.max_ticks)
+        self.assertEqual(self.elapse(50), 16)
+
+    def test_pause_and_step(self):
+        self.clock.command(PAUSE)
+        self.assertEqual(self.elapse(500), 0)
+        self.clock.command(STEP)
+        self.clock.command(STEP)
+        self.assertEqual(self.elapse(500), 2)
+        self.assertEqual(self.elapse(500), 0)
+        self.assertEqual(self.clock.describe(), "paused")
+        self.clock.command(PAUSE)
+        self.assertEqual(self.elapse(100), 2)
+
+    def test_headless_settings_are_saved_in_virtual_time(self):
+        pix6t4 = PIX6T4ColorHeadless()
+        pix6t4.set_brightness(0.5)
+        pix6t4.advance(39)
+        self.assertTrue(pix6t4.storage.dirty)
+        pix6t4.advance(1)
+        self.assertFalse(pix6t4.storage.dirty)
+        self.assertEqual(pix6t4.clock.monotonic(), 2.0)
@@ -0,0 +1,95 @@
+import random
+import unittest
+from unittest import TestCase
+from pix6t4.collision import Buckets, Mask, Sprite
+
+GHOST = Mask.from_ascii_art([
+    " # ",
+    "###",
+    "# #",
+])
+
+
+class TestMask(TestCase):
+    def test_set_clear_test(self):
+        mask = Mask(8, 8)
+        mask.set(2, 5)
+        self.assertTrue(mask.test(2, 5))
+        self.assertFalse(mask.test(5, 2))
+        mask.clear(2, 5)
+        self.assertFalse(mask.test(2, 5))
+
+    def test_cells_outside_are_free(self):
+        mask = Mask.from_cells([(0, 0), (7, 7)])
+        self.assertFalse(mask.test(-1, 0))
+        self.assertFalse(mask.test(0, 8))
+        self.assertFalse(mask.test(8, 7))
+
+    def test_from_ascii_art(self):
+        self.assertEqual((GHOST.width, GHOST.height), (3, 3))
+        self.assertEqual(GHOST.count(), 6)
+        self.assertTrue(GHOST.test(0, 1))
+        self.assertFalse(GHOST.test(0, 0))
+        self.assertFalse(GHOST.test(2, 1))
+
+    def test_wide_masks_hold_more_than_32_cells_per_row(self):
+        mask = Mask(64, 2)
+        mask.set(1, 63)
+        self.assertTrue(mask.test(1, 63))
+        self.assertEqual(mask.count(), 1)
+
+    def test_overlaps_with_offsets(self):
+        layer = Mask.from_cells([(4, 4)])
+        self.assertTrue(layer.overlaps(GHOST, 3, 3))  # (1, 1) of the ghost
+        self.assertTrue(layer.overlaps(GHOST, 2, 2))  # (2, 2) of the ghost
+        self.assertFalse(layer.overlaps(GHOST, 2, 3))  # (2, 1) of the ghost is free
+        self.assertTrue(layer.overlaps(GHOST, 4, 3))  # (0, 1) of the ghost
+        self.assertFalse(layer.overlaps(GHOST, 4, 4))  # (0, 0) of the ghost is free
+        self.assertFalse(layer.overlaps(GHOST, 7, 7))  # Past the layer
+        self.assertFalse(layer.overlaps(GHOST, -3, -3))
+
+
+class TestSprite(TestCase):
+    def test_hits(self):
+        a = Sprite(GHOST, 0, 0)
+        self.assertTrue(a.hits(Sprite(GHOST, 1, 1)))
+        self.assertFalse(a.hits(Sprite(GHOST, 2, 2)))  # Only the free corner of the other is on a set cell
+        self.assertTrue(a.hits(Sprite(GHOST, 2, 1)))  # The top of the other is on a bottom corner
+        self.assertFalse(a.hits(Sprite(GHOST, 3, 0)))
+        self.assertFalse(a.hits(Sprite(GHOST, 10, 10)))
+
+    def test_hits_is_symmetric(self):
+        for x in range(-3, 4):
+            for y in range(-3, 4):
+                a = Sprite(GHOST, 5, 5)
+                b = Sprite(GHOST, 5 + x, 5 + y)
+                self.assertEqual(a.hits(b), b.hits(a), (x, y))
+
+    def test_hits_layer(self):
+        walls = Mask.from_ascii_art([
+            "########",
+            "#      #",
+            "#      #",
+            "#      #",
+            "########",
+        ])
+        self.assertFalse(Sprite(GHOST, 1, 1).hits_layer(walls))
+        self.assertTrue(Sprite(GHOST, 2, 1).hits_layer(walls))
+        self.assertTrue(Sprite(GHOST, 1, 5).hits_layer(walls))
+
+
+class TestBuckets(TestCase):
+    def test_matches_pairwise_checks(self):
+        random.seed(3)
+        sprites = [Sprite(GHOST, random.randint(-2, 20), random.randint(-2, 20)) for _ in range(60)]
+        expected = {(i, j) for i in range(len(sprites)) for j in range(i + 1, len(sprites))
+                    if sprites[i].hits(sprites[j])}
+        buckets = Buckets(4)
+        for sprite in sprites:
+            buckets.add(sprite)
+        found = {tuple(sorted((sprites.index(a), sprites.index(b)))) for a, b in buckets.pairs()}
+        self.assertEqual(found, expected)
+        self.assertTrue(expected)
+        for i, sprite in enumerate(sprites):
+            self.assertEqual({sprites.index(other) for other in buckets.hits(sprite)},
+                             {j for j in range(len(sprites)) if j != i and sprite.hits(sprites[j])})
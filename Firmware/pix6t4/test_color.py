@@ -86,4 +86,9 @@ class TestColor(TestCase):
         brightened_color = color.with_brightness(0.5)
         self.assertEqual(brightened_color.red, 50)
         self.assertEqual(brightened_color.green, 100)
-        self.assertEqual(brightened_color.blue, 127)
\ No newline at end of file
+        self.assertEqual(brightened_color.blue, 127)
+
+    def test_colors_compare_by_value_but_cannot_be_hashed(self):
+        self.assertEqual(Color.fromRGB(1, 2, 3), Color.fromInt(0x010203FF))
+        with self.assertRaises(TypeError):
+            {Color.BLACK}
@@ -0,0 +1,176 @@
+import base64
+import hashlib
+import os
+import socket
+import struct
+import time
+import unittest
+from unittest import TestCase
+from pix6t4.color import Color
+from pix6t4.display_server import (DELTA, FRAME_HEADER, KEYFRAME, TCP_HELLO, DisplayServer, FrameDecoder,
+                                   encode_delta, encode_keyframe, snapshot)
+from pix6t4.headless import PIX6T4ColorHeadless
+from pix6t4.indexed import IndexedFramebuffer
+
+def receive(sock: socket.socket, size: int) -> bytes:
+    data = b""
+    while len(data) < size:
+        chunk = sock.recv(size - len(data))
+        if not chunk:
+            raise ConnectionError("closed")
+        data += chunk
+    return data
+
+def receive_tcp_message(sock: socket.socket) -> bytes:
+    length, = struct.unpack("<I", receive(sock, 4))
+    return receive(sock, length)
+
+def receive_websocket_message(sock: socket.socket) -> bytes:
+    first, second = receive(sock, 2)
+    length = second & 0x7F
+    if length == 126:
+        length, = struct.unpack("!H", receive(sock, 2))
+    elif length == 127:
+        length, = struct.unpack("!Q", receive(sock, 8))
+    return receive(sock, length)
+
+def wait_for(condition, timeout: float = 5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            raise TimeoutError
+        time.sleep(0.01)
+
+class TestEncoding(TestCase):
+    def test_deltas_only_carry_changed_pixels(self):
+        previous = bytes(3 * 64)
+        frame = bytearray(previous)
+        frame[3 * 10:3 * 11] = b"\x01\x02\x03"
+        message = encode_delta(7, 8, 8, previous, bytes(frame))
+        self.assertEqual(struct.unpack_from(FRAME_HEADER, message), (DELTA, 7, 8, 8))
+        self.assertEqual(len(message), struct.calcsize(FRAME_HEADER) + 2 + 5)
+        decoder = FrameDecoder()
+        decoder.apply(encode_keyframe(6, 8, 8, previous))
+        self.assertEqual(decoder.apply(message), bytes(frame))
+        self.assertEqual(decoder.number, 7)
+
+    def test_large_changes_are_sent_as_keyframes(self):
+        frame = bytes(range(192))
+        message = encode_delta(1, 8, 8, bytes(192), frame)
+        self.assertEqual(message[0], KEYFRAME)
+        self.assertEqual(FrameDecoder().apply(message), frame)
+
+    def test_deltas_need_a_keyframe(self):
+        with self.assertRaises(ValueError):
+            FrameDecoder().apply(encode_delta(1, 8, 8, bytes(192), bytes(192)))
+
+    def test_snapshot_is_row_by_row(self):
+        console = PIX6T4ColorHeadless(panels_across=2)
+        console.plot(1, 12, Color.fromRGB(10, 20, 30))  # Row 1, column 12
+        console.present()
+        frame = snapshot(console)
+        self.assertEqual(len(frame), 3 * 16 * 8)
+        i = 3 * (1 * 16 + 12)
+        self.assertEqual(frame[i:i + 3], bytes((10, 20, 30)))
+        self.assertEqual(frame.count(0), len(frame) - 3)
+
+    def test_snapshot_of_an_indexed_framebuffer(self):
+        console = PIX6T4ColorHeadless()
+        console.handle_start()
+        while console.transition is not None:
+            console.loop()
+        framebuffer = IndexedFramebuffer(8, 8, palette=[Color.BLACK, Color.fromRGB(200, 100, 50)])
+        framebuffer.plot(3, 5, 1)
+        console.use_indexed(framebuffer)
+        frame = snapshot(console)
+        i = 3 * (3 * 8 + 5)
+        self.assertEqual(frame[i:i + 3], bytes((200, 100, 50)))
+
+
+class TestDisplayServer(TestCase):
+    def setUp(self):
+        self.server = DisplayServer(port=0, drain_timeout=0.5).start()
+        self.sockets = []
+
+    def tearDown(self):
+        for sock in self.sockets:
+            sock.close()
+        self.server.stop()
+
+    def connect(self, receive_buffer: int = None) -> socket.socket:
+        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        if receive_buffer is not None:
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, receive_buffer)
+        sock.connect(("127.0.0.1", self.server.port))
+        sock.settimeout(5)
+        self.sockets.append(sock)
+        return sock
+
+    def test_tcp_viewers_follow_the_console(self):
+        console = PIX6T4ColorHeadless()
+        self.server.attach(console)
+        viewers = [self.connect() for _ in range(3)]
+        for sock in viewers:
+            sock.sendall(TCP_HELLO)
+        wait_for(lambda: len(self.server.viewers) == 3)
+        for step in range(5):
+            console.plot(step, step, Color.fromRGB(255, step * 40, 0))
+            console.present()
+            console.render()
+        expected = snapshot(console)
+        for sock in viewers:
+            decoder = FrameDecoder()
+            kinds = []
+            while decoder.number != self.server.frames:
+                message = receive_tcp_message(sock)
+                kinds.append(message[0])
+                decoder.apply(message)
+            self.assertEqual(decoder.rgb, expected)
+            self.assertEqual(kinds[0], KEYFRAME)
+            self.assertTrue(all(kind == DELTA for kind in kinds[1:]))
+
+    def test_browsers_get_the_viewer_and_a_websocket(self):
+        page = self.connect()
+        page.sendall(b"GET / HTTP/1.1\r\nHost: localhost\r\n\r\n")
+        response = b""
+        while True:
+            chunk = page.recv(65536)
+            if not chunk:
+                break
+            response += chunk
+        self.assertTrue(response.startswith(b"HTTP/1.1 200 OK"))
+        self.assertIn(b"<canvas", response)
+
+        sock = self.connect()
+        key = base64.b64encode(os.urandom(16))
+        sock.sendall(b"GET /stream HTTP/1.1\r\nHost: localhost\r\nUpgrade: websocket\r\nConnection: Upgrade\r\n"
+                     b"Sec-WebSocket-Key: " + key + b"\r\nSec-WebSocket-Version: 13\r\n\r\n")
+        headers = b""
+        while not headers.endswith(b"\r\n\r\n"):
+            headers += sock.recv(1)
+        self.assertTrue(headers.startswith(b"HTTP/1.1 101"))
+        accept = base64.b64encode(hashlib.sha1(key + b"258EAFA5-E914-47DA-95CA-C5AB0DC85B11").digest())
+        self.assertIn(b"Sec-WebSocket-Accept: " + accept, headers)
+        wait_for(lambda: len(self.server.viewers) == 1)
+        frame = bytes(range(192))
+        self.server.publish(8, 8, frame)
+        self.assertEqual(FrameDecoder().apply(receive_websocket_message(sock)), frame)
+        sock.sendall(b"\x88\x80" + bytes(4))  # Close, masked like clients do
+        wait_for(lambda: not self.server.viewers)
+
+    def test_slow_viewers_skip_frames_and_are_dropped(self):
+        sock = self.connect(receive_buffer=4096)
+        sock.sendall(TCP_HELLO)
+        wait_for(lambda: len(self.server.viewers) == 1)
+        viewer = next(iter(self.server.viewers))
+        slowest_publish = 0
+        deadline = time.monotonic() + 10
+        while self.server.viewers and time.monotonic() < deadline:
+            start = time.perf_counter()
+            self.server.publish(64, 64, os.urandom(3 * 64 * 64))
+            slowest_publish = max(slowest_publish, time.perf_counter() - start)
+            time.sleep(0.005)
+        self.assertFalse(self.server.viewers)
+        self.assertEqual(self.server.dropped, 1)
+        self.assertGreater(viewer.skipped, 0)
+        self.assertLess(slowest_publish, 0.1)  # The game never waits for the viewer
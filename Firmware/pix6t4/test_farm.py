@@ -0,0 +1,26 @@
+import unittest
+from unittest import TestCase
+from pix6t4.farm import Aggregate, play, run
+
+class TestFarm(TestCase):
+    def test_games_are_repeatable_from_their_seed(self):
+        job = ("Monty", "random", 42, 2000, {})
+        first = play(job)
+        second = play(job)
+        self.assertEqual((first["score"], first["frames"]), (second["score"], second["frames"]))
+        self.assertTrue(first["over"])
+
+    def test_overrides_are_applied_after_start(self):
+        result = play(("snake", "random", 1, 50, {"slowness": 1000}))
+        self.assertEqual(result["frames"], 50)
+        self.assertFalse(result["over"])
+
+    def test_results_are_streamed_and_aggregated(self):
+        results = []
+        summary = run("Monty", 6, max_frames=300, workers=2, on_result=results.append)
+        self.assertEqual(summary["games"], 6)
+        self.assertEqual(sorted(result["seed"] for result in results), list(range(6)))
+        self.assertEqual(summary["score_max"], max(result["score"] for result in results))
+
+    def test_aggregate_of_nothing(self):
+        self.assertEqual(Aggregate().summary()["games"], 0)
@@ -0,0 +1,62 @@
+import random
+import unittest
+from unittest import TestCase
+from pix6t4.color import Color
+from pix6t4.fixedpoint import blend, brightness_level, brightness_table, hsl_to_rgba, rgba_to_hsl, scale
+
+def assertChannelsClose(test, value, color, tolerance=1):
+    for shift in (24, 16, 8):
+        test.assertLessEqual(abs((value >> shift & 0xFF) - (color.value >> shift & 0xFF)), tolerance,
+                             f"{value:08X} != {color.value:08X}")
+
+class TestFixedPoint(TestCase):
+    """Property tests of the integer color math against the floating point implementation."""
+    def setUp(self):
+        self.random = random.Random(6502)
+
+    def random_color(self, alpha=0xFF):
+        return Color.fromInt(self.random.getrandbits(24) << 8 | alpha)
+
+    def test_hsl_to_rgba_matches_float_conversion(self):
+        for hue in range(360):
+            for _ in range(20):
+                saturation = self.random.randint(0, 100)
+                lightness = self.random.randint(0, 100)
+                assertChannelsClose(self, hsl_to_rgba(hue, saturation, lightness),
+                                    Color.fromHSLA(hue, saturation, lightness))
+
+    def test_hsl_to_rgba_keeps_alpha(self):
+        self.assertEqual(hsl_to_rgba(0, 100, 50, 0x80), 0xFF000080)
+
+    def test_rgba_to_hsl_matches_float_conversion(self):
+        for _ in range(2000):
+            color = self.random_color()
+            hue, saturation, lightness, _ = color.toHSLA()
+            int_hue, int_saturation, int_lightness = rgba_to_hsl(color.value)
+            self.assertLessEqual(min(abs(int_hue - hue), 360 - abs(int_hue - hue)), 1)
+            self.assertLessEqual(abs(int_saturation - saturation), 1)
+            self.assertLessEqual(abs(int_lightness - lightness), 1)
+
+    def test_scale_matches_with_brightness(self):
+        for _ in range(2000):
+            color = self.random_color()
+            brightness = self.random.random()
+            assertChannelsClose(self, scale(color.value, brightness_level(brightness)), color.with_brightness(brightness))
+
+    def test_brightness_table_matches_scale(self):
+        level = brightness_level(0.3)
+        table = brightness_table(level)
+        for _ in range(200):
+            color = self.random_color()
+            scaled = scale(color.value, level)
+            self.assertEqual(table[color.red], scaled >> 24)
+            self.assertEqual(table[color.blue], scaled >> 8 & 0xFF)
+
+    def test_blend_matches_float_blending(self):
+        for _ in range(2000):
+            color = self.random_color(self.random.randint(0, 0xFF))
+            background = self.random_color()
+            red = int((color.red * (color.value & 0xFF) + background.red * (0xFF - (color.value & 0xFF))) / 0xFF)
+            blended = blend(color.value, background.value)
+            self.assertEqual(blended >> 24, red)
+            self.assertEqual(blended & 0xFF, 0xFF)
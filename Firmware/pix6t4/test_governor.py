@@ -0,0 +1,58 @@
+import unittest
+from unittest import TestCase
+from pix6t4.console import Button
+from pix6t4.headless import PIX6T4ColorHeadless
+
+class TestGovernor(TestCase):
+    def setUp(self):
+        self.pix6t4 = PIX6T4ColorHeadless()
+        self.governor = self.pix6t4.governor
+
+    def run_seconds(self, seconds):
+        for _ in range(int(seconds * 20)):
+            self.pix6t4.loop()
+
+    def test_static_frames_slow_down_until_a_button_is_pressed(self):
+        self.run_seconds(0.5)
+        self.assertEqual(self.governor.rate, 20)
+        self.run_seconds(1)
+        self.assertEqual(self.governor.rate, self.governor.idle_rate)
+        self.pix6t4.handle_button_pressed(Button.A)
+        self.assertEqual(self.governor.rate, 20)
+
+    def test_games_declare_their_rate(self):
+        self.pix6t4.start_transition = None
+        settings = [game for game in self.pix6t4.games if game.name == "Settings"][0]
+        self.pix6t4.current_game = settings
+        self.pix6t4.handle_start()
+        self.pix6t4.loop()
+        self.assertEqual(self.governor.rate, 10)
+
+    def test_waiting_on_a_virtual_clock_returns(self):
+        self.run_seconds(2)
+        self.assertEqual(self.governor.rate, self.governor.idle_rate)
+        start = self.pix6t4.clock.monotonic_ns()
+        self.pix6t4.loop()
+        self.governor.wait(start)
+        self.assertEqual(self.pix6t4.clock.monotonic_ns(), start + self.pix6t4.clock.frame_ns)
+
+    def test_falls_back_to_attract_mode_when_nobody_plays(self):
+        title = self.pix6t4.current_game
+        self.run_seconds(self.governor.attract_after_ns / 1e9)
+        self.assertTrue(self.governor.attract)
+        self.assertEqual(self.pix6t4.current_game.name, "Attract Mode")
+        self.assertTrue(self.pix6t4.game_running)
+        self.pix6t4.loop()
+        self.assertEqual(self.governor.rate, self.governor.attract_rate)
+        # Frames keep changing in the attract mode
+        self.assertTrue(self.pix6t4.frame_changed)
+        self.pix6t4.handle_button_pressed(Button.START)
+        self.assertFalse(self.governor.attract)
+        self.assertFalse(self.pix6t4.game_running)
+        self.assertIs(self.pix6t4.current_game, title)
+
+    def test_reports_time_at_each_rate(self):
+        self.run_seconds(5)
+        report = self.governor.report()
+        self.assertEqual(list(report), [20, self.governor.idle_rate])
+        self.assertAlmostEqual(sum(report.values()), 5)
@@ -0,0 +1,75 @@
+import unittest
+from unittest import TestCase
+from pix6t4.color import Color
+from pix6t4.fixedpoint import hsl_to_rgba
+from pix6t4.headless import PIX6T4ColorHeadless
+from pix6t4.indexed import IndexedFramebuffer
+from games.attractmode import Rainbow
+
+def frame_values(pixels):
+    return [color.value for column in pixels for color in column]
+
+class TestIndexed(TestCase):
+    def test_plot_uses_console_coordinates(self):
+        framebuffer = IndexedFramebuffer(palette=[Color.BLACK, Color.RED])
+        framebuffer.plot(2, 5, 1)
+        pixels = [[Color.WHITE for _ in range(8)] for _ in range(8)]
+        framebuffer.resolve(pixels)
+        self.assertEqual(pixels[5][2], Color.RED)
+        self.assertEqual(pixels[2][5], Color.BLACK)
+
+    def test_4_bit_indices_are_packed_in_pairs(self):
+        framebuffer = IndexedFramebuffer(bits=4)
+        self.assertEqual(len(framebuffer.indices), 32)
+        framebuffer.set(6, 0xA)
+        framebuffer.set(7, 0x5)
+        self.assertEqual(framebuffer.indices[3], 0xA5)
+        self.assertEqual((framebuffer.get(6), framebuffer.get(7)), (0xA, 0x5))
+        with self.assertRaises(ValueError):
+            IndexedFramebuffer(bits=4, palette=[Color.BLACK] * 17)
+
+    def test_rotate_cycles_a_range_of_the_palette(self):
+        colors = [Color(i << 8 | 0xFF) for i in range(6)]
+        framebuffer = IndexedFramebuffer(palette=colors)
+        framebuffer.rotate(1, 5, 2)
+        self.assertEqual(list(framebuffer.palette), [colors[i].value for i in (0, 3, 4, 1, 2, 5)])
+        self.assertEqual(framebuffer.colors, [colors[i] for i in (0, 3, 4, 1, 2, 5)])
+
+    def test_packs_like_the_resolved_frame(self):
+        for bits in (4, 8):
+            indexed_console = PIX6T4ColorHeadless()
+            pixels_console = PIX6T4ColorHeadless()
+            framebuffer = IndexedFramebuffer(bits=bits, palette=[Color.BLACK, Color.RED, Color.CYAN, Color.ORANGE])
+            for x in range(8):
+                for y in range(8):
+                    framebuffer.plot(x, y, (x * 3 + y) % 4)
+            for brightness in (1.0, 0.3):
+                indexed_console.brightness = pixels_console.brightness = brightness
+                framebuffer.rotate()
+                indexed_console.use_indexed(framebuffer)
+                indexed_console.game_running = True
+                indexed_console.render()
+                framebuffer.resolve(pixels_console.pixels)
+                pixels_console.present()
+                pixels_console.render()
+                self.assertEqual(indexed_console.leds.last_frame, pixels_console.leds.last_frame)
+
+    def test_rainbow_sweeps_through_its_palette(self):
+        pix6t4 = PIX6T4ColorHeadless()
+        rainbow = Rainbow(pix6t4)
+        for _ in range(3):
+            rainbow.draw_frame()
+        self.assertIs(pix6t4.indexed, rainbow.framebuffer)
+        rainbow.framebuffer.resolve(pix6t4.pixels)
+        for x in range(8):
+            self.assertEqual(pix6t4.pixels[0][x].value, hsl_to_rgba((x * 2 + 3) * 5 % 360, 100, 50))
+
+    def test_leaving_a_game_goes_back_to_pixels(self):
+        pix6t4 = PIX6T4ColorHeadless()
+        pix6t4.start_transition = None
+        pix6t4.use_indexed(IndexedFramebuffer())
+        pix6t4.game_running = True
+        self.assertTrue(pix6t4.showing_indexed())
+        pix6t4.handle_select()
+        self.assertIsNone(pix6t4.indexed)
+        self.assertFalse(pix6t4.showing_indexed())
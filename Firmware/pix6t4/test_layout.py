@@ -0,0 +1,69 @@
+import unittest
+from unittest import TestCase
+from pix6t4.layout import LedLayout, TiledLayout, for_revision
+
+class TestLayout(TestCase):
+    def test_default_layout_wires_rows_in_order(self):
+        layout = LedLayout()
+        # pixels[x][y] is shown by LED y * 8 + x
+        self.assertEqual(layout.table[3 * 8 + 5], 5 * 8 + 3)
+        self.assertEqual(sorted(layout.table), list(range(64)))
+
+    def test_rotations_and_mirror_are_permutations(self):
+        for rotation in (0, 90, 180, 270):
+            for mirror in (False, True):
+                for serpentine in (False, True):
+                    layout = LedLayout(4, 6, rotation, mirror, serpentine)
+                    self.assertEqual(sorted(layout.table), list(range(24)))
+
+    def test_rotation_by_180_reverses_the_chain(self):
+        layout = LedLayout(rotation=180)
+        self.assertEqual(list(layout.led_index(x, y) for y in range(8) for x in range(8)), list(range(63, -1, -1)))
+
+    def test_rotation_by_90_moves_top_left_to_top_right(self):
+        layout = LedLayout(rotation=90)
+        self.assertEqual(layout.led_index(0, 0), 7)
+        self.assertEqual(layout.led_index(7, 0), 63)
+
+    def test_serpentine_reverses_odd_rows(self):
+        layout = LedLayout(serpentine=True)
+        self.assertEqual(layout.led_index(0, 1), 15)
+        self.assertEqual(layout.led_index(7, 1), 8)
+        self.assertEqual(layout.led_index(0, 2), 16)
+
+    def test_logo_leds_follow_the_matrix_on_revision_2(self):
+        self.assertEqual(for_revision(1).num_leds, 64)
+        layout = for_revision(2)
+        self.assertEqual(layout.num_leds, 70)
+        self.assertEqual(layout.logo_start, 64)
+        self.assertIs(for_revision(2), layout)
+
+    def test_rejects_other_rotations(self):
+        with self.assertRaises(ValueError):
+            LedLayout(rotation=45)
+
+    def test_tiled_layout_chains_panels_row_by_row(self):
+        layout = TiledLayout(2, 2)
+        self.assertEqual(sorted(layout.table), list(range(256)))
+        self.assertEqual(layout.led_index(0, 0), 0)
+        self.assertEqual(layout.led_index(8, 0), 64)
+        self.assertEqual(layout.led_index(0, 8), 128)
+        self.assertEqual(layout.led_index(15, 15), 255)
+
+    def test_tiled_layout_serpentine_chain_reverses_odd_panel_rows(self):
+        layout = TiledLayout(2, 2, serpentine_chain=True)
+        self.assertEqual(layout.led_index(8, 8), 128)
+        self.assertEqual(layout.led_index(0, 8), 192)
+
+    def test_tiled_layout_rotates_each_panel(self):
+        layout = TiledLayout(2, 1, rotations=[0, 180])
+        self.assertEqual(layout.led_index(8, 0), 127)
+        self.assertEqual(layout.led_index(15, 7), 64)
+
+    def test_tiled_revision_2_keeps_the_logo_after_the_first_panel(self):
+        layout = for_revision(2, panels_across=2, panels_down=2)
+        self.assertEqual((layout.width, layout.height), (16, 16))
+        self.assertEqual(layout.num_leds, 262)
+        self.assertEqual(layout.logo_start, 64)
+        self.assertEqual(layout.led_index(8, 0), 70)
+        self.assertEqual(sorted(list(layout.table) + list(range(64, 70))), list(range(262)))
@@ -0,0 +1,52 @@
+import unittest
+from unittest import TestCase
+from pix6t4.color import Color
+from pix6t4.headless import PIX6T4ColorHeadless
+from pix6t4.particles import NONE, LightBuffer, ParticlePool, ramp
+
+class TestParticles(TestCase):
+    def test_pool_reuses_slots_and_refuses_to_overflow(self):
+        pool = ParticlePool(2, 8)
+        first = pool.spawn(0, 1)
+        second = pool.spawn(0, 2)
+        self.assertEqual(len(pool), 2)
+        self.assertEqual(pool.spawn(0, 3), NONE)
+        pool.kill(first)
+        self.assertEqual(len(pool), 1)
+        self.assertEqual(pool.spawn(0, 3), first)
+        self.assertEqual(list(pool.in_row(2)), [second])
+
+    def test_step_moves_particles_between_buckets_and_kills_the_ones_that_leave(self):
+        pool = ParticlePool(4, 8)
+        mover = pool.spawn(0, 1, vx=1, vy=1)
+        leaver = pool.spawn(9.5, 1, vx=1)
+        pool.step(0, 10)
+        self.assertEqual(list(pool.in_row(1)), [])
+        self.assertEqual(list(pool.in_row(2)), [mover])
+        self.assertEqual(pool.row[leaver], NONE)
+        self.assertEqual(len(pool), 1)
+
+    def test_trails_match_per_pixel_droplet_scan(self):
+        droplets = [(3.5, 2), (5.0, 2), (0.5, 7), (12.0, 4)]
+        light = LightBuffer(8, 8)
+        for x, y in droplets:
+            light.add_trail(x, y, 8, 32)
+        for y in range(8):
+            for x in range(8):
+                intensity = 0
+                for droplet_x, droplet_y in droplets:
+                    if droplet_y == y and x < droplet_x:
+                        intensity += 8 - min(droplet_x - x, 8)
+                self.assertAlmostEqual(light.intensities[y * 8 + x], min(255, int(intensity * 32)), delta=1)
+
+    def test_light_is_added_onto_the_framebuffer(self):
+        pix6t4 = PIX6T4ColorHeadless()
+        pix6t4.plot(1, 2, Color.fromRGB(200, 10, 0))
+        pix6t4.plot(4, 4, Color.fromRGB(50, 60, 70))
+        light = LightBuffer(8, 8)
+        light.add(1, 2, 255)
+        light.add(0, 0, 255)
+        light.write_to(pix6t4, ramp(Color.fromRGB(100, 100, 100)))
+        self.assertEqual(pix6t4.pixels[2][1], Color.fromRGB(255, 110, 100))
+        self.assertEqual(pix6t4.pixels[0][0], Color.fromRGB(100, 100, 100))
+        self.assertEqual(pix6t4.pixels[4][4], Color.fromRGB(50, 60, 70))  # No light there
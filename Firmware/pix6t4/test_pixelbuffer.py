@@ -0,0 +1,82 @@
+import random
+import unittest
+from unittest import TestCase
+from pix6t4.color import Color
+from pix6t4.console import Button
+from pix6t4.headless import FakeNeoPixel, PIX6T4ColorHeadless
+from pix6t4.layout import LedLayout
+from pix6t4.pixelbuffer import PixelBuffer, write_per_pixel
+
+class TestPixelBuffer(TestCase):
+    def setUp(self):
+        rng = random.Random(64)
+        self.pixels = [[Color(rng.getrandbits(24) << 8 | 0xFF) for _ in range(8)] for _ in range(8)]
+        self.logo = [Color(rng.getrandbits(24) << 8 | 0xFF) for _ in range(6)]
+
+    def test_packed_bytes_match_per_pixel_writes(self):
+        for rotation in (0, 90):
+            layout = LedLayout(rotation=rotation, serpentine=True, logo_leds=6)
+            for brightness in (1.0, 0.1, 0.55):
+                leds = FakeNeoPixel(None, layout.num_leds, auto_write=False)
+                write_per_pixel(leds, layout, self.pixels, self.logo, brightness)
+                leds.show()
+                buffer = PixelBuffer(layout)
+                buffer.set_brightness(brightness)
+                self.assertEqual(bytes(buffer.pack(self.pixels, self.logo)), leds.last_frame)
+
+    def test_channels_are_written_in_strip_order(self):
+        layout = LedLayout()
+        buffer = PixelBuffer(layout, "GRB")
+        pixels = [[Color.BLACK for _ in range(8)] for _ in range(8)]
+        pixels[1][0] = Color(0x102030FF)
+        packed = buffer.pack(pixels)
+        self.assertEqual(bytes(packed[3:6]), bytes((0x20, 0x10, 0x30)))
+
+    def test_gamma_darkens_midtones(self):
+        buffer = PixelBuffer(LedLayout(), gamma=2.2)
+        self.assertEqual(buffer.correction[255], 255)
+        self.assertLess(buffer.correction[128], 64)
+
+    def test_headless_console_renders_into_the_fake_strip(self):
+        console = PIX6T4ColorHeadless()
+        console.plot(0, 0, Color.RED)
+        console.plot_logo(5, Color.BLUE)
+        console.present()
+        console.render()
+        self.assertEqual(console.leds.frames_sent, 1)
+        self.assertEqual(console.leds.last_frame[0:3], bytes((0, 255, 0)))
+        self.assertEqual(console.leds.last_frame[69 * 3:70 * 3], bytes((0, 0, 255)))
+
+    def test_tiled_headless_console_renders_every_panel(self):
+        console = PIX6T4ColorHeadless(panels_across=2, panels_down=2)
+        self.assertEqual((console.width, console.height), (16, 16))
+        console.plot(0, 8, Color.RED)  # Top left pixel of the second panel, after the logo
+        console.plot(15, 15, Color.BLUE)
+        console.present()
+        console.render()
+        self.assertEqual(len(console.leds.last_frame), 262 * 3)
+        self.assertEqual(console.leds.last_frame[70 * 3:71 * 3], bytes((0, 255, 0)))
+        self.assertEqual(console.leds.last_frame[261 * 3:262 * 3], bytes((0, 0, 255)))
+
+    def test_games_run_on_a_tiled_display(self):
+        console = PIX6T4ColorHeadless(panels_across=2, panels_down=1)
+        for index in range(len(console.games)):
+            console.switch_to_game(index)
+            console.handle_start()
+            for button in (Button.LEFT, Button.DOWN, Button.RIGHT, Button.UP):
+                console.advance(25)
+                console.handle_button_pressed(button)
+                console.handle_button_released(button)
+            console.stop_game()
+
+    def test_render_only_reads_the_presented_frame(self):
+        console = PIX6T4ColorHeadless()
+        console.plot(0, 0, Color.RED)
+        console.render()
+        self.assertEqual(console.leds.last_frame[0:3], bytes((0, 0, 0)))
+        front = console.front
+        console.present()
+        self.assertIs(console.pixels, front)  # Buffers are swapped, not copied
+        console.plot(0, 0, Color.BLUE)  # Drawing the next frame doesn't touch the one shown
+        console.render()
+        self.assertEqual(console.leds.last_frame[0:3], bytes((0, 255, 0)))
@@ -0,0 +1,61 @@
+import multiprocessing
+import struct
+import time
+import unittest
+from unittest import TestCase
+from pix6t4.color import Color
+from pix6t4.console import Button
+from pix6t4.shared import (BUTTON_RECORD, SOUND_RECORD, EventRing, RemoteScreen, SharedFrame,
+                           run_game_process)
+
+class TestShared(TestCase):
+    def setUp(self):
+        self.frame = SharedFrame()
+        self.buttons = EventRing(record=BUTTON_RECORD, capacity=4)
+        self.sounds = EventRing(record=SOUND_RECORD)
+
+    def tearDown(self):
+        self.frame.close(unlink=True)
+        self.buttons.close(unlink=True)
+        self.sounds.close(unlink=True)
+
+    def test_screen_picks_up_completed_frames_only(self):
+        pixels = [[Color(x << 24 | y << 8 | 0xFF) for y in range(8)] for x in range(8)]
+        self.frame.write(pixels, 0.5)
+        screen = RemoteScreen(SharedFrame(self.frame.name), self.buttons)
+        self.assertTrue(screen.update())
+        self.assertEqual(screen.pixels, pixels)
+        self.assertEqual(screen.brightness, 0.5)
+        self.assertFalse(screen.update())
+        # A frame being written is skipped
+        struct.pack_into("<I", self.frame.memory.buf, 0, self.frame.sequence + 1)
+        self.assertFalse(screen.update())
+        screen.frame.close()
+
+    def test_ring_is_first_in_first_out_and_drops_when_full(self):
+        consumer = EventRing(self.buttons.name, record=BUTTON_RECORD, capacity=4)
+        for button in range(5):
+            self.assertEqual(self.buttons.put(button, 1), button < 4)
+        self.assertEqual([consumer.get() for _ in range(3)], [(0, 1), (1, 1), (2, 1)])
+        for button in range(6, 10):
+            self.buttons.put(button, 0)
+        self.assertEqual([consumer.get() for _ in range(5)], [(3, 1), (6, 0), (7, 0), (8, 0), None])
+        consumer.close()
+
+    def test_game_process_runs_on_its_own(self):
+        game = multiprocessing.Process(
+            target=run_game_process, args=(self.frame.name, self.buttons.name, self.sounds.name))
+        game.start()
+        try:
+            screen = RemoteScreen(self.frame, self.buttons)
+            screen.handle_button_pressed(Button.START)
+            screen.handle_button_released(Button.START)
+            deadline = time.monotonic() + 20
+            while self.frame.sequence < 20 and time.monotonic() < deadline:
+                time.sleep(0.05)
+            self.assertGreaterEqual(self.frame.sequence, 20)
+            self.assertTrue(screen.update())
+        finally:
+            self.frame.running = False
+            game.join(10)
+        self.assertEqual(game.exitcode, 0)
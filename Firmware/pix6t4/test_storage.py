@@ -0,0 +1,107 @@
+import io
+import os
+import tempfile
+import time
+import unittest
+from contextlib import redirect_stdout
+from unittest import TestCase
+from pix6t4.console import Button
+from pix6t4.headless import PIX6T4ColorHeadless
+from pix6t4.storage import FileBackend, MemoryBackend, NvmBackend, Storage
+
+class CountingBackend(MemoryBackend):
+    def __init__(self):
+        super().__init__()
+        self.saves = 0
+
+    def save(self, values):
+        super().save(values)
+        self.saves += 1
+
+class SlowBackend(CountingBackend):
+    def save(self, values):
+        time.sleep(0.05)  # Like a flash write
+        super().save(values)
+
+class TestStorage(TestCase):
+    def test_writes_are_coalesced_until_they_settle(self):
+        backend = CountingBackend()
+        storage = Storage(backend, debounce=10)
+        for brightness in (0.2, 0.3, 0.4):
+            storage.set("brightness", brightness)
+        storage.tick(storage.flush_time - 1)
+        self.assertEqual(backend.saves, 0)
+        self.assertEqual(storage.get("brightness"), 0.4)
+        storage.tick(storage.flush_time)
+        self.assertEqual(backend.saves, 1)
+        self.assertEqual(backend.data, {"brightness": 0.4})
+        storage.tick(storage.flush_time + 100)
+        self.assertEqual(backend.saves, 1)
+
+    def test_setting_the_same_value_doesnt_write(self):
+        backend = CountingBackend()
+        storage = Storage(backend)
+        storage.set("sound", True)
+        storage.flush()
+        storage.set("sound", True)
+        storage.flush()
+        self.assertEqual(backend.saves, 1)
+
+    def test_high_scores_only_go_up(self):
+        storage = Storage(MemoryBackend())
+        self.assertTrue(storage.submit_score("Monty", 12))
+        self.assertFalse(storage.submit_score("Monty", 5))
+        self.assertEqual(storage.high_score("Monty"), 12)
+
+    def test_nvm_round_trip(self):
+        nvm = bytearray(b"\xFF" * 256)
+        self.assertEqual(NvmBackend(nvm).load(), {})
+        NvmBackend(nvm).save({"brightness": 0.5, "high_score.Monty": 20})
+        self.assertEqual(NvmBackend(nvm).load(), {"brightness": 0.5, "high_score.Monty": 20})
+        with self.assertRaises(ValueError):
+            NvmBackend(nvm).save({"name": "x" * 300})
+
+    def test_file_round_trip(self):
+        with tempfile.TemporaryDirectory() as folder:
+            path = os.path.join(folder, "settings.json")
+            self.assertEqual(FileBackend(path).load(), {})
+            FileBackend(path).save({"sound": False})
+            self.assertEqual(FileBackend(path).load(), {"sound": False})
+
+    def test_console_settings_survive_a_restart(self):
+        with tempfile.TemporaryDirectory() as folder:
+            path = os.path.join(folder, "settings.json")
+            console = PIX6T4ColorHeadless(storage_path=path)
+            console.current_game = next(game for game in console.games if game.name == "Settings")
+            console.handle_button_pressed(Button.START)
+            console.handle_button_pressed(Button.DOWN)
+            console.handle_button_pressed(Button.SELECT)
+            restarted = PIX6T4ColorHeadless(storage_path=path)
+            self.assertAlmostEqual(restarted.brightness, 0.9)
+
+    def test_settings_are_written_after_the_frame_is_checked(self):
+        console = PIX6T4ColorHeadless()
+        backend = SlowBackend()
+        console.storage = Storage(backend, debounce=0, monotonic=console.clock.monotonic)
+        console.storage.set("brightness", 0.5)
+        console.loop()
+        self.assertEqual(backend.saves, 1)
+        self.assertLess(console.watchdog.update_ns + console.watchdog.render_ns, 50000000)
+
+    def test_settings_that_dont_fit_leave_out_the_high_scores(self):
+        nvm = bytearray(b"\xFF" * 48)
+        storage = Storage(NvmBackend(nvm), debounce=0, monotonic=lambda: 0)
+        storage.set("brightness", 0.5)
+        storage.submit_score("Ms. Pix-Man", 1330)
+        output = io.StringIO()
+        with redirect_stdout(output):
+            storage.tick()
+        self.assertFalse(storage.dirty)
+        self.assertEqual(NvmBackend(nvm).load(), {"brightness": 0.5})
+        self.assertEqual(storage.high_score("Ms. Pix-Man"), 1330)
+        storage.set("name", "x" * 100)
+        with redirect_stdout(output):
+            storage.tick()
+        self.assertFalse(storage.dirty)
+        self.assertEqual(NvmBackend(nvm).load(), {"brightness": 0.5})
+        self.assertEqual(len(output.getvalue().splitlines()), 2)
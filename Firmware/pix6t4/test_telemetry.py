@@ -0,0 +1,90 @@
+import csv
+import io
+import os
+import pty
+import struct
+import tty
+import unittest
+from unittest import TestCase
+from pix6t4.headless import PIX6T4ColorHeadless
+from pix6t4.telemetry import TELEMETRY_RECORD_SIZE, TICKS_MAX, Telemetry
+from pix6t4.telemetry_reader import FIELDS, Decoder, RollingStats, read
+
+class FullStream:
+    def write(self, buffer):
+        return 0
+
+class FakeTicks:
+    """Ticks that only move when the test moves them."""
+    def __init__(self, now: int = 0):
+        self.now = now
+
+    def __call__(self) -> int:
+        return self.now & TICKS_MAX
+
+def send_frame(telemetry: Telemetry, ticks: FakeTicks, frame: int, frame_ticks: int, render_ticks: int):
+    telemetry.start()
+    ticks.now += frame_ticks - render_ticks
+    telemetry.rendering()
+    ticks.now += render_ticks
+    telemetry.send(frame)
+
+class TestTelemetry(TestCase):
+    def test_records_are_decoded_after_garbage_and_gaps(self):
+        stream = io.BytesIO()
+        ticks = FakeTicks()
+        telemetry = Telemetry(stream, ticks, tick_us=1)
+        for frame in range(3):
+            send_frame(telemetry, ticks, frame, 12345, 2000)
+        telemetry.sequence += 2  # Two records lost on the way
+        send_frame(telemetry, ticks, 3, 80000, 1000)
+        data = stream.getvalue()
+        decoder = Decoder()
+        records = decoder.feed(b"\x00\xa5junk" + data[:40]) + decoder.feed(data[40:])
+        self.assertEqual([record["frame"] for record in records], [0, 1, 2, 3])
+        self.assertEqual((records[0]["frame_us"], records[0]["render_us"]), (12345, 2000))
+        self.assertEqual(decoder.missed, 2)
+        self.assertEqual(decoder.skipped, 6)
+
+    def test_records_the_stream_refuses_are_counted_as_dropped(self):
+        telemetry = Telemetry(FullStream())
+        telemetry.send(0)
+        telemetry.send(1)
+        self.assertEqual(telemetry.dropped, 2)
+        self.assertEqual(struct.unpack_from("<H", telemetry.buffer, 24)[0], 1)
+
+    def test_frames_are_timed_through_the_wrap_around_of_the_ticks(self):
+        stream = io.BytesIO()
+        ticks = FakeTicks(TICKS_MAX - 5)
+        telemetry = Telemetry(stream, ticks)
+        send_frame(telemetry, ticks, 0, 16, 4)
+        records = Decoder().feed(stream.getvalue())
+        self.assertEqual((records[0]["frame_us"], records[0]["render_us"]), (16000, 4000))
+
+    def test_garbage_is_only_collected_when_asked(self):
+        self.assertFalse(Telemetry(io.BytesIO()).collect_garbage)
+
+    def test_console_streams_frames_through_a_pseudo_terminal(self):
+        master, slave = pty.openpty()
+        tty.setraw(slave)
+        tty.setraw(master)
+        console = PIX6T4ColorHeadless()
+        with os.fdopen(slave, "wb", buffering=0) as device:
+            console.telemetry = Telemetry(device)
+            for _ in range(20):
+                console.loop()
+        self.assertEqual(console.telemetry.sequence, 20)
+        decoder = Decoder()
+        stats = RollingStats(window=8)
+        rows = io.StringIO()
+        writer = csv.DictWriter(rows, FIELDS)
+        read(master, decoder, stats, writer, duration=5, output=io.StringIO())
+        os.close(master)
+        self.assertEqual(stats.count, 20)
+        self.assertEqual(len(stats.records), 8)
+        self.assertEqual(decoder.missed, 0)
+        self.assertEqual(len(rows.getvalue().splitlines()), 20)
+        self.assertIn("20 frames", stats.describe())
+
+    def test_record_size_is_fixed(self):
+        self.assertEqual(TELEMETRY_RECORD_SIZE, 28)
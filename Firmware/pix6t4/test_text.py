@@ -0,0 +1,48 @@
+import tracemalloc
+import unittest
+from unittest import TestCase
+from pix6t4.color import Color
+from pix6t4.console import PIX6T4Color
+from pix6t4.text import FONT, GLYPH_HEIGHT, GLYPH_WIDTH, TextStrip, glyph_pixel
+
+def render_glyph(char):
+    return ["".join("#" if glyph_pixel(FONT[char], x, y) else " " for x in range(GLYPH_WIDTH)) for y in range(GLYPH_HEIGHT)]
+
+class TestText(TestCase):
+    def test_glyphs_are_packed_one_octal_digit_per_row(self):
+        self.assertEqual(render_glyph('0'), ["###", "# #", "# #", "# #", "###"])
+        self.assertEqual(render_glyph('7'), ["###", "  #", " # ", " # ", " # "])
+
+    def test_static_text_is_centered(self):
+        pix6t4 = PIX6T4Color()
+        TextStrip("1", Color.RED, scrolling=False).draw(pix6t4)
+        # A '1' is three columns wide, so it starts on the third column, on the second row
+        self.assertEqual(pix6t4.pixels[2][1], Color.BLACK)
+        self.assertEqual(pix6t4.pixels[3][1], Color.RED)
+        self.assertEqual(pix6t4.pixels[2][2], Color.RED)
+        self.assertEqual(pix6t4.pixels[0][1], Color.BLACK)
+
+    def test_scrolling_text_comes_in_from_the_right_and_wraps_around(self):
+        pix6t4 = PIX6T4Color()
+        strip = TextStrip("HI", Color.RED)
+        strip.draw(pix6t4)
+        self.assertTrue(all(color == Color.BLACK for column in pix6t4.pixels for color in column))
+        strip.scroll()
+        strip.draw(pix6t4)
+        self.assertEqual(pix6t4.pixels[7][1], Color.RED)
+        for _ in range(len(strip.columns) - 8):
+            strip.scroll()
+        self.assertEqual((strip.offset, strip.loops), (0, 1))
+
+    def test_scrolling_doesnt_allocate(self):
+        pix6t4 = PIX6T4Color()
+        strip = TextStrip("SCORE 1234", Color.GREEN)
+        strip.scroll()
+        strip.draw(pix6t4)
+        tracemalloc.start()
+        for _ in range(100):
+            strip.scroll()
+            strip.draw(pix6t4)
+        allocated = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        self.assertEqual(allocated, 0)
@@ -0,0 +1,153 @@
+import io
+import struct
+import unittest
+from unittest import TestCase
+from pix6t4.indexed import IndexedFramebuffer
+from pix6t4.tilemap import TILEMAP_HEADER_SIZE, Camera, TileMap, compile_tilemap
+
+
+def world(height: int, width: int) -> list:
+    """Rows of tiles that tell every cell of a map apart."""
+    return [bytearray((row * 7 + column * 3) & 0xFF for column in range(width)) for row in range(height)]
+
+
+class TestTileMap(TestCase):
+    def test_round_trip(self):
+        rows = world(21, 18)
+        tilemap = TileMap(io.BytesIO(compile_tilemap(rows, chunk_size=4)), cache_chunks=4)
+        self.assertEqual((tilemap.height, tilemap.width), (21, 18))
+        self.assertEqual((tilemap.chunks_down, tilemap.chunks_across), (6, 5))
+        for row in range(21):
+            for column in range(18):
+                self.assertEqual(tilemap.get(row, column), rows[row][column])
+
+    def test_chunks_are_padded(self):
+        data = compile_tilemap(world(5, 5), chunk_size=4)
+        self.assertEqual(len(data), TILEMAP_HEADER_SIZE + 4 * 16)
+
+    def test_coordinates_wrap(self):
+        rows = world(10, 12)
+        tilemap = TileMap(io.BytesIO(compile_tilemap(rows)))
+        self.assertEqual(tilemap.get(-1, -1), rows[9][11])
+        self.assertEqual(tilemap.get(10, 13), rows[0][1])
+
+    def test_cache_stays_at_capacity(self):
+        tilemap = TileMap(io.BytesIO(compile_tilemap(world(64, 64))), cache_chunks=3)
+        for row in range(64):
+            for column in range(64):
+                tilemap.get(row, column)
+        self.assertEqual(len(tilemap.slots), 3)
+        self.assertEqual(len(tilemap.buffers), 3)
+        self.assertEqual(tilemap.misses, 8 * 8 * 8)  # Every row of tiles reads the 8 chunks across again
+
+    def test_evicts_the_least_recently_used_chunk(self):
+        tilemap = TileMap(io.BytesIO(compile_tilemap(world(8, 32))), cache_chunks=2)
+        tilemap.get(0, 0)
+        tilemap.get(0, 8)
+        tilemap.get(0, 0)
+        tilemap.get(0, 16)  # Evicts the chunk at column 8
+        misses = tilemap.misses
+        tilemap.get(0, 0)
+        self.assertEqual(tilemap.misses, misses)
+        tilemap.get(0, 8)
+        self.assertEqual(tilemap.misses, misses + 1)
+
+    def test_changes_survive_eviction(self):
+        stream = io.BytesIO(compile_tilemap(world(32, 32)))
+        original = stream.getvalue()
+        tilemap = TileMap(stream, cache_chunks=1)
+        tilemap.set(3, 4, 200)
+        tilemap.get(20, 20)
+        self.assertEqual(tilemap.get(3, 4), 200)
+        tilemap.get(20, 20)
+        self.assertEqual(tilemap.get(3, 4), 200)
+        self.assertEqual(stream.getvalue(), original)
+
+    def test_evicted_changes_are_kept_as_a_diff(self):
+        tilemap = TileMap(io.BytesIO(compile_tilemap(world(32, 32))), cache_chunks=1)
+        tilemap.set(0, 1, 200)
+        tilemap.set(2, 3, 201)
+        tilemap.get(0, 8)
+        self.assertEqual(list(tilemap.modified[0]), [1 << 8 | 200, (2 * 8 + 3) << 8 | 201])
+        for column in range(8):
+            for row in range(8):
+                tilemap.set(row, 8 + column, 0)
+        tilemap.get(0, 16)
+        self.assertEqual(tilemap.modified[1], bytes(64))  # A copy is smaller than a diff of every tile
+
+    def test_walking_a_large_map_keeps_every_change(self):
+        # Like Ms. Pix-Man, clear the cell left behind and mark the one the player moves to
+        tilemap = TileMap(io.BytesIO(compile_tilemap(world(64, 64))), cache_chunks=2)
+        previous = (0, 0)
+        cells = [(row, column if row % 2 == 0 else 63 - column) for row in range(64) for column in range(64)]
+        for cell in cells[1:]:
+            tilemap.set(*previous, 0)
+            tilemap.set(*cell, 255)
+            previous = cell
+        self.assertGreater(tilemap.misses, 64 * 4)  # Changed chunks were evicted and read again many times
+        for row, column in cells[:-1]:
+            self.assertEqual(tilemap.get(row, column), 0)
+        self.assertEqual(tilemap.get(*cells[-1]), 255)
+        self.assertLessEqual(sum(len(changes) * getattr(changes, "itemsize", 1) for changes in tilemap.modified.values()),
+                             64 * 64)
+
+    def test_find(self):
+        rows = world(20, 20)
+        rows[13][17] = 255
+        tilemap = TileMap(io.BytesIO(compile_tilemap(rows)))
+        self.assertEqual(tilemap.find(255), (13, 17))
+        self.assertIsNone(tilemap.find(254))
+
+    def test_prefetch_loads_the_chunks_ahead(self):
+        tilemap = TileMap(io.BytesIO(compile_tilemap(world(32, 32))), cache_chunks=9)
+        camera = Camera(8, 8, 32, 32)
+        camera.center_on(12, 12)
+        camera.follow(12, 13)
+        camera.prefetch(tilemap)
+        # The view covers columns 8 to 15, moving right brings in the chunk of columns 16 to 23
+        self.assertIn(tilemap.key(8, 16), tilemap.slots)
+        self.assertIn(tilemap.key(15, 23), tilemap.slots)
+        self.assertNotIn(tilemap.key(8, 0), tilemap.slots)
+
+    def test_rejects_other_files(self):
+        with self.assertRaises(ValueError):
+            TileMap(io.BytesIO(struct.pack("<4sBBHH", b"P6AS", 1, 8, 8, 8)))
+
+
+class TestCamera(TestCase):
+    def test_follows_with_a_dead_zone(self):
+        camera = Camera(8, 8, 20, 20)
+        camera.center_on(10, 10)
+        self.assertEqual((camera.top, camera.left), (6, 6))
+        camera.follow(10, 9)  # Still in the middle
+        self.assertEqual(camera.left, 6)
+        camera.follow(10, 8)
+        self.assertEqual(camera.left, 5)
+        camera.follow(10, 11)
+        self.assertEqual(camera.left, 7)
+        self.assertEqual(camera.dcolumn, 1)
+
+    def test_wraps_horizontally_and_stops_vertically(self):
+        camera = Camera(8, 8, 20, 18)
+        camera.center_on(19, 1)
+        self.assertEqual((camera.top, camera.left), (12, 15))
+        camera.follow(19, 0)  # Still in the middle
+        self.assertEqual(camera.left, 15)
+        self.assertEqual(camera.dcolumn, -1)
+        camera.follow(19, 17)  # Through the tunnel on the left
+        self.assertEqual(camera.left, 14)
+        self.assertEqual(camera.dcolumn, -1)
+        camera.follow(0, 17)
+        self.assertEqual(camera.top, 0)
+
+    def test_draws_the_view(self):
+        rows = world(20, 18)
+        tilemap = TileMap(io.BytesIO(compile_tilemap(rows)))
+        camera = Camera(8, 8, 20, 18)
+        camera.center_on(4, 16)
+        framebuffer = IndexedFramebuffer(8, 8)
+        camera.draw(tilemap, framebuffer)
+        for row in range(8):
+            for column in range(8):
+                self.assertEqual(framebuffer.get(column * 8 + row),
+                                 rows[(camera.top + row) % 20][(camera.left + column) % 18])
@@ -0,0 +1,78 @@
+import unittest
+from unittest import TestCase
+from pix6t4.clock import VirtualClock
+from pix6t4.headless import PIX6T4ColorHeadless
+from pix6t4.timers import Timers
+
+class TestTimers(TestCase):
+    def setUp(self):
+        self.clock = VirtualClock(frame_ns=10000000)  # 10 ms frames
+        self.timers = Timers(self.clock)
+        self.calls = []
+
+    def run_frames(self, frames):
+        for _ in range(frames):
+            self.clock.tick()
+            self.timers.run()
+
+    def test_timers_run_in_time_order(self):
+        self.timers.after(50, lambda: self.calls.append("after 50"))
+        self.timers.every(20, lambda: self.calls.append("every 20"))
+        self.timers.after(20, lambda: self.calls.append("after 20"))
+        self.run_frames(6)
+        self.assertEqual(self.calls, ["every 20", "after 20", "every 20", "after 50", "every 20"])
+
+    def test_cancelled_timers_are_skipped(self):
+        timer = self.timers.every(10, lambda: self.calls.append("tick"))
+        self.run_frames(3)
+        timer.cancel()
+        self.run_frames(3)
+        self.assertEqual(len(self.calls), 3)
+        self.assertEqual(self.timers.heap, [])
+
+    def test_heap_keeps_many_timers_ordered(self):
+        for ms in (70, 30, 90, 10, 50, 20, 80, 60, 40, 100):
+            self.timers.after(ms, lambda ms=ms: self.calls.append(ms))
+        self.run_frames(10)
+        self.assertEqual(self.calls, sorted(self.calls))
+        self.assertEqual(len(self.calls), 10)
+
+    def test_callbacks_can_clear_the_timers(self):
+        def clear():
+            self.calls.append("clear")
+            self.timers.clear()
+            self.timers.after(10, lambda: self.calls.append("after clear"))
+        self.timers.after(10, clear)
+        self.timers.after(10, lambda: self.calls.append("cleared"))
+        self.run_frames(3)
+        self.assertEqual(self.calls, ["clear", "after clear"])
+        self.timers.tween(100, 0, 1, lambda value: self.calls.append("tween"))
+        self.timers.tween(100, 0, 1, lambda value: self.timers.clear())
+        self.timers.tween(100, 0, 1, lambda value: self.calls.append("tween"))
+        self.run_frames(2)
+        self.assertEqual(self.calls, ["clear", "after clear", "tween"])
+
+    def test_stalls_dont_replay_missed_calls(self):
+        self.timers.every(10, lambda: self.calls.append("tick"))
+        self.clock.now_ns += 1000000000
+        self.timers.run()
+        self.assertEqual(len(self.calls), 1)
+
+    def test_tweens_reach_their_end_and_bounce(self):
+        values = []
+        self.timers.tween(40, 0.0, 1.0, values.append, done=lambda: self.calls.append("done"))
+        bounce = []
+        self.timers.tween(20, 0.0, 1.0, bounce.append, bounce=True)
+        self.run_frames(6)
+        self.assertEqual(values, [0.25, 0.5, 0.75, 1.0])
+        self.assertEqual(self.calls, ["done"])
+        self.assertEqual(bounce, [0.5, 1.0, 0.5, 0.0, 0.5, 1.0])
+
+    def test_game_timers_are_cleared_when_leaving(self):
+        pix6t4 = PIX6T4ColorHeadless()
+        pix6t4.start_transition = None
+        game = pix6t4.current_game
+        pix6t4.handle_start()
+        game.every(10, lambda: None)
+        pix6t4.handle_select()
+        self.assertEqual(game.timers.heap, [])
@@ -0,0 +1,44 @@
+import gc
+import json
+import os
+import tempfile
+import unittest
+from unittest import TestCase
+from pix6t4.console import Button
+from pix6t4.headless import PIX6T4ColorHeadless
+from pix6t4.trace import Tracer
+
+class TestTrace(TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "trace.json")
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_console_timeline_is_written_in_chunks(self):
+        console = PIX6T4ColorHeadless()
+        tracer = Tracer(self.path, chunk_events=16)
+        tracer.attach(console)
+        console.handle_start()
+        for frame in range(40):
+            if frame == 20:
+                console.handle_button_pressed(Button.LEFT)
+            console.loop()
+        self.assertGreater(tracer.written, 0)  # Earlier chunks are already in the file
+        self.assertLess(len(tracer.chunk), 16)
+        gc.collect()
+        tracer.close()
+        with open(self.path) as file:
+            events = json.load(file)
+        names = {event["name"] for event in events}
+        game = console.current_game.name
+        self.assertTrue({"frame", "render", "button pressed", "gc", f"{game}.loop", f"{game}.start"} <= names)
+        frames = [event for event in events if event["name"] == "frame"]
+        self.assertEqual(len(frames), 40)
+        self.assertEqual(frames[-1]["args"]["frame"], 40)
+        self.assertEqual(frames[-1]["args"]["game"], game)
+        loops = [event for event in events if event["name"] == f"{game}.loop"]
+        # Game logic is nested in its frame
+        self.assertGreaterEqual(loops[-1]["ts"], frames[-1]["ts"])
+        self.assertLessEqual(loops[-1]["ts"] + loops[-1]["dur"], frames[-1]["ts"] + frames[-1]["dur"])
@@ -0,0 +1,84 @@
+import unittest
+from unittest import TestCase
+from pix6t4.color import Color
+from pix6t4.console import Button
+from pix6t4.headless import PIX6T4ColorHeadless
+from pix6t4.transition import Crossfade, Dissolve, Slide, Wipe, capture
+
+def filled(color):
+    return [[color for _ in range(8)] for _ in range(8)]
+
+class TestTransition(TestCase):
+    def setUp(self):
+        self.pix6t4 = PIX6T4ColorHeadless()
+        self.before = capture(filled(Color.RED))
+        self.after = capture(filled(Color.BLUE))
+
+    def test_every_effect_ends_on_the_incoming_frame(self):
+        for effect in (Crossfade, Wipe, Slide, Dissolve):
+            transition = effect(self.before, self.after)
+            finished = [transition.step(self.pix6t4) for _ in range(transition.steps)]
+            self.assertEqual(finished, [False] * (transition.steps - 1) + [True])
+            self.assertEqual(capture(self.pix6t4.pixels), self.after, effect.__name__)
+
+    def test_crossfade_blends_halfway(self):
+        transition = Crossfade(self.before, self.after)
+        for _ in range(4):
+            transition.step(self.pix6t4)
+        self.assertEqual(self.pix6t4.pixels[3][3], Color(0x7F007FFF))
+
+    def test_slide_pushes_the_outgoing_frame_left(self):
+        transition = Slide(self.before, self.after, steps=4)
+        transition.step(self.pix6t4)
+        self.assertEqual(self.pix6t4.pixels[5][0], Color.RED)
+        self.assertEqual(self.pix6t4.pixels[6][0], Color.BLUE)
+
+    def test_dissolve_replaces_a_share_of_the_pixels_each_step(self):
+        transition = Dissolve(self.before, self.after, steps=4)
+        transition.step(self.pix6t4)
+        blue = sum(color == Color.BLUE for column in self.pix6t4.pixels for color in column)
+        self.assertEqual(blue, 16)
+
+    def test_game_gets_control_after_the_transition(self):
+        pix6t4 = self.pix6t4
+        pix6t4.handle_start()
+        self.assertFalse(pix6t4.game_running)
+        for _ in range(Crossfade.steps):
+            pix6t4.loop()
+        self.assertTrue(pix6t4.game_running)
+
+    def test_releasing_a_direction_while_starting_stays_in_the_game(self):
+        pix6t4 = self.pix6t4
+        game = pix6t4.current_game
+        pix6t4.handle_button_pressed(Button.LEFT)
+        pix6t4.handle_start()
+        pix6t4.loop()
+        pix6t4.loop()
+        pix6t4.handle_button_released(Button.LEFT)
+        for _ in range(Crossfade.steps):
+            pix6t4.loop()
+        self.assertIs(pix6t4.current_game, game)
+        self.assertTrue(pix6t4.game_running)
+
+    def test_a_button_skips_the_transition(self):
+        pix6t4 = self.pix6t4
+        pix6t4.handle_start()
+        pix6t4.handle_button_pressed(Button.A)
+        self.assertTrue(pix6t4.game_running)
+        self.assertIsNone(pix6t4.transition)
+
+    def test_games_that_draw_over_their_frames_draw_on_the_front_buffer(self):
+        pix6t4 = self.pix6t4
+        while pix6t4.current_game.presents_frames:
+            pix6t4.go_to_next_game()
+            pix6t4.transition = None
+        pix6t4.handle_start()
+        for _ in range(Crossfade.steps):
+            pix6t4.loop()
+        self.assertIs(pix6t4.pixels, pix6t4.front)
+        pix6t4.plot(2, 3, Color.RED)
+        pix6t4.loop()
+        self.assertEqual(pix6t4.front[3][2], Color.RED)
+        pix6t4.stop_game()
+        self.assertIsNot(pix6t4.pixels, pix6t4.front)
+        self.assertEqual(capture(pix6t4.pixels), capture(pix6t4.front))
@@ -0,0 +1,63 @@
+import io
+import time
+import unittest
+from unittest import TestCase
+from pix6t4.headless import PIX6T4ColorHeadless
+from pix6t4.sampler import StackSampler
+from pix6t4.watchdog import Watchdog
+
+class FakeTime:
+    def __init__(self):
+        self.ns = 0
+
+    def __call__(self):
+        return self.ns
+
+class TestWatchdog(TestCase):
+    def test_frames_over_budget_are_recorded(self):
+        now = FakeTime()
+        watchdog = Watchdog(monotonic_ns=now)
+        watchdog.start()
+        now.ns += 30000000
+        watchdog.rendering()
+        now.ns += 20000000
+        self.assertTrue(watchdog.finish(40))
+        overrun = watchdog.record(7, "Snake", "length 3", 40)
+        self.assertEqual((overrun.update_ns, overrun.render_ns), (30000000, 20000000))
+        self.assertEqual(str(overrun), "frame 7 Snake (length 3): 50 ms > 40 ms (update 30 ms, render 20 ms)")
+        watchdog.start()
+        now.ns += 10000000
+        self.assertFalse(watchdog.finish(40))
+
+    def test_ring_keeps_the_latest_overruns(self):
+        watchdog = Watchdog(capacity=4)
+        for frame in range(10):
+            watchdog.record(frame, "Snake", "", 40)
+        self.assertEqual(watchdog.count, 10)
+        self.assertEqual([overrun.frame for overrun in watchdog.recent()], [6, 7, 8, 9])
+
+    def test_console_records_slow_games_with_their_state(self):
+        console = PIX6T4ColorHeadless()
+        now = FakeTime()
+        console.watchdog = Watchdog(monotonic_ns=now)
+        overruns = []
+        console.frame_overrun = overruns.append
+        console.handle_start()
+        console.advance(10)  # Through the start transition
+        game = console.current_game
+        game.loop = lambda: setattr(now, "ns", now.ns + (game.frame_budget_ms + 1) * 1000000)
+        console.loop()
+        self.assertEqual(len(overruns), 1)
+        self.assertEqual((overruns[0].game, overruns[0].tag), (game.name, game.state_tag()))
+        self.assertEqual(overruns[0].frame, console.clock.ticks)
+
+    def test_sampler_logs_the_stack_of_slow_frames(self):
+        console = PIX6T4ColorHeadless()
+        console.current_game.frame_budget_ms = 5
+        output = io.StringIO()
+        sampler = StackSampler(console, interval=0.001, output=output).start()
+        console.render = lambda: time.sleep(0.05)
+        console.loop()
+        sampler.stop()
+        self.assertEqual(sampler.samples, 1)
+        self.assertIn("in loop", output.getvalue())
@@ -0,0 +1,74 @@
+from pix6t4.color import Color
+
+GLYPH_WIDTH = 3
+GLYPH_HEIGHT = 5
+
+# A 3x5 font. Each glyph is packed in an int, one octal digit per row from top to bottom,
+# with the high bit of each digit on the left: 0o75557 is 111 101 101 101 111, a zero.
+FONT = {
+    '0': 0o75557, '1': 0o26227, '2': 0o71747, '3': 0o71717, '4': 0o55711,
+    '5': 0o74717, '6': 0o74757, '7': 0o71222, '8': 0o75757, '9': 0o75717,
+    'A': 0o25755, 'B': 0o65656, 'C': 0o34443, 'D': 0o65556, 'E': 0o74647,
+    'F': 0o74644, 'G': 0o34553, 'H': 0o55755, 'I': 0o72227, 'J': 0o11152,
+    'K': 0o55655, 'L': 0o44447, 'M': 0o57755, 'N': 0o65555, 'O': 0o25552,
+    'P': 0o65644, 'Q': 0o25563, 'R': 0o65655, 'S': 0o34216, 'T': 0o72222,
+    'U': 0o55557, 'V': 0o55552, 'W': 0o55775, 'X': 0o55255, 'Y': 0o55222,
+    'Z': 0o71247, ' ': 0o00000, '.': 0o00002, '!': 0o22202, '-': 0o00700,
+    ':': 0o02020, '?': 0o61202, "'": 0o22000, '%': 0o51245, '/': 0o11244,
+}
+
+
+def glyph_pixel(glyph: int, x: int, y: int) -> bool:
+    """Return True if the pixel at (x, y) of a packed glyph is lit."""
+    return (glyph >> ((GLYPH_HEIGHT - 1 - y) * 3 + (GLYPH_WIDTH - 1 - x))) & 1 == 1
+
+
+class TextStrip:
+    """
+    A message rendered once into an off-screen strip of columns, wider than the screen.
+    Scrolling only moves the offset of the viewport into the strip, and drawing copies
+    references to the prebuilt columns, so neither allocates.
+    Scrolling strips start and end with a blank screen, so the message comes in from
+    the right and leaves on the left. Other strips are centered on the screen.
+    """
+    def __init__(self, text: str, color: Color = Color.WHITE, background: Color = Color.BLACK,
+                 scrolling: bool = True, width: int = 8, height: int = 8, top: int = None):
+        """Render the text into the strip, with its glyphs `top` pixels from the top of the screen."""
+        self.width = width
+        top = (height - GLYPH_HEIGHT) // 2 if top is None else top
+        text_width = len(text) * (GLYPH_WIDTH + 1) - 1
+        if scrolling:
+            margin = width
+        else:
+            margin = max(0, (width - text_width) // 2)
+        blank = [background for _ in range(height)]
+        self.columns = [blank for _ in range(margin)]
+        for i, char in enumerate(text):
+            if i > 0:
+                self.columns.append(blank)
+            glyph = FONT.get(char.upper(), FONT['?'])
+            for x in range(GLYPH_WIDTH):
+                column = list(blank)
+                for y in range(GLYPH_HEIGHT):
+                    if glyph_pixel(glyph, x, y) and 0 <= top + y < height:
+                        column[top + y] = color
+                self.columns.append(column)
+        while len(self.columns) < (text_width + 2 * margin if scrolling else width):
+            self.columns.append(blank)
+        self.offset = 0
+        self.loops = 0
+
+    def scroll(self, step: int = 1):
+        """Slide the viewport along the strip, wrapping around at the end."""
+        self.offset += step
+        if self.offset > len(self.columns) - self.width:
+            self.offset = 0
+            self.loops += 1
+
+    def draw(self, pix6t4):
+        """Copy the columns under the viewport to the screen."""
+        pixels = pix6t4.pixels
+        columns = self.columns
+        offset = self.offset
+        for x in range(min(self.width, len(pixels))):
+            pixels[x][:] = columns[offset + x]
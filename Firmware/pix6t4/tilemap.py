@@ -0,0 +1,270 @@
+import io
+import struct
+from array import array
+
+# Tile map file layout: a small header followed by the chunks.
+# The map is cut into square chunks of chunk size x chunk size tiles, stored row of chunks by
+# row of chunks, and each chunk holds one byte per tile, row by row. Chunks on the right and
+# bottom edges are padded to full size, so every chunk starts at a multiple of the chunk bytes.
+TILEMAP_MAGIC = b"P6TM"
+TILEMAP_VERSION = 1
+TILEMAP_HEADER = "<4sBBHH"  # magic, version, chunk size, width, height (in tiles)
+TILEMAP_HEADER_SIZE = struct.calcsize(TILEMAP_HEADER)
+
+
+def tiles_from_ascii_art(lines: list, tiles: dict) -> list:
+    """Turn lines of text into rows of tiles, with `tiles` giving the tile of each character."""
+    width = max(len(line) for line in lines)
+    return [bytearray(tiles.get(line[column], 0) if column < len(line) else 0 for column in range(width))
+            for line in lines]
+
+
+def compile_tilemap(rows: list, chunk_size: int = 8) -> bytes:
+    """Pack rows of tiles into a tile map file."""
+    height = len(rows)
+    width = max(len(row) for row in rows)
+    data = bytearray(struct.pack(TILEMAP_HEADER, TILEMAP_MAGIC, TILEMAP_VERSION, chunk_size, width, height))
+    for top in range(0, height, chunk_size):
+        for left in range(0, width, chunk_size):
+            for row in range(top, top + chunk_size):
+                for column in range(left, left + chunk_size):
+                    data.append(rows[row][column] if row < height and column < len(rows[row]) else 0)
+    return bytes(data)
+
+
+class TileMap:
+    """
+    A map of byte-sized tiles, read from a tile map file a chunk at a time. Only the
+    `cache_chunks` most recently used chunks are kept, in buffers allocated up front, so a
+    map costs the same memory whatever its size and maps larger than RAM can be played from
+    flash. Coordinates wrap around the edges of the map.
+    Tiles changed with `set` are kept as a diff against the file when their chunk is evicted,
+    one small int per tile that differs from it, and never more than a copy of the chunk. The
+    file itself is never written, so maps can be read from the read-only filesystem of the
+    device. Changes are the only memory that grows, by the tiles that differ from the file.
+    """
+    def __init__(self, file, cache_chunks: int = 9):
+        """Open a map from a path or from a binary stream positioned at its start."""
+        self.stream = open(file, "rb") if isinstance(file, str) else file
+        self.owns_stream = isinstance(file, str)
+        self.start = self.stream.tell()
+        magic, version, self.chunk_size, self.width, self.height = struct.unpack(
+            TILEMAP_HEADER, self.stream.read(TILEMAP_HEADER_SIZE))
+        if magic != TILEMAP_MAGIC or version != TILEMAP_VERSION or self.chunk_size == 0:
+            raise ValueError("Not a tile map.")
+        self.chunks_across = (self.width + self.chunk_size - 1) // self.chunk_size
+        self.chunks_down = (self.height + self.chunk_size - 1) // self.chunk_size
+        self.chunk_bytes = self.chunk_size * self.chunk_size
+        self.buffers = [bytearray(self.chunk_bytes) for _ in range(cache_chunks)]
+        self.slot_keys = [-1] * cache_chunks  # The chunk in each buffer, -1 while it's free
+        self.stamps = [0] * cache_chunks  # When each buffer was last used, to evict the oldest
+        self.slots = {}  # Buffer index by chunk key
+        self.clock = 0
+        self.last_key = -1  # The last chunk used, looked up without touching the cache
+        self.last_buffer = None
+        self.dirty = set()  # Keys of the cached chunks that hold changes
+        # Diffs of the changed chunks that were evicted, by key: array of tile index << 8 | tile,
+        # or a copy of the chunk when that's smaller
+        self.modified = {}
+        self.diff_type = "H" if self.chunk_bytes <= 256 else "I"
+        self.original = bytearray(self.chunk_bytes)  # The chunk as in the file, to diff against
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def from_ascii_art(lines: list, tiles: dict, chunk_size: int = 8, cache_chunks: int = 9) -> 'TileMap':
+        """Compile lines of text into a map held in RAM, see tiles_from_ascii_art."""
+        return TileMap(io.BytesIO(compile_tilemap(tiles_from_ascii_art(lines, tiles), chunk_size)), cache_chunks)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def close(self):
+        """Close the file, if the map opened it."""
+        if self.owns_stream:
+            self.stream.close()
+
+    def chunk(self, key: int) -> bytearray:
+        """Return the buffer of the chunk with key chunk row * chunks_across + chunk column, loading it if needed."""
+        if key == self.last_key:
+            return self.last_buffer
+        slot = self.slots.get(key)
+        if slot is None:
+            slot = self.load(key)
+        else:
+            self.hits += 1
+        self.clock += 1
+        self.stamps[slot] = self.clock
+        self.last_key = key
+        self.last_buffer = self.buffers[slot]
+        return self.last_buffer
+
+    def load(self, key: int) -> int:
+        """Read a chunk into the least recently used buffer, and return the index of the buffer."""
+        self.misses += 1
+        stamps = self.stamps
+        slot = 0
+        for i in range(1, len(stamps)):
+            if stamps[i] < stamps[slot]:
+                slot = i
+        buffer = self.buffers[slot]
+        evicted = self.slot_keys[slot]
+        if evicted >= 0:
+            del self.slots[evicted]
+            if evicted in self.dirty:
+                self.dirty.remove(evicted)
+                self.keep_changes(evicted, buffer)
+        self.read(key, buffer)
+        changes = self.modified.pop(key, None)
+        if changes is not None:
+            # The diff is taken again when the chunk is evicted
+            if isinstance(changes, bytes):
+                buffer[:] = changes
+            else:
+                for change in changes:
+                    buffer[change >> 8] = change & 0xFF
+            self.dirty.add(key)
+        self.slot_keys[slot] = key
+        self.slots[key] = slot
+        return slot
+
+    def read(self, key: int, buffer: bytearray):
+        """Read a chunk from the file into a buffer."""
+        self.stream.seek(self.start + TILEMAP_HEADER_SIZE + key * self.chunk_bytes)
+        self.stream.readinto(buffer)
+
+    def keep_changes(self, key: int, buffer: bytearray):
+        """Keep the tiles of an evicted chunk that differ from the file."""
+        original = self.original
+        self.read(key, original)
+        changes = array(self.diff_type)
+        limit = self.chunk_bytes // changes.itemsize  # Past this a copy of the chunk is smaller
+        for i in range(self.chunk_bytes):
+            if buffer[i] != original[i]:
+                if len(changes) == limit:
+                    self.modified[key] = bytes(buffer)
+                    return
+                changes.append(i << 8 | buffer[i])
+        if changes:
+            self.modified[key] = changes
+
+    def key(self, row: int, column: int) -> int:
+        """Return the key of the chunk of a tile, with coordinates already wrapped."""
+        return (row // self.chunk_size) * self.chunks_across + column // self.chunk_size
+
+    def get(self, row: int, column: int) -> int:
+        """Return the tile at a row and column."""
+        row %= self.height
+        column %= self.width
+        size = self.chunk_size
+        # Inlined key and cache lookup, this is called for every tile drawn
+        key = (row // size) * self.chunks_across + column // size
+        buffer = self.last_buffer if key == self.last_key else self.chunk(key)
+        return buffer[(row % size) * size + column % size]
+
+    def set(self, row: int, column: int, tile: int):
+        """Change the tile at a row and column."""
+        row %= self.height
+        column %= self.width
+        size = self.chunk_size
+        key = self.key(row, column)
+        self.chunk(key)[(row % size) * size + column % size] = tile
+        self.dirty.add(key)
+
+    def find(self, tile: int) -> tuple:
+        """Return the row and column of the first occurrence of a tile, or None."""
+        for row in range(self.height):
+            for column in range(self.width):
+                if self.get(row, column) == tile:
+                    return row, column
+        return None
+
+    def prefetch(self, top: int, left: int, rows: int, columns: int, drow: int = 0, dcolumn: int = 0):
+        """
+        Load the chunks of the band of one chunk past the edge of a view, on the side it's
+        moving towards, so they're cached by the time the view gets there.
+        """
+        size = self.chunk_size
+        if dcolumn:
+            first = left + columns if dcolumn > 0 else left - size
+            for column in (first, first + size - 1):
+                for row in range(top, top + rows):
+                    self.chunk(self.key(row % self.height, column % self.width))
+        if drow:
+            first = top + rows if drow > 0 else top - size
+            for row in (first, first + size - 1):
+                for column in range(left, left + columns):
+                    self.chunk(self.key(row % self.height, column % self.width))
+
+
+class Camera:
+    """
+    The part of a map shown on the screen, that follows a target such as the player.
+    The view only moves once the target leaves the couple of cells in its middle, it wraps
+    around the map horizontally and, unless `wrap_rows` is set, stops at the top and bottom.
+    """
+    def __init__(self, rows: int, columns: int, map_height: int, map_width: int, wrap_rows: bool = False):
+        """Initialize a view of rows x columns tiles on a map of map_height x map_width tiles."""
+        self.rows = rows
+        self.columns = columns
+        self.map_height = map_height
+        self.map_width = map_width
+        self.wrap_rows = wrap_rows
+        self.top = 0
+        self.left = 0
+        self.target = None
+        self.drow = 0  # The direction the target last moved in
+        self.dcolumn = 0
+
+    def place_row(self, top: int) -> int:
+        """Return the top row of the view, wrapped or kept on the map."""
+        if self.wrap_rows:
+            return top % self.map_height
+        return max(0, min(top, self.map_height - self.rows))
+
+    def center_on(self, row: int, column: int):
+        """Put a target in the middle of the view."""
+        self.top = self.place_row(row - self.rows // 2)
+        self.left = (column - self.columns // 2) % self.map_width
+        self.target = (row, column)
+        self.drow = self.dcolumn = 0
+
+    def follow(self, row: int, column: int):
+        """Move the view if a target got too far from its middle."""
+        if self.target is not None:
+            self.drow = _direction(row - self.target[0], self.map_height)
+            self.dcolumn = _direction(column - self.target[1], self.map_width)
+        self.target = (row, column)
+        half_columns = self.columns // 2
+        offset = (column - self.left) % self.map_width
+        if offset > half_columns:
+            self.left = (column - half_columns) % self.map_width
+        elif offset < half_columns - 1:
+            self.left = (column - half_columns + 1) % self.map_width
+        half_rows = self.rows // 2
+        offset = (row - self.top) % self.map_height if self.wrap_rows else row - self.top
+        if offset > half_rows:
+            self.top = self.place_row(row - half_rows)
+        elif offset < half_rows - 1:
+            self.top = self.place_row(row - half_rows + 1)
+
+    def prefetch(self, tilemap: TileMap):
+        """Load the chunks of the map ahead of the view, in the direction the target is moving."""
+        tilemap.prefetch(self.top, self.left, self.rows, self.columns, self.drow, self.dcolumn)
+
+    def draw(self, tilemap: TileMap, framebuffer):
+        """Draw the tiles in view into an IndexedFramebuffer, using the tiles as palette indices."""
+        for row in range(self.rows):
+            for column in range(self.columns):
+                framebuffer.plot(row, column, tilemap.get(self.top + row, self.left + column))
+
+
+def _direction(delta: int, size: int) -> int:
+    """Return -1, 0 or 1 for a step of `delta` cells, taking wrapping around `size` cells into account."""
+    delta %= size
+    if delta == 0:
+        return 0
+    return 1 if delta <= size // 2 else -1
@@ -0,0 +1,166 @@
+class Timer:
+    """A callback scheduled on a Timers heap, once or at a fixed interval."""
+    def __init__(self, due_ns: int, interval_ns: int, callback, order: int):
+        self.due_ns = due_ns
+        self.interval_ns = interval_ns  # 0 for timers that only run once
+        self.callback = callback
+        self.order = order  # Timers due at the same time run in the order they were scheduled
+        self.active = True
+
+    def cancel(self):
+        """Stop the timer. It's dropped from the heap when it would have been due."""
+        self.active = False
+
+
+class Tween:
+    """A value that moves from start to end over a duration, passed to a callback on every frame."""
+    def __init__(self, start_ns: int, duration_ns: int, start: float, end: float, callback,
+                 bounce: bool = False, done=None):
+        self.start_ns = start_ns
+        self.duration_ns = duration_ns
+        self.start = start
+        self.end = end
+        self.callback = callback
+        self.bounce = bounce  # Go back and forth forever instead of stopping at the end
+        self.done = done
+        self.active = True
+
+    def cancel(self):
+        """Stop the tween where it is."""
+        self.active = False
+
+    def update(self, now_ns: int) -> bool:
+        """Pass the current value to the callback, and return True once the tween has finished."""
+        elapsed = now_ns - self.start_ns
+        if self.bounce:
+            elapsed %= 2 * self.duration_ns
+            if elapsed > self.duration_ns:
+                elapsed = 2 * self.duration_ns - elapsed
+        elif elapsed >= self.duration_ns:
+            self.callback(self.end)
+            return True
+        self.callback(self.start + (self.end - self.start) * elapsed / self.duration_ns)
+        return False
+
+
+class Timers:
+    """
+    Timers and tweens on the clock of the console. Timers are kept in a heap ordered by
+    the time they're due, so each frame only looks at the timers that are due, and
+    frames where nothing is due cost one comparison.
+    The heap is written by hand around `before`, so timers due at the same time keep the
+    order they were scheduled in.
+    """
+    def __init__(self, clock):
+        """Initialize an empty schedule on a clock, see pix6t4.clock."""
+        self.clock = clock
+        self.heap = []
+        self.tweens = []
+        self.order = 0
+
+    def every(self, ms: int, callback) -> Timer:
+        """Call `callback` every `ms` milliseconds, starting `ms` milliseconds from now."""
+        return self.schedule(ms, ms, callback)
+
+    def after(self, ms: int, callback) -> Timer:
+        """Call `callback` once, `ms` milliseconds from now."""
+        return self.schedule(ms, 0, callback)
+
+    def tween(self, ms: int, start: float, end: float, callback, bounce: bool = False, done=None) -> Tween:
+        """
+        Pass a value going from start to end over `ms` milliseconds to `callback` on every frame,
+        then call `done` if given. Bouncing tweens go back and forth until they're cancelled.
+        """
+        tween = Tween(self.clock.monotonic_ns(), ms * 1000000, start, end, callback, bounce, done)
+        self.tweens.append(tween)
+        return tween
+
+    def schedule(self, ms: int, interval_ms: int, callback) -> Timer:
+        """Add a timer due in `ms` milliseconds, and then every `interval_ms` if it's not 0."""
+        self.order += 1
+        timer = Timer(self.clock.monotonic_ns() + ms * 1000000, interval_ms * 1000000, callback, self.order)
+        self.push(timer)
+        return timer
+
+    def clear(self):
+        """Cancel all timers and tweens."""
+        for timer in self.heap:
+            timer.active = False
+        for tween in self.tweens:
+            tween.active = False
+        # In place, run may be going through them when a callback clears them
+        del self.heap[:]
+        del self.tweens[:]
+
+    def run(self):
+        """Call the timers that are due, then update the tweens."""
+        now = self.clock.monotonic_ns()
+        heap = self.heap
+        while heap and heap[0].due_ns <= now:
+            timer = self.pop()
+            if not timer.active:
+                continue
+            if timer.interval_ns:
+                timer.due_ns += timer.interval_ns
+                if timer.due_ns <= now - timer.interval_ns:
+                    # Don't replay a burst of missed calls after a stall
+                    timer.due_ns = now + timer.interval_ns
+                self.push(timer)
+            else:
+                timer.active = False
+            timer.callback()
+        tweens = self.tweens
+        i = len(tweens) - 1
+        while i >= 0:
+            if i >= len(tweens):
+                # A callback cleared the tweens
+                i = len(tweens) - 1
+                continue
+            tween = tweens[i]
+            if not tween.active:
+                tweens.pop(i)
+            elif tween.update(now):
+                tweens.pop(i)
+                tween.active = False
+                if tween.done is not None:
+                    tween.done()
+            i -= 1
+
+    def push(self, timer: Timer):
+        """Add a timer to the heap."""
+        heap = self.heap
+        heap.append(timer)
+        i = len(heap) - 1
+        while i > 0:
+            parent = (i - 1) >> 1
+            if not self.before(timer, heap[parent]):
+                break
+            heap[i] = heap[parent]
+            i = parent
+        heap[i] = timer
+
+    def pop(self) -> Timer:
+        """Remove and return the first timer due."""
+        heap = self.heap
+        first = heap[0]
+        last = heap.pop()
+        if heap:
+            size = len(heap)
+            i = 0
+            while True:
+                child = 2 * i + 1
+                if child >= size:
+                    break
+                if child + 1 < size and self.before(heap[child + 1], heap[child]):
+                    child += 1
+                if not self.before(heap[child], last):
+                    break
+                heap[i] = heap[child]
+                i = child
+            heap[i] = last
+        return first
+
+    @staticmethod
+    def before(a: Timer, b: Timer) -> bool:
+        """Return True if timer a is due before timer b."""
+        return a.due_ns < b.due_ns or (a.due_ns == b.due_ns and a.order < b.order)
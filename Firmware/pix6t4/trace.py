@@ -0,0 +1,137 @@
+import gc
+import json
+import threading
+import time
+
+# Timelines of the frames of a console, in the Chrome trace event format, which opens in
+# https://ui.perfetto.dev and chrome://tracing.
+# This runs on a computer, not on the device:
+# python -m pix6t4.farm snake --soak --frames 2000 --trace snake.json
+
+CONSOLE_THREAD = 1
+AUDIO_THREAD = 2
+
+
+class Tracer:
+    """
+    Writes trace events to a file as the console runs. Events are kept in a small chunk
+    that is written out whenever it fills up, so long traces don't sit in memory. The
+    file is a JSON array that is closed by `close`; the viewers also open the file of a
+    run that was interrupted, without the closing bracket.
+    """
+    def __init__(self, path: str, chunk_events: int = 1000):
+        """Start a trace in a new file, writing events `chunk_events` at a time."""
+        self.file = open(path, "w")
+        self.file.write("[\n")
+        self.chunk = []
+        self.chunk_events = chunk_events
+        self.written = 0  # Events already in the file
+        # Audio callbacks trace from their own thread, and collections can start while an event is added
+        self.lock = threading.RLock()
+        self.origin = time.perf_counter_ns()
+        self.gc_start_us = 0
+        self.metadata("process_name", 0, "PIX6T4 Color")
+        self.metadata("thread_name", CONSOLE_THREAD, "console")
+        self.metadata("thread_name", AUDIO_THREAD, "audio")
+        gc.callbacks.append(self.gc_callback)
+
+    def now_us(self) -> float:
+        """Return the time since the start of the trace, in microseconds."""
+        return (time.perf_counter_ns() - self.origin) / 1000
+
+    def emit(self, event: dict):
+        """Add an event to the trace."""
+        event["pid"] = 1
+        with self.lock:
+            self.chunk.append(json.dumps(event, separators=(",", ":")))
+            if len(self.chunk) >= self.chunk_events:
+                self.flush()
+
+    def flush(self):
+        """Write the events of the current chunk to the file. Call with the lock held."""
+        chunk, self.chunk = self.chunk, []
+        if not chunk:
+            return
+        self.file.write((",\n" if self.written else "") + ",\n".join(chunk))
+        self.written += len(chunk)
+
+    def metadata(self, name: str, tid: int, value: str):
+        self.emit({"name": name, "ph": "M", "tid": tid, "args": {"name": value}})
+
+    def complete(self, name: str, category: str, start_us: float, duration_us: float,
+                 tid: int = CONSOLE_THREAD, args: dict = None):
+        """Add a slice of time, that started at `start_us`."""
+        event = {"name": name, "cat": category, "ph": "X", "ts": start_us, "dur": duration_us, "tid": tid}
+        if args:
+            event["args"] = args
+        self.emit(event)
+
+    def instant(self, name: str, category: str, tid: int = CONSOLE_THREAD, args: dict = None):
+        """Add an event without a duration, now."""
+        event = {"name": name, "cat": category, "ph": "i", "s": "t", "ts": self.now_us(), "tid": tid}
+        if args:
+            event["args"] = args
+        self.emit(event)
+
+    def gc_callback(self, phase: str, info: dict):
+        """Trace the garbage collections of this process, see gc.callbacks."""
+        if threading.current_thread() is not threading.main_thread():
+            return
+        if phase == "start":
+            self.gc_start_us = self.now_us()
+        else:
+            self.complete("gc", "gc", self.gc_start_us, self.now_us() - self.gc_start_us,
+                          args={"generation": info["generation"], "collected": info["collected"]})
+
+    def wrap(self, owner, method: str, name: str, category: str, args=None):
+        """
+        Replace a method of an object with one that traces every call as a slice.
+        `args`, if given, is called after the method to give the arguments of the slice.
+        """
+        original = getattr(owner, method)
+
+        def traced(*arguments):
+            start = self.now_us()
+            try:
+                return original(*arguments)
+            finally:
+                self.complete(name, category, start, self.now_us() - start,
+                              args=args(*arguments) if args is not None else None)
+        setattr(owner, method, traced)
+
+    def attach(self, pix6t4):
+        """Trace the frames, input, renders and sounds of a console, and the games it runs."""
+        self.wrap(pix6t4, "update", "frame", "frame", lambda: {
+            "frame": pix6t4.clock.ticks,
+            "time_ms": pix6t4.clock.monotonic_ns() // 1000000,
+            "game": pix6t4.current_game.name,
+            "state": pix6t4.state_tag(),
+        })
+        self.wrap(pix6t4, "render", "render", "render")
+        self.wrap(pix6t4, "handle_button_pressed", "button pressed", "input", lambda button: {"button": button})
+        self.wrap(pix6t4, "handle_button_released", "button released", "input", lambda button: {"button": button})
+        original_beep = pix6t4.beep
+
+        def beep(frequency: int = 440, duration: int = 200):
+            self.instant("beep", "audio", args={"frequency": frequency, "duration_ms": duration})
+            original_beep(frequency, duration)
+        pix6t4.beep = beep
+        for game in pix6t4.games:
+            self.wrap(game, "loop", f"{game.name}.loop", "game")
+            self.wrap(game, "title_screen", f"{game.name}.title_screen", "game")
+            self.wrap(game.timers, "run", f"{game.name} timers", "game")
+            self.wrap(game, "start", f"{game.name}.start", "game", lambda game=game: {
+                "game": game.name,
+                "priority": game.priority,
+                "frame_rate": game.frame_rate,
+                "frame_budget_ms": game.frame_budget_ms,
+            })
+            self.wrap(game, "stop", f"{game.name}.stop", "game", lambda game=game: {"score": game.score})
+
+    def close(self):
+        """Write the remaining events and close the file."""
+        gc.callbacks.remove(self.gc_callback)
+        with self.lock:
+            self.flush()
+            self.file.write("\n]\n")
+            self.file.close()
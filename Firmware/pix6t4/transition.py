@@ -0,0 +1,143 @@
+from array import array
+
+from pix6t4.color import Color
+
+# Blend tables and dissolve orders are shared by all transitions of the same size
+_blend_tables = {}
+_dissolve_ranks = {}
+
+
+def capture(pixels) -> array:
+    """Capture the packed values of a framebuffer, in the column-major order of PIX6T4Color.pixels."""
+    values = array("I", bytes(4 * len(pixels) * len(pixels[0])))
+    i = 0
+    for column in pixels:
+        for color in column:
+            values[i] = color.value
+            i += 1
+    return values
+
+
+def blend_tables(steps: int) -> list:
+    """
+    Return, for each step of a crossfade, a table of the 256 channel intensities
+    scaled by the weight of the incoming frame, followed by the same for the outgoing frame.
+    Blending a channel is then two lookups and an addition.
+    """
+    if steps not in _blend_tables:
+        tables = []
+        for step in range(steps + 1):
+            weight = 256 * step // steps
+            tables.append((
+                bytes(v * weight >> 8 for v in range(256)),
+                bytes(v * (256 - weight) >> 8 for v in range(256))))
+        _blend_tables[steps] = tables
+    return _blend_tables[steps]
+
+
+def dissolve_ranks(cells: int) -> array:
+    """
+    Return the rank of each cell in a fixed pseudo-random order, shuffled with a small
+    linear congruential generator so that it's the same on every device.
+    """
+    if cells not in _dissolve_ranks:
+        order = list(range(cells))
+        seed = 0x6402
+        for i in range(cells - 1, 0, -1):
+            seed = (seed * 1103515245 + 12345) & 0x7FFFFFFF
+            j = seed % (i + 1)
+            order[i], order[j] = order[j], order[i]
+        ranks = array("H", bytes(2 * cells))
+        for rank, cell in enumerate(order):
+            ranks[cell] = rank
+        _dissolve_ranks[cells] = ranks
+    return _dissolve_ranks[cells]
+
+
+class Transition:
+    """
+    An effect that goes from a captured outgoing frame to a captured incoming frame,
+    one step per frame. Override `draw` to implement an effect.
+    """
+    steps = 8
+
+    def __init__(self, before: array, after: array, height: int = 8, steps: int = None):
+        """Initialize the transition between two frames captured with `capture`."""
+        self.steps = steps or self.steps
+        self.before = before
+        self.after = after
+        self.height = height
+        self.width = len(before) // height
+        self.before_colors = [Color(value) for value in before]
+        self.after_colors = [Color(value) for value in after]
+        self.before_columns = [self.before_colors[x * height:(x + 1) * height] for x in range(self.width)]
+        self.after_columns = [self.after_colors[x * height:(x + 1) * height] for x in range(self.width)]
+        self.current = 0
+
+    def step(self, pix6t4) -> bool:
+        """Draw the next step of the transition, and return True once it's finished."""
+        self.current += 1
+        self.draw(pix6t4, self.current)
+        return self.current >= self.steps
+
+    def finish(self, pix6t4):
+        """Skip to the end of the transition."""
+        self.current = self.steps
+        self.draw(pix6t4, self.steps)
+
+    def draw(self, pix6t4, step: int):
+        """Draw a step of the transition, from 1 to self.steps."""
+        raise NotImplementedError("This method should be overridden in subclasses.")
+
+
+class Crossfade(Transition):
+    """Fades the outgoing frame into the incoming one."""
+    def draw(self, pix6t4, step: int):
+        fade_in, fade_out = blend_tables(self.steps)[step]
+        before = self.before
+        after = self.after
+        i = 0
+        for column in pix6t4.pixels:
+            for y in range(len(column)):
+                new = after[i]
+                old = before[i]
+                column[y] = Color(
+                    ((fade_in[new >> 24] + fade_out[old >> 24]) << 24) |
+                    ((fade_in[(new >> 16) & 0xFF] + fade_out[(old >> 16) & 0xFF]) << 16) |
+                    ((fade_in[(new >> 8) & 0xFF] + fade_out[(old >> 8) & 0xFF]) << 8) |
+                    0xFF)
+                i += 1
+
+
+class Wipe(Transition):
+    """Uncovers the incoming frame from left to right."""
+    def draw(self, pix6t4, step: int):
+        edge = self.width * step // self.steps
+        for x, column in enumerate(pix6t4.pixels):
+            column[:] = self.after_columns[x] if x < edge else self.before_columns[x]
+
+
+class Slide(Transition):
+    """Slides the incoming frame in from the right, pushing the outgoing one out on the left."""
+    def draw(self, pix6t4, step: int):
+        shift = self.width * step // self.steps
+        for x, column in enumerate(pix6t4.pixels):
+            source = x + shift
+            if source < self.width:
+                column[:] = self.before_columns[source]
+            else:
+                column[:] = self.after_columns[source - self.width]
+
+
+class Dissolve(Transition):
+    """Replaces the outgoing frame with the incoming one a few pixels at a time, in a fixed random order."""
+    def draw(self, pix6t4, step: int):
+        ranks = dissolve_ranks(len(self.before))
+        count = len(self.before) * step // self.steps
+        before = self.before_colors
+        after = self.after_colors
+        i = 0
+        for column in pix6t4.pixels:
+            for y in range(len(column)):
+                column[y] = after[i] if ranks[i] < count else before[i]
+                i += 1
@@ -0,0 +1,81 @@
+import time
+
+
+class Overrun:
+    """A frame that took longer than the budget of its game."""
+    def __init__(self):
+        self.frame = 0
+        self.game = ""
+        self.tag = ""  # What the game was doing, see PIX6T4Color.state_tag
+        self.update_ns = 0
+        self.render_ns = 0
+        self.budget_ns = 0
+
+    def __str__(self):
+        return (f"frame {self.frame} {self.game} ({self.tag}): "
+                f"{(self.update_ns + self.render_ns) // 1000000} ms > {self.budget_ns // 1000000} ms "
+                f"(update {self.update_ns // 1000000} ms, render {self.render_ns // 1000000} ms)")
+
+
+class Watchdog:
+    """
+    Times the game logic and the render of every frame in real time, whatever the console
+    clock does, and records the frames that go over the budget of the running game.
+    The latest overruns are kept in a ring of preallocated records, so recording one
+    doesn't allocate, and older ones are overwritten.
+    """
+    def __init__(self, capacity: int = 16, monotonic_ns=time.monotonic_ns):
+        """Initialize an empty ring of `capacity` overruns, timed with `monotonic_ns`."""
+        self.monotonic_ns = monotonic_ns
+        self.records = [Overrun() for _ in range(capacity)]
+        self.count = 0  # Overruns recorded since the start, including the overwritten ones
+        self.start_ns = 0  # The start of the frame in progress, 0 between frames
+        self.render_start_ns = 0
+        self.update_ns = 0
+        self.render_ns = 0
+
+    def start(self):
+        """Mark the start of a frame's game logic."""
+        self.start_ns = self.monotonic_ns()
+        self.render_start_ns = 0
+
+    def rendering(self):
+        """Mark the start of a frame's render."""
+        self.render_start_ns = self.monotonic_ns()
+
+    def finish(self, budget_ms: int) -> bool:
+        """Mark the end of a frame, and return True if it went over a budget of `budget_ms`."""
+        end = self.monotonic_ns()
+        start = self.start_ns
+        self.start_ns = 0  # Between frames, see pix6t4.sampler
+        if self.render_start_ns:
+            self.update_ns = self.render_start_ns - start
+            self.render_ns = end - self.render_start_ns
+        else:
+            self.update_ns = end - start
+            self.render_ns = 0
+        return end - start > budget_ms * 1000000
+
+    def record(self, frame: int, game: str, tag: str, budget_ms: int) -> Overrun:
+        """Record the frame that just finished as an overrun, and return its record."""
+        overrun = self.records[self.count % len(self.records)]
+        overrun.frame = frame
+        overrun.game = game
+        overrun.tag = tag
+        overrun.update_ns = self.update_ns
+        overrun.render_ns = self.render_ns
+        overrun.budget_ns = budget_ms * 1000000
+        self.count += 1
+        return overrun
+
+    def recent(self) -> list:
+        """Return the overruns still in the ring, oldest first."""
+        capacity = len(self.records)
+        first = max(0, self.count - capacity)
+        return [self.records[i % capacity] for i in range(first, self.count)]
+
+    def dump(self):
+        """Print the overruns still in the ring, oldest first."""
+        print(f"{self.count} frame overruns")
+        for overrun in self.recent():
+            print(overrun)